@@ -1,8 +1,8 @@
 from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
 from app.services.exceptions import (
-    NotFoundError, AlreadyExistsError, ValidationError,
-    ServiceError, OTPAttemptsExceeded, OTPExpired,
+    NotFoundError, AlreadyExistsError, ValidationError, ConflictError,
+    ServiceError, ServiceBusy, OTPAttemptsExceeded, OTPExpired,
     InvalidOTP, UnAuthorized, ResetPassword
 )
 
@@ -18,10 +18,23 @@ def register_exception_handlers(app: FastAPI):
     async def conflict_handler(request: Request, exc: AlreadyExistsError):
         return JSONResponse({"detail": str(exc)}, status_code=status.HTTP_409_CONFLICT)
 
+    @app.exception_handler(ConflictError)
+    async def stale_write_handler(request: Request, exc: ConflictError):
+        return JSONResponse({"detail": str(exc)}, status_code=status.HTTP_409_CONFLICT)
+
     @app.exception_handler(ValidationError)
     async def unprocessable_handler(request: Request, exc: ValidationError):
         return JSONResponse({"detail": str(exc)}, status_code=status.HTTP_422_UNPROCESSABLE_ENTITY)
 
+    @app.exception_handler(ServiceBusy)
+    async def service_busy_handler(request: Request, exc: ServiceBusy):
+        audit_log_bg(request, LogLevel.WARNING, str(exc))
+        return JSONResponse(
+            {"detail": str(exc) or "Service busy, please retry"},
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": "1"}
+        )
+
     @app.exception_handler(OTPAttemptsExceeded)
     async def otp_too_many_handler(request: Request, exc: OTPAttemptsExceeded):
         audit_log_bg(request, LogLevel.INFO, str(exc))
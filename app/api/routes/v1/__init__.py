@@ -22,6 +22,7 @@ from app.api.routes.v1.location import (
 from app.api.routes.v1.auth import router as auth_router
 from app.api.routes.v1.permission import router as permission_router
 from app.api.routes.v1.role import router as role_router
+from app.api.routes.v1.diagnostics import router as diagnostics_router
 
 from app.api.routes.v1.user_setup.tenant import router as tenant_router
 
@@ -56,4 +57,7 @@ api_router.include_router(state.router, prefix="/state", tags=["Organization/Sta
 # Payment
 api_router.include_router(payment_router, prefix="/payment", tags=["Payments"])
 api_router.include_router(subscription_router, prefix="/subscription", tags=["Payments/Subscription"])
-api_router.include_router(paystack_webhook_router, prefix="/paystack_webhook", tags=["Payments/PaystackWebhook"])
\ No newline at end of file
+api_router.include_router(paystack_webhook_router, prefix="/paystack_webhook", tags=["Payments/PaystackWebhook"])
+
+# Diagnostics
+api_router.include_router(diagnostics_router, prefix="/diagnostics", tags=["Diagnostics"])
\ No newline at end of file
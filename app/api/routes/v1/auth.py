@@ -9,7 +9,8 @@ from app.schemas.auth import (
 
 from app.services.auth import (
     authenticate_user, generate_otp, verify_otp,
-    verify_email, logout, verify_account, get_current_token,
+    verify_email, logout, logout_everywhere, verify_account, get_current_token,
+    get_current_user_id,
     reset_password, create_verification_token, refresh_user_token
 )
 from app.services.email_services import send_otp_email, send_reset_password_email
@@ -42,7 +43,11 @@ async def login_route(
 @router.post("/verify_otp", response_model=Token)
 @limiter.limit("5/minute")
 async def verify_otp_route(request:Request, data: OTPVerifyRequest):
-    access_token, refresh_token = await verify_otp(data.email, data.otp)
+    access_token, refresh_token = await verify_otp(
+        data.email, data.otp,
+        device=request.headers.get("user-agent"),
+        ip_address=request.client.host if request.client else None
+    )
     return Token(access_token=access_token, refresh_token=refresh_token)
 
 @router.post("/resend_otp", response_model=Token)
@@ -65,7 +70,11 @@ async def resend_otp_route(
 @router.post("/reset_password", response_model=Token)
 @limiter.limit("5/minute")
 async def reset_password_route(request:Request, data: ResetPassword):
-    access_token, refresh_token = await reset_password(**data.model_dump())
+    access_token, refresh_token = await reset_password(
+        **data.model_dump(),
+        device=request.headers.get("user-agent"),
+        ip_address=request.client.host if request.client else None
+    )
     return Token(access_token=access_token, refresh_token=refresh_token)
 
 @router.get("/verify_account")
@@ -116,5 +125,11 @@ async def refresh_token_route(request:Request, refresh_token:str = Depends(get_c
 async def logout_route(request:Request, data:RefreshTokenRequest):
     if not data.refresh_token:
         raise ValidationError("Missing refresh token")
-    res = await logout(data.refresh_token)
-    return res
\ No newline at end of file
+    res = await logout(data.refresh_token, request.headers.get("authorization"))
+    return res
+
+@router.post("/logout_all", response_model=dict[str, str])
+@limiter.limit("5/minute")
+async def logout_all_route(request:Request, user_id = Depends(get_current_user_id)):
+    """Revoke every access and refresh token issued to the caller."""
+    return await logout_everywhere(user_id)
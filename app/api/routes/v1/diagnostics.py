@@ -0,0 +1,141 @@
+from fastapi import APIRouter, Query, Depends, Path
+from fastapi.responses import PlainTextResponse
+from beanie import PydanticObjectId
+from typing import List, Optional
+
+from app.schemas.slow_query import SlowQueryResponse
+from app.schemas.profile import (
+    ProfileHeaderResponse, ProfileResponse, ProfileToggleCreate, ProfileToggleResponse
+)
+from app.middlewares.load_shed_middleware import load_shed_stats
+from app.services.slow_query import list_slow_queries
+from app.services.profiler import (
+    get_profile, list_profile_toggles, list_profiles, remove_profile_toggle,
+    set_profile_toggle, sign_profile_header
+)
+from app.services.auth import require_roles_or_permissions
+
+
+router = APIRouter()
+
+
+# GET /diagnostics/slow-queries?plan=COLLSCAN&model=User
+@router.get(
+    "/slow-queries",
+    response_model=List[SlowQueryResponse],
+    summary="Recent slow CRUD queries with their execution plans",
+)
+async def get_slow_queries_route(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    model: Optional[str] = Query(None, description="Document class, e.g. `User`"),
+    operation: Optional[str] = Query(None, description="CRUD operation, e.g. `list`"),
+    plan: Optional[str] = Query(None, description="Winning plan, e.g. `COLLSCAN` to find missing indexes"),
+    _ = Depends(require_roles_or_permissions("app_manager"))
+):
+    return await list_slow_queries(
+        skip=skip, limit=limit, model=model, operation=operation, plan=plan
+    )
+
+
+# GET /diagnostics/load-shed
+@router.get(
+    "/load-shed",
+    summary="Concurrency slots in use, and requests shed by tier and by tenant",
+)
+async def get_load_shed_route(
+    _ = Depends(require_roles_or_permissions("app_manager"))
+):
+    return load_shed_stats()
+
+
+# POST /diagnostics/profiles/header?ttl_seconds=300
+@router.post(
+    "/profiles/header",
+    response_model=ProfileHeaderResponse,
+    summary="Signed X-Profile header value; requests sending it are profiled",
+)
+async def sign_profile_header_route(
+    ttl_seconds: int = Query(300, ge=1, le=3600),
+    _ = Depends(require_roles_or_permissions("app_manager"))
+):
+    value, expires_at = sign_profile_header(ttl_seconds)
+    return ProfileHeaderResponse(value=value, expires_at=expires_at)
+
+
+# GET /diagnostics/profiles/toggles
+@router.get(
+    "/profiles/toggles",
+    response_model=List[ProfileToggleResponse],
+    summary="Routes currently being sampled by the profiler",
+)
+async def list_profile_toggles_route(
+    _ = Depends(require_roles_or_permissions("app_manager"))
+):
+    return await list_profile_toggles()
+
+
+# PUT /diagnostics/profiles/toggles
+@router.put(
+    "/profiles/toggles",
+    response_model=ProfileToggleResponse,
+    summary="Profile one request in N to a route template for a while",
+)
+async def set_profile_toggle_route(
+    payload: ProfileToggleCreate,
+    user_id = Depends(require_roles_or_permissions("app_manager"))
+):
+    return await set_profile_toggle(
+        payload.route, payload.method, payload.every, payload.minutes, user_id=user_id
+    )
+
+
+# DELETE /diagnostics/profiles/toggles?route=/api/v1/sales/{sale_id}&method=GET
+@router.delete(
+    "/profiles/toggles",
+    status_code=204,
+    summary="Stop profiling a route template",
+)
+async def remove_profile_toggle_route(
+    route: str = Query(..., description="Route template, e.g. `/api/v1/sales/{sale_id}`"),
+    method: str = Query("*", description="HTTP method, or `*`"),
+    _ = Depends(require_roles_or_permissions("app_manager"))
+):
+    await remove_profile_toggle(route, method)
+
+
+# GET /diagnostics/profiles?route=/api/v1/sales/{sale_id}
+@router.get(
+    "/profiles",
+    response_model=List[ProfileResponse],
+    summary="Recent request profiles, without their stacks",
+)
+async def list_profiles_route(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    route: Optional[str] = Query(None, description="Route template"),
+    method: Optional[str] = Query(None),
+    trigger: Optional[str] = Query(None, description="`header` or `toggle`"),
+    _ = Depends(require_roles_or_permissions("app_manager"))
+):
+    return await list_profiles(
+        skip=skip, limit=limit, route=route, method=method, trigger=trigger,
+        projection=ProfileResponse
+    )
+
+
+# GET /diagnostics/profiles/{profile_id}
+@router.get(
+    "/profiles/{profile_id}",
+    response_class=PlainTextResponse,
+    summary="Download a profile as collapsed stacks (flamegraph.pl, speedscope)",
+)
+async def download_profile_route(
+    profile_id: PydanticObjectId = Path(..., description="Profile ObjectId, as sent in X-Profile-Id"),
+    _ = Depends(require_roles_or_permissions("app_manager"))
+):
+    profile = await get_profile(profile_id)
+    return PlainTextResponse(
+        profile.collapsed,
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.collapsed"'},
+    )
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Query, Path, status
+from fastapi import APIRouter, Query, Path, status, Depends
 from typing import List, Optional
 
 from app.schemas.inventory.brand import BrandCreate, BrandUpdate, BrandResponse
@@ -10,8 +10,11 @@ from app.services.inventory.brand import (
     delete_brand,
     restore_brand,
     disable_brand,
-    activate_brand
+    activate_brand,
+    bulk_brands
 )
+from app.schemas.base import BulkRequest, BulkResult
+from app.services.auth import require_roles_or_permissions
 # from app.api.routes.v1.handle_errors import handle_service_errors
 
 
@@ -28,6 +31,18 @@ async def create_brand_route(payload: BrandCreate):
     return await create_brand(payload)
 
 
+@router.post(
+    "/bulk",
+    response_model=BulkResult,
+    summary="Create, update and soft-delete brands in one request",
+)
+async def bulk_brands_route(
+    payload: BulkRequest[BrandCreate, BrandUpdate],
+    current_user_id = Depends(require_roles_or_permissions("admin", "can_manage_brands"))
+):
+    return await bulk_brands(payload, user_id=current_user_id)
+
+
 @router.get(
     "/",
     response_model=List[BrandResponse],
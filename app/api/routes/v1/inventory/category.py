@@ -1,11 +1,14 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, status
+from typing import List, Optional
 
 from app.models.inventory.category import Category  # your Beanie model
 from app.schemas.inventory.category import(
     CategoryResponse, CategoryCreate, CategoryUpdate,
     CategoryListResponse
 )
+from app.services.inventory.category import list_categories
+from app.utils.parse_sort_clause import parse_sort
+from app.constants import CountMode
 
 
 router = APIRouter(
@@ -29,18 +32,29 @@ async def create_category(category_in: CategoryCreate):
     "/",
     response_model=CategoryListResponse,
 )
-async def list_categories(skip: int = 0, limit: int = 100):
+async def list_categories_route(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None, description="Opaque `next_cursor` from the previous page; overrides `skip`"
+    ),
+    sort: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to sort by; prefix '-' for DESC. E.g. `sort=name,-code`"
+    ),
+    total: Optional[CountMode] = Query(
+        CountMode.EXACT, description="`exact` (default) or `estimated` for very large collections"
+    ),
+):
     """List non-deleted categories with pagination, returning total count."""
-    # Count total non-deleted categories
-    total = await Category.find(Category.is_deleted == False).count()
-    # Retrieve paginated items
-    items = (
-        await Category.find(Category.is_deleted == False)
-        .skip(skip)
-        .limit(limit)
-        .to_list()
+    # The total comes from a short-lived count cache instead of a count per page
+    return await list_categories(
+        skip=skip,
+        limit=limit,
+        sort_order=parse_sort(sort) or None,
+        cursor=cursor,
+        count=total,
     )
-    return CategoryListResponse(total=total, items=items)
 
 
 @router.get(
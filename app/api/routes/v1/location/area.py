@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Query, Path, status
+from fastapi import APIRouter, Query, Path, status, Depends
 from typing import List, Optional
 
 from app.schemas.organization.location import AreaCreate, AreaUpdate, AreaResponse
@@ -10,8 +10,11 @@ from app.services.organization.area import (
     delete_area,
     restore_area,
     disable_area,
-    activate_area
+    activate_area,
+    bulk_areas
 )
+from app.schemas.base import BulkRequest, BulkResult
+from app.services.auth import require_roles_or_permissions
 # from app.api.routes.v1.handle_errors import handle_service_errors
 
 
@@ -28,6 +31,18 @@ async def create_area_route(payload: AreaCreate):
     return await create_area(payload)
 
 
+@router.post(
+    "/bulk",
+    response_model=BulkResult,
+    summary="Create, update and soft-delete areas in one request",
+)
+async def bulk_areas_route(
+    payload: BulkRequest[AreaCreate, AreaUpdate],
+    current_user_id = Depends(require_roles_or_permissions("admin", "can_manage_branches"))
+):
+    return await bulk_areas(payload, user_id=current_user_id)
+
+
 @router.get(
     "/",
     response_model=List[AreaResponse],
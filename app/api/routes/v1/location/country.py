@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Query, Path, status
+from fastapi import APIRouter, Query, Path, status, Depends
 from typing import List, Optional
 
 from app.schemas.organization.location import (
@@ -7,8 +7,11 @@ from app.schemas.organization.location import (
 from app.services.organization.country import (
     create_country, get_country, list_countries,
     update_country, delete_country, restore_country,
-    disable_country, activate_country
+    disable_country, activate_country,
+    bulk_countries
 )
+from app.schemas.base import BulkRequest, BulkResult
+from app.services.auth import require_roles_or_permissions
 
 router = APIRouter()
 
@@ -23,6 +26,18 @@ async def create_country_route(payload: CountryCreate):
     return await create_country(payload)
 
 
+@router.post(
+    "/bulk",
+    response_model=BulkResult,
+    summary="Create, update and soft-delete countries in one request",
+)
+async def bulk_countries_route(
+    payload: BulkRequest[CountryCreate, CountryUpdate],
+    current_user_id = Depends(require_roles_or_permissions("admin", "can_manage_branches"))
+):
+    return await bulk_countries(payload, user_id=current_user_id)
+
+
 @router.get(
     "/",
     response_model=List[CountryResponse],
@@ -1,7 +1,14 @@
-from fastapi import APIRouter, Query, Path, status
+from fastapi import APIRouter, Query, Path, status, Depends
+from fastapi.responses import StreamingResponse
 from typing import List, Optional, Dict, Any
+from beanie import PydanticObjectId
 
 from app.utils.parse_sort_clause import parse_sort
+from app.schemas.base import Page
+from app.utils.projection import parse_fields, lean_response
+from app.constants import CountMode
+from app.utils.export import export_response
+from app.core.settings import settings
 
 from app.schemas.organization.location import (
     RegionCreate, RegionUpdate, RegionResponse
@@ -15,8 +22,12 @@ from app.services.organization.region import (
     delete_region,
     restore_region,
     disable_region,
-    activate_region
+    activate_region,
+    bulk_regions,
+    export_regions
 )
+from app.schemas.base import BulkRequest, BulkResult
+from app.services.auth import require_roles_or_permissions, get_current_company
 
 
 router = APIRouter()
@@ -32,18 +43,43 @@ async def create_region_route(payload: RegionCreate):
     return await create_region(payload)
 
 
+@router.post(
+    "/bulk",
+    response_model=BulkResult,
+    summary="Create, update and soft-delete regions in one request",
+)
+async def bulk_regions_route(
+    payload: BulkRequest[RegionCreate, RegionUpdate],
+    company_id: PydanticObjectId = Depends(get_current_company),
+    current_user_id = Depends(require_roles_or_permissions("admin", "can_manage_branches"))
+):
+    return await bulk_regions(payload, company_id=company_id, user_id=current_user_id)
+
+
 # GET /regions/?skip=0&limit=20&include_deleted=false&name=East%20Region
 # &search_name=Reg&exact_match=false&sort=name,-code
 
 @router.get(
     "/",
-    response_model=List[RegionResponse],
+    response_model=Page[RegionResponse],
     summary="List regions with optional filters and sorting",
 )
 async def get_regions_route(
     company_id: str = Query(None, description="Company ObjectId"),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None, description="Opaque `next_cursor` from the previous page; overrides `skip`"
+    ),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. `fields=name,code`. Implies `lean`"
+    ),
+    lean: bool = Query(
+        False, description="Return raw documents without model validation (faster for large pages)"
+    ),
+    total: Optional[CountMode] = Query(
+        None, description="Include the total: `exact`, or `estimated` for very large collections"
+    ),
     include_deleted: bool = Query(
         False, description="Include soft-deleted regions"
     ),
@@ -83,7 +119,9 @@ async def get_regions_route(
     if search_code:
         search["code"] = search_code
 
-    return await list_regions(
+    projection = parse_fields(fields, RegionResponse) if fields or lean else None
+
+    page = await list_regions(
         company_id = company_id,
         skip=skip,
         limit=limit,
@@ -92,6 +130,42 @@ async def get_regions_route(
         search=search or None,
         exact_match=exact_match,
         sort_order=sort_params or None,
+        cursor=cursor,
+        projection=projection,
+        count=total,
+    )
+    return lean_response(page) if projection else page
+
+
+@router.get(
+    "/export",
+    summary="Export regions as NDJSON or CSV",
+    response_class=StreamingResponse,
+)
+async def export_regions_route(
+    company_id: PydanticObjectId = Depends(get_current_company),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="`ndjson` or `csv`"),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to export; defaults to every exposed field"
+    ),
+    include_deleted: bool = Query(False, description="Include soft-deleted regions"),
+    include_deactivated: bool = Query(False, description="Include deactivated regions"),
+    sort: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to sort by; prefix '-' for DESC. E.g. `sort=name,-code`"
+    ),
+    _ = Depends(require_roles_or_permissions("admin", "can_export_data"))
+):
+    projection = parse_fields(fields, RegionResponse)
+    rows = export_regions(
+        company_id=company_id,
+        include_deleted=include_deleted,
+        include_deactivated=include_deactivated,
+        sort_order=parse_sort(sort) or None,
+        projection=projection,
+    )
+    return export_response(
+        rows, projection, format, filename="regions", chunk_rows=settings.EXPORT_BATCH_SIZE
     )
 
 
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Query, Path, status
+from fastapi import APIRouter, Query, Path, status, Depends
 from typing import List, Optional
 
 from app.schemas.organization.location import StateCreate, StateUpdate, StateResponse
@@ -10,8 +10,11 @@ from app.services.organization.state import (
     delete_state,
     restore_state,
     disable_state,
-    activate_state
+    activate_state,
+    bulk_states
 )
+from app.schemas.base import BulkRequest, BulkResult
+from app.services.auth import require_roles_or_permissions
 # from app.api.routes.v1.handle_errors import handle_service_errors
 
 
@@ -28,6 +31,18 @@ async def create_state_route(payload: StateCreate):
     return await create_state(payload)
 
 
+@router.post(
+    "/bulk",
+    response_model=BulkResult,
+    summary="Create, update and soft-delete states in one request",
+)
+async def bulk_states_route(
+    payload: BulkRequest[StateCreate, StateUpdate],
+    current_user_id = Depends(require_roles_or_permissions("admin", "can_manage_branches"))
+):
+    return await bulk_states(payload, user_id=current_user_id)
+
+
 @router.get(
     "/",
     response_model=List[StateResponse],
@@ -1,7 +1,13 @@
 from fastapi import APIRouter, Query, Path, status, Depends
+from fastapi.responses import StreamingResponse
 from typing import List, Optional, Dict, Any
 from beanie import PydanticObjectId
 from app.utils.parse_sort_clause import parse_sort
+from app.schemas.base import Page
+from app.utils.projection import parse_fields, lean_response
+from app.constants import CountMode
+from app.utils.export import export_response
+from app.core.settings import settings
 
 from app.schemas.role import (
     RoleCreate, RoleUpdate, RoleResponse
@@ -15,8 +21,12 @@ from app.services.role import (
     delete_role,
     restore_role,
     disable_role,
-    activate_role
+    activate_role,
+    bulk_roles,
+    export_roles
 )
+from app.schemas.base import BulkRequest, BulkResult
+from app.services.auth import require_roles_or_permissions
 
 from app.services.auth import get_current_company
 
@@ -37,18 +47,43 @@ async def create_role_route(
     return await create_role(payload, company_id)
 
 
+@router.post(
+    "/bulk",
+    response_model=BulkResult,
+    summary="Create, update and soft-delete roles in one request",
+)
+async def bulk_roles_route(
+    payload: BulkRequest[RoleCreate, RoleUpdate],
+    company_id: PydanticObjectId = Depends(get_current_company),
+    current_user_id = Depends(require_roles_or_permissions("admin", "role:edit"))
+):
+    return await bulk_roles(payload, company_id=company_id, user_id=current_user_id)
+
+
 # GET /roles/?skip=0&limit=20&include_deleted=false&name=East%20Role
 # &search_name=Reg&exact_match=false&sort=name
 
 @router.get(
     "/",
-    response_model=List[RoleResponse],
+    response_model=Page[RoleResponse],
     summary="List roles with optional filters and sorting",
 )
 async def get_roles_route(
     company_id: PydanticObjectId = Depends(get_current_company),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None, description="Opaque `next_cursor` from the previous page; overrides `skip`"
+    ),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. `fields=name,code`. Implies `lean`"
+    ),
+    lean: bool = Query(
+        False, description="Return raw documents without model validation (faster for large pages)"
+    ),
+    total: Optional[CountMode] = Query(
+        None, description="Include the total: `exact`, or `estimated` for very large collections"
+    ),
     include_deleted: bool = Query(
         False, description="Include soft-deleted roles"
     ),
@@ -85,7 +120,9 @@ async def get_roles_route(
     if search_name:
         search["name"] = search_name
 
-    return await list_roles(
+    projection = parse_fields(fields, RoleResponse) if fields or lean else None
+
+    page = await list_roles(
         company_id = company_id,
         skip=skip,
         limit=limit,
@@ -95,6 +132,42 @@ async def get_roles_route(
         search=search or None,
         exact_match=exact_match,
         sort_order=sort_params or None,
+        cursor=cursor,
+        projection=projection,
+        count=total,
+    )
+    return lean_response(page) if projection else page
+
+
+@router.get(
+    "/export",
+    summary="Export roles as NDJSON or CSV",
+    response_class=StreamingResponse,
+)
+async def export_roles_route(
+    company_id: PydanticObjectId = Depends(get_current_company),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="`ndjson` or `csv`"),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to export; defaults to every exposed field"
+    ),
+    include_deleted: bool = Query(False, description="Include soft-deleted roles"),
+    include_deactivated: bool = Query(False, description="Include deactivated roles"),
+    sort: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to sort by; prefix '-' for DESC. E.g. `sort=name,-code`"
+    ),
+    _ = Depends(require_roles_or_permissions("admin", "role:export"))
+):
+    projection = parse_fields(fields, RoleResponse)
+    rows = export_roles(
+        company_id=company_id,
+        include_deleted=include_deleted,
+        include_deactivated=include_deactivated,
+        sort_order=parse_sort(sort) or None,
+        projection=projection,
+    )
+    return export_response(
+        rows, projection, format, filename="roles", chunk_rows=settings.EXPORT_BATCH_SIZE
     )
 
 
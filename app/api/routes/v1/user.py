@@ -1,8 +1,13 @@
 from fastapi import APIRouter, Query, Path, status, BackgroundTasks, Depends
+from fastapi.responses import StreamingResponse
 from typing import List, Optional, Dict, Any
 from beanie import PydanticObjectId
 
 from app.utils.parse_sort_clause import parse_sort
+from app.schemas.base import Page
+from app.utils.projection import parse_fields, lean_response
+from app.constants import CountMode
+from app.utils.export import export_response
 from app.core.settings import settings
 
 from app.schemas.user import (
@@ -11,7 +16,9 @@ from app.schemas.user import (
 
 from app.models.user_setup.user import User
 
-from app.services.auth import require_permissions, get_current_company
+from app.services.auth import (
+    require_permissions, require_roles_or_permissions, get_current_company
+)
 
 from app.services.user import (
     create_user,
@@ -22,8 +29,11 @@ from app.services.user import (
     delete_user,
     restore_user,
     disable_user,
-    activate_user
+    activate_user,
+    bulk_users,
+    export_users
 )
+from app.schemas.base import BulkRequest, BulkResult
 from app.services.email_services import send_welcome_email 
 from app.services.auth import (
     create_verification_token
@@ -55,18 +65,43 @@ async def create_user_route(
     return user
 
 
+@router.post(
+    "/bulk",
+    response_model=BulkResult,
+    summary="Create, update and soft-delete users in one request",
+)
+async def bulk_users_route(
+    payload: BulkRequest[UserCreate, UserUpdate],
+    company_id: PydanticObjectId = Depends(get_current_company),
+    current_user_id = Depends(require_roles_or_permissions("admin", "user:bulk_edit"))
+):
+    return await bulk_users(payload, company_id=company_id, user_id=current_user_id)
+
+
 # GET /users/?skip=0&limit=20&include_deleted=false&name=East%20User
 # &search_name=Reg&exact_match=false&sort=name,-code
 
 @router.get(
     "/",
-    response_model=List[UserResponse],
+    response_model=Page[UserResponse],
     summary="List users with optional filters and sorting",
 )
 async def get_users_route(
     company_id: str = Query(None, description="Company ObjectId"),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None, description="Opaque `next_cursor` from the previous page; overrides `skip`"
+    ),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. `fields=name,code`. Implies `lean`"
+    ),
+    lean: bool = Query(
+        False, description="Return raw documents without model validation (faster for large pages)"
+    ),
+    total: Optional[CountMode] = Query(
+        None, description="Include the total: `exact`, or `estimated` for very large collections"
+    ),
     include_deleted: bool = Query(
         False, description="Include soft-deleted users"
     ),
@@ -106,7 +141,9 @@ async def get_users_route(
     if search_code:
         search["code"] = search_code
 
-    return await list_users(
+    projection = parse_fields(fields, UserResponse) if fields or lean else None
+
+    page = await list_users(
         company_id = company_id,
         skip=skip,
         limit=limit,
@@ -115,6 +152,42 @@ async def get_users_route(
         search=search or None,
         exact_match=exact_match,
         sort_order=sort_params or None,
+        cursor=cursor,
+        projection=projection,
+        count=total,
+    )
+    return lean_response(page) if projection else page
+
+
+@router.get(
+    "/export",
+    summary="Export users as NDJSON or CSV",
+    response_class=StreamingResponse,
+)
+async def export_users_route(
+    company_id: PydanticObjectId = Depends(get_current_company),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="`ndjson` or `csv`"),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to export; defaults to every exposed field"
+    ),
+    include_deleted: bool = Query(False, description="Include soft-deleted users"),
+    include_deactivated: bool = Query(False, description="Include deactivated users"),
+    sort: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to sort by; prefix '-' for DESC. E.g. `sort=name,-code`"
+    ),
+    _ = Depends(require_roles_or_permissions("admin", "user:export"))
+):
+    projection = parse_fields(fields, UserResponse)
+    rows = export_users(
+        company_id=company_id,
+        include_deleted=include_deleted,
+        include_deactivated=include_deactivated,
+        sort_order=parse_sort(sort) or None,
+        projection=projection,
+    )
+    return export_response(
+        rows, projection, format, filename="users", chunk_rows=settings.EXPORT_BATCH_SIZE
     )
 
 
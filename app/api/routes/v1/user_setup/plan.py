@@ -1,6 +1,13 @@
-from fastapi import APIRouter, Query, Path, status, Depends, Request
+from fastapi import APIRouter, Query, Path, Header, status, Depends, Request
+from fastapi.responses import StreamingResponse
 from typing import List, Optional, Dict, Any
+from datetime import datetime
 from app.utils.parse_sort_clause import parse_sort
+from app.schemas.base import Page
+from app.utils.projection import parse_fields, lean_response
+from app.constants import CountMode
+from app.utils.export import export_response
+from app.core.settings import settings
 
 from app.schemas.user_setup.plan import (
     PlanCreate, PlanUpdate, PlanResponse
@@ -14,7 +21,8 @@ from app.services.user_setup.plan import (
     delete_plan,
     restore_plan,
     disable_plan,
-    activate_plan
+    activate_plan,
+    export_plans
 )
 
 from app.services.auth import require_roles_or_permissions
@@ -28,12 +36,24 @@ router = APIRouter()
 # &search_name=Reg&exact_match=false&sort=name
 @router.get(
     "/",
-    response_model=List[PlanResponse],
+    response_model=Page[PlanResponse],
     summary="List plans with optional filters and sorting",
 )
 async def get_plans_route(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None, description="Opaque `next_cursor` from the previous page; overrides `skip`"
+    ),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. `fields=name,code`. Implies `lean`"
+    ),
+    lean: bool = Query(
+        False, description="Return raw documents without model validation (faster for large pages)"
+    ),
+    total: Optional[CountMode] = Query(
+        None, description="Include the total: `exact`, or `estimated` for very large collections"
+    ),
     include_deleted: bool = Query(
         False, description="Include soft-deleted plans"
     ),
@@ -70,7 +90,9 @@ async def get_plans_route(
     if search_name:
         search["name"] = search_name
 
-    return await list_plans(
+    projection = parse_fields(fields, PlanResponse) if fields or lean else None
+
+    page = await list_plans(
         skip=skip,
         limit=limit,
         include_deleted=include_deleted,        
@@ -79,7 +101,42 @@ async def get_plans_route(
         search=search or None,
         exact_match=exact_match,
         sort_order=sort_params or None,
+        cursor=cursor,
+        projection=projection,
+        count=total,
     )
+    return lean_response(page) if projection else page
+
+
+@router.get(
+    "/export",
+    summary="Export plans as NDJSON or CSV",
+    response_class=StreamingResponse,
+)
+async def export_plans_route(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="`ndjson` or `csv`"),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to export; defaults to every exposed field"
+    ),
+    include_deleted: bool = Query(False, description="Include soft-deleted plans"),
+    include_deactivated: bool = Query(False, description="Include deactivated plans"),
+    sort: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to sort by; prefix '-' for DESC. E.g. `sort=name,-code`"
+    ),
+    _ = Depends(require_roles_or_permissions("app_manager", "can_export_data"))
+):
+    projection = parse_fields(fields, PlanResponse)
+    rows = export_plans(
+        include_deleted=include_deleted,
+        include_deactivated=include_deactivated,
+        sort_order=parse_sort(sort) or None,
+        projection=projection,
+    )
+    return export_response(
+        rows, projection, format, filename="plans", chunk_rows=settings.EXPORT_BATCH_SIZE
+    )
+
 
 @router.get(
     "/{plan_id}",
@@ -117,9 +174,16 @@ async def create_plan_route(
 async def update_plan_route(
     plan_id: str = Path(..., description="Plan ObjectId"),
     payload: PlanUpdate = ...,
+    expected_updated_at: Optional[datetime] = Header(
+        None, alias="If-Match",
+        description="`updated_at` of the version being edited; returns 409 if the plan changed since"
+    ),
     current_user_id = Depends(require_roles_or_permissions("app_manager", "plan:update"))
 ):
-    return await update_plan(plan_id=plan_id, data=payload, user_id=current_user_id)
+    return await update_plan(
+        plan_id=plan_id, data=payload, user_id=current_user_id,
+        expected_updated_at=expected_updated_at
+    )
 
 
 @router.patch(
@@ -1,7 +1,13 @@
 from fastapi import APIRouter, Query, Path, status, Depends
+from fastapi.responses import StreamingResponse
 from typing import List, Optional, Dict, Any
 from beanie import PydanticObjectId
 from app.utils.parse_sort_clause import parse_sort
+from app.schemas.base import Page
+from app.utils.projection import parse_fields, lean_response
+from app.constants import CountMode
+from app.utils.export import export_response
+from app.core.settings import settings
 
 from app.schemas.user_setup.tenant import (
     TenantCreate, TenantUpdate, TenantResponse
@@ -15,7 +21,8 @@ from app.services.user_setup.tenant import (
     delete_tenant,
     restore_tenant,
     disable_tenant,
-    activate_tenant
+    activate_tenant,
+    export_tenants
 )
 
 
@@ -45,13 +52,25 @@ async def create_tenant_route(
 
 @router.get(
     "/",
-    response_model=List[TenantResponse],
+    response_model=Page[TenantResponse],
     summary="List tenants with optional filters and sorting",
 )
 async def get_tenants_route(
     company_id: PydanticObjectId = Depends(get_current_company),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None, description="Opaque `next_cursor` from the previous page; overrides `skip`"
+    ),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. `fields=name,code`. Implies `lean`"
+    ),
+    lean: bool = Query(
+        False, description="Return raw documents without model validation (faster for large pages)"
+    ),
+    total: Optional[CountMode] = Query(
+        None, description="Include the total: `exact`, or `estimated` for very large collections"
+    ),
     include_deleted: bool = Query(
         False, description="Include soft-deleted tenants"
     ),
@@ -88,7 +107,9 @@ async def get_tenants_route(
     if search_name:
         search["name"] = search_name
 
-    return await list_tenants(
+    projection = parse_fields(fields, TenantResponse) if fields or lean else None
+
+    page = await list_tenants(
         company_id = company_id,
         skip=skip,
         limit=limit,
@@ -98,6 +119,42 @@ async def get_tenants_route(
         search=search or None,
         exact_match=exact_match,
         sort_order=sort_params or None,
+        cursor=cursor,
+        projection=projection,
+        count=total,
+    )
+    return lean_response(page) if projection else page
+
+
+@router.get(
+    "/export",
+    summary="Export tenants as NDJSON or CSV",
+    response_class=StreamingResponse,
+)
+async def export_tenants_route(
+    company_id: PydanticObjectId = Depends(get_current_company),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="`ndjson` or `csv`"),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to export; defaults to every exposed field"
+    ),
+    include_deleted: bool = Query(False, description="Include soft-deleted tenants"),
+    include_deactivated: bool = Query(False, description="Include deactivated tenants"),
+    sort: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to sort by; prefix '-' for DESC. E.g. `sort=name,-code`"
+    ),
+    _ = Depends(require_roles_or_permissions("admin", "can_export_data"))
+):
+    projection = parse_fields(fields, TenantResponse)
+    rows = export_tenants(
+        company_id=company_id,
+        include_deleted=include_deleted,
+        include_deactivated=include_deactivated,
+        sort_order=parse_sort(sort) or None,
+        projection=projection,
+    )
+    return export_response(
+        rows, projection, format, filename="tenants", chunk_rows=settings.EXPORT_BATCH_SIZE
     )
 
 
@@ -8,6 +8,7 @@ from app.constants.permissions import (
 from app.constants.sort_order_enum import (
   SortOrder
 )
+from app.constants.count_mode_enum import CountMode
 from app.constants.warehouse_enum import (
   WarehouseType
 )
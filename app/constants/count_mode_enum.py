@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class CountMode(str, Enum):
+    EXACT = "exact"          # countDocuments over the full filter
+    ESTIMATED = "estimated"  # collection metadata, or a count capped at COUNT_ESTIMATE_LIMIT
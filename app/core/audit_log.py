@@ -1,39 +1,199 @@
+import asyncio
+import logging
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Optional
+
+from beanie.odm.utils.encoder import Encoder
+from bson.errors import InvalidDocument
 from fastapi import Request
+from pymongo.errors import BulkWriteError
 from app.models.logs import Log
 from app.constants import LogLevel
-from app.services.auth.dependencies import decode_token
-import asyncio
+from app.core.settings import settings
 
+logger = logging.getLogger(__name__)
 
-async def audit_log(request:Request, log_level:LogLevel, exc: str):
-    try:
-        user_id = None
-        auth_header = request.headers.get("authorization")
-        
-        if auth_header and " " in auth_header:
-            token = auth_header.split(" ")[1]
+# Raw inserts bypass Beanie, so entries are encoded (sets, urls, models) the way it would
+_encoder = Encoder()
+
+# Enough to trace a request without copying credentials or cookies into the log
+AUDIT_HEADERS = ("user-agent", "x-forwarded-for", "x-real-ip", "x-request-id", "referer", "origin", "content-type")
+
+
+def audit_entry(
+    request: Optional[Request],
+    log_level: LogLevel,
+    exc: str,
+    user_id: Any = None,
+    details: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """A `Log` document as a plain dict, built without any I/O."""
+    from app.services.auth.token import bearer_claims  # Auth imports this module
+
+    endpoint = action = client_host = request_id = None
+    headers: Dict[str, str] = {}
+    query_params: Dict[str, str] = {}
+    if request is not None:
+        endpoint = str(request.url)
+        action = str(request.method)
+        headers = {k: str(request.headers[k])[:100] for k in AUDIT_HEADERS if k in request.headers}
+        query_params = {k: str(v)[:200] for k, v in request.query_params.items()}
+        client_host = request.client.host if request.client else None
+        request_id = getattr(request.state, "request_id", None)
+        if user_id is None:
+            user_id = (bearer_claims(request.headers.get("authorization")) or {}).get("sub")
+
+    return {
+        "timestamp": datetime.now(timezone.utc),
+        "user_id": str(user_id) if user_id else None,
+        "endpoint": endpoint,
+        "action": action,
+        "level": log_level,
+        "details": {
+            "error_msg": str(exc),
+            "request_id": request_id,
+            "headers": headers,
+            "query_params": query_params,
+            "client_host": client_host,
+            **(details or {}),
+        },
+    }
+
+
+class AuditSink:
+    """
+    Bounded buffer of audit entries written with `insert_many` once
+    AUDIT_BATCH_SIZE entries are waiting or every AUDIT_FLUSH_INTERVAL_SECONDS.
+
+    `emit` never blocks and drops the entry when the buffer is full, so an
+    error storm cannot pile up tasks or memory; `put` is for entries that must
+    not be lost (hard deletes) and waits for the writer instead. Entries are
+    encoded as they are queued, since `insert_many` bypasses Beanie.
+    """
+
+    def __init__(self, maxsize: int, batch_size: int, interval: float):
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.interval = interval
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._wakeup = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.counts: Counter = Counter()  # enqueued, written, failed, batches, unencodable
+        self.dropped: Counter = Counter()  # By level
+
+    def emit(self, entry: Dict[str, Any]) -> bool:
+        if len(self._buffer) >= self.maxsize:
+            self.dropped[entry.get("level")] += 1
+            return False
+        self._enqueue(entry)
+        return True
+
+    async def put(self, entry: Dict[str, Any]) -> None:
+        while len(self._buffer) >= self.maxsize:
+            if not self.running:
+                await self.flush()
+                continue
+            self._drained.clear()
+            self._wakeup.set()
+            await self._drained.wait()
+        self._enqueue(entry)
+
+    def _encode(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return _encoder.encode(entry)
+        except Exception:
+            # Keep the record itself; only the payload that cannot be stored is flattened
+            self.counts["unencodable"] += 1
+            return _encoder.encode({**entry, "details": {"unencodable": repr(entry.get("details"))[:10000]}})
+
+    def _enqueue(self, entry: Dict[str, Any]) -> None:
+        self._buffer.append(self._encode(entry))
+        self.counts["enqueued"] += 1
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def flush(self) -> None:
+        while self._buffer:
+            batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            await self._write(batch)
+            self.counts["batches"] += 1
+        self._drained.set()
+
+    async def _write(self, batch: list) -> None:
+        collection = Log.get_motor_collection()
+        try:
+            await collection.insert_many(batch, ordered=False)
+            self.counts["written"] += len(batch)
+        except BulkWriteError as exc:
+            # Unordered: everything but the rejected entries went in
+            failed = len(exc.details.get("writeErrors", []))
+            self.counts["written"] += len(batch) - failed
+            self.counts["failed"] += failed
+            logger.warning("Could not write %d of %d audit entries", failed, len(batch))
+        except InvalidDocument:
+            # Refused client-side for the whole batch; write one by one so only the bad entry is lost
+            for entry in batch:
+                try:
+                    await collection.insert_one(entry)
+                    self.counts["written"] += 1
+                except Exception:
+                    self.counts["failed"] += 1
+                    logger.warning("Could not write audit entry %s", entry.get("action"), exc_info=True)
+        except Exception:
+            self.counts["failed"] += len(batch)
+            logger.warning("Could not write %d audit entries", len(batch), exc_info=True)
+
+    async def _run(self) -> None:
+        while not self._closing:
             try:
-                payload = decode_token(token)
-                user_id = str(payload.get("sub")) if payload.get("sub") else None                
-            except Exception:
-                # Invalid token, just keep user_id = None
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
                 pass
-            
-        await Log(
-            user_id=user_id,
-            endpoint=str(request.url),
-            action=str(request.method),
-            level=log_level,
-            details={
-                "error_msg": str(exc),
-                "headers": {k: str(v)[:100] for k,v in request.headers.items()},
-                "query_params": {k: str(v)[:200] for k,v in request.query_params.items()},
-                "client_host": request.client.host
-            }
-        ).insert()
-    except Exception as log_exc:
-        print(log_exc)
+            self._wakeup.clear()
+            await self.flush()
+        await self.flush()
+
+    def start(self) -> None:
+        if not self.running:
+            self._closing = False
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the writer after flushing everything still buffered."""
+        self._closing = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        else:
+            await self.flush()
 
-# Runs in background 
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counts,
+            "queued": len(self._buffer),
+            "dropped": dict(self.dropped),
+        }
+
+
+audit_sink = AuditSink(
+    settings.AUDIT_QUEUE_SIZE, settings.AUDIT_BATCH_SIZE, settings.AUDIT_FLUSH_INTERVAL_SECONDS
+)
+
+
+async def audit_log(request:Request, log_level:LogLevel, exc: str):
+    await audit_sink.put(audit_entry(request, log_level, exc))
+
+# Buffered; returns at once and never creates a task
 def audit_log_bg(request: Request, log_level: LogLevel, exc: str):
-    asyncio.create_task(audit_log(request, log_level, exc))
\ No newline at end of file
+    try:
+        audit_sink.emit(audit_entry(request, log_level, exc))
+    except Exception as log_exc:
+        logger.warning("Could not queue audit entry: %s", log_exc)
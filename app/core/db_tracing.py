@@ -0,0 +1,74 @@
+import threading
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from pymongo import monitoring
+
+
+class CommandTrace:
+    """
+    Database commands issued while serving one request. Motor runs pymongo in
+    worker threads with a copy of the request's context, so the listener finds
+    this object there and updates it in place (under a lock).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest: Optional[str] = None  # "<command> <collection>"
+        self._started: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def begin(self, request_id: int, label: str) -> None:
+        with self._lock:
+            self._started[request_id] = label
+
+    def end(self, request_id: int, command_name: str, duration_micros: int) -> None:
+        duration_ms = duration_micros / 1000
+        with self._lock:
+            label = self._started.pop(request_id, command_name)
+            self.count += 1
+            self.total_ms += duration_ms
+            if duration_ms >= self.slowest_ms:
+                self.slowest_ms = duration_ms
+                self.slowest = label
+
+    def server_timing(self) -> str:
+        """`Server-Timing` header value; browsers' dev tools chart it per request."""
+        value = f'db;dur={self.total_ms:.1f};desc="{self.count} commands"'
+        if self.slowest:
+            value += f', db-slowest;dur={self.slowest_ms:.1f};desc="{self.slowest}"'
+        return value
+
+    def fields(self) -> dict:
+        return {
+            "db_commands": self.count,
+            "db_time_ms": round(self.total_ms, 2),
+            "db_slowest": self.slowest,
+            "db_slowest_ms": round(self.slowest_ms, 2),
+        }
+
+
+current_trace: ContextVar[Optional[CommandTrace]] = ContextVar("db_command_trace", default=None)
+
+
+class CommandTracer(monitoring.CommandListener):
+    """Attributes every command to the trace of the request that issued it, if any."""
+
+    def started(self, event):
+        trace = current_trace.get()
+        if trace is not None:
+            collection = event.command.get(event.command_name)
+            label = f"{event.command_name} {collection}" if isinstance(collection, str) else event.command_name
+            trace.begin(event.request_id, label)
+
+    def succeeded(self, event):
+        trace = current_trace.get()
+        if trace is not None:
+            trace.end(event.request_id, event.command_name, event.duration_micros)
+
+    def failed(self, event):
+        trace = current_trace.get()
+        if trace is not None:
+            trace.end(event.request_id, event.command_name, event.duration_micros)
@@ -1,12 +1,44 @@
+import atexit
+import json
 import logging
-from app.core.settings import settings 
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from app.core.settings import settings
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; structured fields travel in `extra={"fields": {...}}`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
 
 
 logger = logging.getLogger(settings.APP_NAME)  # ONE unified logger name
 
-if not logger.hasHandlers():
-    logger.setLevel(logging.INFO)
-    formatter = logging.Formatter("%(asctime)s | %(levelname)s | %(message)s")
+# Modules log through logging.getLogger(__name__), i.e. children of the `app`
+# package logger; it shares the queue so their records are not left to lastResort
+package_logger = logging.getLogger(__name__.split(".")[0])
+
+# Request handlers only enqueue records; the listener thread formats them and
+# does the file and stream I/O, so a slow disk never blocks the event loop
+log_listener = None
+_listening = False
+
+# Own handlers only: hasHandlers() also counts the root logger's, and a host
+# that configured root (basicConfig, gunicorn) would leave ours unset
+if not logger.handlers:
+    formatter = JsonFormatter()
 
     file_handler = logging.FileHandler(f"{settings.APP_NAME}.log")
     stream_handler = logging.StreamHandler()
@@ -14,5 +46,24 @@ if not logger.hasHandlers():
     file_handler.setFormatter(formatter)
     stream_handler.setFormatter(formatter)
 
-    logger.addHandler(file_handler)
-    logger.addHandler(stream_handler)
+    log_queue: queue.Queue = queue.Queue(-1)
+    queue_handler = QueueHandler(log_queue)
+    for named in (logger, package_logger):
+        named.setLevel(logging.INFO)
+        named.addHandler(queue_handler)
+        named.propagate = False
+
+    log_listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    log_listener.start()
+    _listening = True
+
+
+def stop_log_listener() -> None:
+    """Flush whatever is still queued; safe to call more than once."""
+    global _listening
+    if _listening:
+        _listening = False
+        log_listener.stop()
+
+
+atexit.register(stop_log_listener)
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+from typing import Dict, Iterable, Tuple
+
+from pymongo import monitoring
+
+from app.core.settings import settings
+from app.utils.cache import cache_stats
+from app.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# HTTP, recorded by MetricsMiddleware
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "Requests by route template, method, status class and tenant tier",
+    ("route", "method", "status", "tier")
+)
+HTTP_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "Request latency by route template, method, status class and tenant tier",
+    ("route", "method", "status", "tier")
+)
+HTTP_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "Requests being served, by route class", ("route_class",)
+)
+
+# Motor / pymongo connection pool, recorded by PoolMetricsListener
+MONGO_POOL_WAIT = registry.histogram(
+    "mongo_pool_checkout_wait_seconds", "Time spent waiting to check a connection out of the pool",
+    ("address",), buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+MONGO_POOL_CHECKOUT_FAILED = registry.counter(
+    "mongo_pool_checkout_failed_total", "Connection checkouts that failed", ("address", "reason")
+)
+MONGO_POOL_SIZE = registry.gauge(
+    "mongo_pool_connections", "Open connections per server", ("address",)
+)
+MONGO_POOL_IN_USE = registry.gauge(
+    "mongo_pool_connections_in_use", "Connections checked out per server", ("address",)
+)
+
+# Event loop
+LOOP_LAG = registry.gauge(
+    "event_loop_lag_seconds", "How late the last event-loop probe woke up"
+)
+LOOP_LAG_HISTOGRAM = registry.histogram(
+    "event_loop_lag_distribution_seconds", "Event-loop probe lateness",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
+
+def _address(event) -> str:
+    host, port = event.address
+    return f"{host}:{port}"
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Pass to the Motor client as an event listener; called from driver threads."""
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        MONGO_POOL_SIZE.set(0, address=_address(event))
+        MONGO_POOL_IN_USE.set(0, address=_address(event))
+
+    def connection_created(self, event):
+        MONGO_POOL_SIZE.inc(address=_address(event))
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        MONGO_POOL_SIZE.dec(address=_address(event))
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        MONGO_POOL_CHECKOUT_FAILED.inc(address=_address(event), reason=str(event.reason))
+        MONGO_POOL_WAIT.observe(event.duration, address=_address(event))
+
+    def connection_checked_out(self, event):
+        MONGO_POOL_IN_USE.inc(address=_address(event))
+        MONGO_POOL_WAIT.observe(event.duration, address=_address(event))
+
+    def connection_checked_in(self, event):
+        MONGO_POOL_IN_USE.dec(address=_address(event))
+
+
+async def monitor_event_loop() -> None:
+    """Sleep a fixed interval and record how late the loop woke us; run as a task."""
+    loop = asyncio.get_running_loop()
+    interval = settings.METRICS_LOOP_LAG_INTERVAL_SECONDS
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - started - interval)
+        LOOP_LAG.set(lag)
+        LOOP_LAG_HISTOGRAM.observe(lag)
+
+
+# Collected at scrape time from the layers that already keep these numbers
+
+Samples = Iterable[Tuple[Dict[str, str], float]]
+
+
+def _cache_samples(field: str) -> Samples:
+    for name, stats in cache_stats().items():
+        yield {"cache": name}, stats[field]
+
+
+def _cache_hit_ratio() -> Samples:
+    for name, stats in cache_stats().items():
+        lookups = stats["hits"] + stats["misses"]
+        if lookups:
+            yield {"cache": name}, stats["hits"] / lookups
+
+
+def _background_tasks() -> Samples:
+    from app.core.logger import logger as app_logger
+    from app.services import slow_query
+    from app.services.auth import password
+    from app.services import profiler
+
+    yield {"source": "asyncio"}, len(asyncio.all_tasks())
+    yield {"source": "slow_query_explain"}, len(slow_query._pending)
+    yield {"source": "password_rehash"}, len(password._pending)
+    yield {"source": "profile_write"}, len(profiler._pending)
+    for handler in app_logger.handlers:
+        queue = getattr(handler, "queue", None)
+        if queue is not None:
+            yield {"source": "log_queue"}, queue.qsize()
+
+
+def _password_hash(field: str) -> Samples:
+    from app.services.auth.password import password_hash_stats
+    yield {}, password_hash_stats()[field]
+
+
+def _load_shed_total() -> Samples:
+    from app.middlewares.load_shed_middleware import load_shed_stats
+    for row in load_shed_stats()["shed"]:
+        yield {"limit": row["limit"], "route_class": row["route_class"], "tier": row["tier"]}, row["count"]
+
+
+def _load_shed_queued() -> Samples:
+    from app.middlewares.load_shed_middleware import load_shed_stats
+    for route_class, count in load_shed_stats()["queued"].items():
+        yield {"route_class": route_class}, count
+
+
+def _audit(field: str) -> Samples:
+    from app.core.audit_log import audit_sink
+    yield {}, audit_sink.stats().get(field, 0)
+
+
+def _audit_dropped() -> Samples:
+    from app.core.audit_log import audit_sink
+    for level, count in audit_sink.stats()["dropped"].items():
+        yield {"level": str(level)}, count
+
+
+registry.callback("cache_hits_total", "Cache hits per in-process cache", lambda: _cache_samples("hits"), kind="counter")
+registry.callback("cache_misses_total", "Cache misses per in-process cache", lambda: _cache_samples("misses"), kind="counter")
+registry.callback("cache_evictions_total", "LRU evictions per in-process cache", lambda: _cache_samples("evictions"), kind="counter")
+registry.callback("cache_entries", "Entries held per in-process cache", lambda: _cache_samples("size"))
+registry.callback("cache_hit_ratio", "Hits / lookups since start per in-process cache", _cache_hit_ratio)
+registry.callback("background_tasks_pending", "Queued or running background work by source", _background_tasks)
+registry.callback("password_hash_in_flight", "bcrypt calls running in the hash pool", lambda: _password_hash("in_flight"))
+registry.callback("password_hash_queue_depth", "bcrypt calls waiting for a hash worker", lambda: _password_hash("queue_depth"))
+registry.callback("password_hash_rejected_total", "bcrypt calls refused because the pool was full", lambda: _password_hash("rejected"), kind="counter")
+registry.callback("load_shed_total", "Requests shed per route class and tenant tier, by the limit (tenant or class) they hit", _load_shed_total, kind="counter")
+registry.callback("load_shed_queued", "Requests waiting for a concurrency slot per route class", _load_shed_queued)
+registry.callback("audit_log_written_total", "Audit entries written to Mongo", lambda: _audit("written"), kind="counter")
+registry.callback("audit_log_failed_total", "Audit entries lost to failed batch writes", lambda: _audit("failed"), kind="counter")
+registry.callback("audit_log_dropped_total", "Audit entries dropped because the buffer was full", _audit_dropped, kind="counter")
+registry.callback("audit_log_queued", "Audit entries waiting to be written", lambda: _audit("queued"))
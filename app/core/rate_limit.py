@@ -1,13 +1,25 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
 from fastapi import status, Request
 from fastapi.responses import JSONResponse
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
-limiter = Limiter(
-    key_func=get_remote_address,
-    default_limits=["300/minute"]
-)
+from app.core.settings import settings
+from app.models.rate_limit_counter import RateLimitCounter
+from app.utils.cache import get_cache
+
+# Per-route limits on the unauthenticated auth endpoints (login, OTP, ...), keyed
+# by IP. Everything else goes through `rate_limiter` via RateLimitMiddleware.
+limiter = Limiter(key_func=get_remote_address)
 
 async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
     # Default Retry-After header to 60 seconds
@@ -18,3 +30,146 @@ async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
         content={"detail": "Rate limit exceeded. Please try again later."},
         headers={"Retry-After": str(retry_after)}
     )
+
+
+class RateLimitBackend(ABC):
+    """Counter store for SlidingWindowLimiter; `incr` must be atomic for every process sharing it."""
+
+    @abstractmethod
+    async def incr(self, key: str, window: int, expires_at: float, cost: int) -> int:
+        """Add `cost` (negative to refund) to the counter of (`key`, `window`) and return the new total."""
+
+    @abstractmethod
+    async def get(self, key: str, window: int) -> int:
+        """Counter of (`key`, `window`), 0 when there is none."""
+
+
+class MemoryBackend(RateLimitBackend):
+    """Process-local counters; for tests and single-worker runs only."""
+
+    def __init__(self):
+        self._counts: Dict[Tuple[str, int], Tuple[int, float]] = {}
+        self._next_prune = 0.0
+
+    async def incr(self, key: str, window: int, expires_at: float, cost: int) -> int:
+        now = time.time()
+        if now >= self._next_prune:
+            self._counts = {k: v for k, v in self._counts.items() if v[1] > now}
+            self._next_prune = now + settings.RATE_LIMIT_WINDOW_SECONDS
+
+        count, _ = self._counts.get((key, window), (0, expires_at))
+        self._counts[(key, window)] = (count + cost, expires_at)
+        return count + cost
+
+    async def get(self, key: str, window: int) -> int:
+        return self._counts.get((key, window), (0, 0.0))[0]
+
+
+class MongoBackend(RateLimitBackend):
+    """One `RateLimitCounter` row per key and window, bumped with an upserting `$inc`."""
+
+    async def incr(self, key: str, window: int, expires_at: float, cost: int) -> int:
+        collection = RateLimitCounter.get_motor_collection()
+        for attempt in range(2):
+            try:
+                doc = await collection.find_one_and_update(
+                    {"key": key, "window": window},
+                    {
+                        "$inc": {"hits": cost},
+                        "$setOnInsert": {"expires_at": datetime.fromtimestamp(expires_at, timezone.utc)},
+                    },
+                    projection={"hits": 1, "_id": 0},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+                return doc["hits"]
+            except DuplicateKeyError:
+                # Two workers opened the same window at once; the retry updates the winner's row
+                if attempt:
+                    raise
+
+    async def get(self, key: str, window: int) -> int:
+        doc = await RateLimitCounter.get_motor_collection().find_one(
+            {"key": key, "window": window}, {"hits": 1, "_id": 0}
+        )
+        return doc["hits"] if doc else 0
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int  # Seconds until the current window rolls over
+
+
+class SlidingWindowLimiter:
+    """
+    Sliding-window counter: the current fixed window's count plus the previous
+    window's, weighted by how much of it the sliding window still overlaps.
+    Each check is one atomic `$inc`; the previous window is closed, so its count
+    is read once per key and cached. Rejected requests count against the bucket
+    that rejected them, so a client that keeps hammering stays limited.
+    """
+
+    def __init__(self, backend: RateLimitBackend, window_seconds: int):
+        self.backend = backend
+        self.window_seconds = window_seconds
+        self._previous = get_cache("ratelimit:previous", maxsize=10000, ttl=window_seconds)
+
+    async def _previous_count(self, key: str, window: int) -> int:
+        count = self._previous.get((key, window))
+        if count is None:
+            count = await self.backend.get(key, window)
+            self._previous.set((key, window), count)
+        return count
+
+    async def hit(self, key: str, limit: int, cost: int = 1, now: Optional[float] = None) -> RateLimitResult:
+        now = time.time() if now is None else now
+        window = int(now // self.window_seconds) * self.window_seconds
+        overlap = 1 - (now - window) / self.window_seconds
+
+        previous, current = await asyncio.gather(
+            self._previous_count(key, window - self.window_seconds),
+            self.backend.incr(key, window, window + 2 * self.window_seconds, cost)
+        )
+        used = previous * overlap + current
+
+        return RateLimitResult(
+            allowed=used <= limit,
+            limit=limit,
+            remaining=max(0, int(limit - used)),
+            retry_after=max(1, int(window + self.window_seconds - now) + 1)
+        )
+
+    async def hit_all(self, buckets: List[Tuple[str, int]], cost: int = 1) -> RateLimitResult:
+        """
+        Count one request against several (key, limit) buckets, e.g. user and
+        tenant. The increments run concurrently, so the check costs one round
+        trip however many buckets there are. When a bucket rejects, the others
+        are refunded, so a tenant at its quota does not also drain its users'
+        buckets. Returns the rejecting result, else the one with least room.
+        """
+        now = time.time()  # One window for all buckets and their refunds
+        results = await asyncio.gather(*(self.hit(key, limit, cost, now) for key, limit in buckets))
+        rejected = [r for r in results if not r.allowed]
+        if rejected:
+            window = int(now // self.window_seconds) * self.window_seconds
+            await asyncio.gather(*(
+                self.backend.incr(key, window, window + 2 * self.window_seconds, -cost)
+                for (key, _), result in zip(buckets, results) if result.allowed
+            ))
+            return max(rejected, key=lambda r: r.retry_after)
+        return min(results, key=lambda r: r.remaining)
+
+
+def build_backend(name: str) -> RateLimitBackend:
+    backends = {"mongo": MongoBackend, "memory": MemoryBackend}
+    if name not in backends:
+        raise ValueError(f"Unknown RATE_LIMIT_BACKEND {name!r}; expected one of {sorted(backends)}")
+    return backends[name]()
+
+
+rate_limiter = SlidingWindowLimiter(
+    build_backend(settings.RATE_LIMIT_BACKEND), settings.RATE_LIMIT_WINDOW_SECONDS
+)
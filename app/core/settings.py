@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, Optional
 from pydantic import AnyHttpUrl, field_validator
 from pydantic_settings import BaseSettings
 
@@ -51,6 +51,90 @@ class Settings(BaseSettings):
     # HTTP
     HTTP_TIMEOUT_SECONDS: float = 15.0
 
+    # Bulk CRUD operations
+    BULK_MAX_ITEMS: int = 1000
+
+    # Streaming exports: documents fetched per Motor round trip
+    EXPORT_BATCH_SIZE: int = 500
+
+    # Read-through cache for reference documents (CRUD.get_by_id)
+    CRUD_CACHE_TTL_SECONDS: float = 60.0
+    CRUD_CACHE_MAX_ITEMS: int = 1024
+
+    # List totals: short-lived count cache and the cap for estimated counts
+    COUNT_CACHE_TTL_SECONDS: float = 10.0
+    COUNT_CACHE_MAX_ITEMS: int = 2048
+    COUNT_ESTIMATE_LIMIT: int = 10000
+
+    # Slow-query log: CRUD calls slower than this are explained and recorded
+    SLOW_QUERY_MS: float = 200.0
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS: float = 60.0  # At most one explain per query shape
+    SLOW_QUERY_LOG_BYTES: int = 16 * 1024 * 1024  # Capped collection size
+
+    # In-memory revocation list for blacklisted tokens
+    REVOCATION_POLL_SECONDS: float = 5.0
+    REVOCATION_BLOOM_CAPACITY: int = 100_000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+
+    # Authenticated-principal cache (user, role, permissions, tenant status)
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0
+    PRINCIPAL_CACHE_MAX_ITEMS: int = 10000
+
+    # Verified JWT payloads, keyed by token digest; entries never outlive `exp`
+    TOKEN_DECODE_CACHE_TTL_SECONDS: float = 300.0
+    TOKEN_DECODE_CACHE_MAX_ITEMS: int = 10000
+
+    # Sliding-window rate limits, counted in RATE_LIMIT_BACKEND so every worker shares them
+    RATE_LIMIT_BACKEND: str = "mongo"  # "mongo", or "memory" for tests and single-process runs
+    RATE_LIMIT_WINDOW_SECONDS: int = 60
+    RATE_LIMIT_ANONYMOUS: int = 300  # Per client IP, for requests without a valid bearer token
+    RATE_LIMIT_USER: int = 300  # Per user, i.e. per signed-in till
+    RATE_LIMIT_TENANT_BY_TIER: Dict[str, int] = {
+        "free": 600, "basic": 3000, "pro": 12000, "enterprise": 60000
+    }  # Per tenant, from its plan's tier
+    RATE_LIMIT_QUOTA_CACHE_SECONDS: float = 300.0
+
+    # Load shedding: concurrent requests per (tenant, route class) and per route class
+    # overall; a request queued longer than its class's wait target gets a 503.
+    # Anonymous callers count per client IP. "auth" (login, OTP, refresh) has no
+    # per-tenant cap: the password hash pool already bounds it and answers 503 itself
+    LOAD_SHED_TENANT_LIMITS: Dict[str, int] = {"checkout": 32, "reads": 16, "reports": 2, "admin": 4}
+    LOAD_SHED_CLASS_LIMITS: Dict[str, int] = {"checkout": 256, "auth": 128, "reads": 128, "reports": 8, "admin": 32}
+    LOAD_SHED_MAX_WAIT_MS: Dict[str, float] = {"checkout": 500, "auth": 1000, "reads": 250, "reports": 100, "admin": 250}
+    LOAD_SHED_QUEUE_SIZE: int = 16  # Waiters per limit before shedding without waiting
+    LOAD_SHED_TOP_TENANTS: int = 50  # Tenants tallied by id in shed stats; the rest count as "other"
+
+    # Access log: errors and slow requests are always logged; successful ones are
+    # sampled, per route template where listed
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0
+    ACCESS_LOG_ROUTE_SAMPLE_RATES: Dict[str, float] = {"/health": 0.0, "/metrics": 0.0}
+    ACCESS_LOG_SLOW_MS: float = 1000.0
+    ACCESS_LOG_CHATTY_COMMANDS: int = 25  # Requests issuing this many DB commands are always logged
+
+    # Prometheus metrics served at /metrics
+    METRICS_TOKEN: Optional[str] = None  # Scrapers send "Authorization: Bearer <token>"; unset hides /metrics
+    METRICS_LOOP_LAG_INTERVAL_SECONDS: float = 0.5
+
+    # Audit log: entries are buffered and written in batches
+    AUDIT_QUEUE_SIZE: int = 10000  # Beyond this, best-effort entries are dropped (and counted)
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+
+    # On-demand profiling: a request with a signed X-Profile header, or one in N requests
+    # to a toggled route, runs under a stack sampler and is stored in a capped collection
+    PROFILING_ENABLED: bool = True  # False leaves the middleware out altogether
+    PROFILE_INTERVAL_MS: float = 5.0
+    PROFILE_MAX_CONCURRENT: int = 2  # Further triggered requests run unprofiled
+    PROFILE_MAX_STACKS: int = 2000  # Distinct stacks kept per profile, most sampled first
+    PROFILE_TOKEN_MAX_SECONDS: int = 3600  # Longest validity of a signed X-Profile value
+    PROFILE_TOGGLE_POLL_SECONDS: float = 10.0  # How soon other workers see toggle changes
+    PROFILE_LOG_BYTES: int = 64 * 1024 * 1024  # Capped collection size
+
+    # Password hashing (bcrypt runs off the event loop in a bounded pool)
+    BCRYPT_ROUNDS: int = 12  # Raising it rehashes users on their next login
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Running + queued; beyond this callers get 503
+
     @field_validator("PAYSTACK_SECRET_KEY", mode="before")
     @classmethod
     def _strip_and_require(cls, v):
@@ -0,0 +1,100 @@
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from app.models.role import Role
+from app.models.user_setup.otp import OTP
+from app.models.user_setup.plan import Plan
+
+logger = logging.getLogger(__name__)
+
+CASE_INSENSITIVE = {"locale": "en", "strength": 2}
+
+
+async def _index_in_place(collection, name: str, collation: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    True when index `name` already is the unique index (with `collation`) that
+    Beanie will want. A same-named index without those options does not count:
+    Beanie drops and rebuilds it, and the rebuild is what needs clean data.
+    """
+    info = (await collection.index_information()).get(name)
+    if not info or not info.get("unique"):
+        return False
+    if collation is None:
+        return "collation" not in info
+    current = info.get("collation") or {}
+    return all(current.get(key) == value for key, value in collation.items())
+
+
+async def rename_case_duplicates(collection, index_name: str, keys: List[str], field: str) -> int:
+    """
+    Make room for a unique, case-insensitive index on `keys`: within each group
+    of documents equal under CASE_INSENSITIVE, the oldest keeps its value and
+    the others get `field` suffixed with the tail of their id. Nothing is
+    deleted and ids are unchanged, so references keep working. Returns the
+    number of documents renamed; a no-op once the target index exists.
+    """
+    if await _index_in_place(collection, index_name, CASE_INSENSITIVE):
+        return 0
+
+    pipeline = [
+        {"$sort": {"_id": 1}},
+        {"$group": {
+            "_id": {key: f"${key}" for key in keys},
+            "docs": {"$push": {"_id": "$_id", "value": f"${field}"}},
+            "count": {"$sum": 1},
+        }},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+    renamed = 0
+    # The aggregation's collation makes $group compare strings the way the index will
+    async for group in collection.aggregate(pipeline, collation=CASE_INSENSITIVE):
+        docs: List[Dict[str, Any]] = group["docs"]
+        for doc in docs[1:]:
+            value = f"{doc['value']} ({str(doc['_id'])[-6:]})"
+            await collection.update_one({"_id": doc["_id"]}, {"$set": {field: value}})
+            renamed += 1
+            logger.warning(
+                "%s %s: renamed duplicate %s %r to %r before building %s",
+                collection.name, doc["_id"], field, doc["value"], value, index_name
+            )
+    return renamed
+
+
+async def dedupe_otps(collection) -> int:
+    """
+    Make room for the unique index on OTP email: expired codes are deleted and,
+    per email, only the newest code is kept. Codes are short-lived and reissued
+    on request, so losing an older one costs a user at most a resend.
+    """
+    if await _index_in_place(collection, "otp_model_email"):
+        return 0
+
+    result = await collection.delete_many({"expires_at": {"$lte": datetime.now(timezone.utc)}})
+    removed = result.deleted_count
+    pipeline = [
+        {"$sort": {"_id": -1}},
+        {"$group": {"_id": "$email", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+    async for group in collection.aggregate(pipeline):
+        result = await collection.delete_many({"_id": {"$in": group["ids"][1:]}})
+        removed += result.deleted_count
+    if removed:
+        logger.warning("otps: removed %d expired or superseded codes before building otp_model_email", removed)
+    return removed
+
+
+async def prepare_unique_indexes(db) -> None:
+    """
+    Clear data that would stop `init_beanie` from building the unique indexes
+    added or made unique on existing collections. Runs before it on every start;
+    each step returns at once when its index already has the target options.
+    """
+    await rename_case_duplicates(
+        db[Role.Settings.name], "role_model_company_id_name", ["company_id", "name"], "name"
+    )
+    await rename_case_duplicates(
+        db[Plan.Settings.name], "plan_model_name", ["name"], "name"
+    )
+    await dedupe_otps(db[OTP.Settings.name])
@@ -5,9 +5,14 @@ import traceback
 import certifi
 
 from app.core.settings import settings
+from app.core.metrics import PoolMetricsListener
+from app.core.db_tracing import CommandTracer
+from app.db.migrations import prepare_unique_indexes
 
 
 from app.models import MODELS  # Import here to avoid circular imports
+from app.models.slow_query import SlowQuery
+from app.models.profile import Profile
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -29,6 +34,8 @@ class MongoDB:
                 # Motor/PyMongo will use the ssl context via CA file; passing tlsCAFile is enough,
                 # but the context above ensures TLS1.2+.
                 tlsCAFile=certifi.where(),
+                # Pool size and checkout wait for /metrics; per-request command tracing
+                event_listeners=[PoolMetricsListener(), CommandTracer()],
             )
             
             # Test the connection
@@ -44,11 +51,25 @@ class MongoDB:
             traceback.print_exc()
             raise
 
+    async def _ensure_capped_collections(self, db) -> None:
+        """Beanie never creates capped collections; create them before it touches them."""
+        capped = {
+            SlowQuery.Settings.name: settings.SLOW_QUERY_LOG_BYTES,
+            Profile.Settings.name: settings.PROFILE_LOG_BYTES,
+        }
+        existing = set(await db.list_collection_names())
+        for name, size in capped.items():
+            if name not in existing:
+                await db.create_collection(name, capped=True, size=size)
+
     async def _initialize_models(self) -> None:
         """Initialise *all* Beanie models in one shot."""
         db = self.client[settings.MONGO_DB_NAME]
 
         try:
+            await self._ensure_capped_collections(db)
+            await prepare_unique_indexes(db)  # Existing duplicates would fail index builds
+
             logger.info("Initialising Beanie models: %s",
                         [m.__name__ for m in MODELS])
 
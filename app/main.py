@@ -1,23 +1,43 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
+import hmac
 
 from app.api.routes.v1 import api_router
 from app.api.errors import register_exception_handlers
 from app.core.settings import settings
 from app.db.mongodb import mongo
+from app.services.auth.revocation import revocation_list
 from app.middlewares.logging_middleware import LoggingMiddleware
+from app.middlewares.rate_limit_middleware import RateLimitMiddleware
+from app.middlewares.load_shed_middleware import LoadShedMiddleware
+from app.middlewares.metrics_middleware import MetricsMiddleware
+from app.middlewares.profiler_middleware import ProfilerMiddleware
+from app.core.metrics import monitor_event_loop
+from app.core.audit_log import audit_sink
+from app.services.profiler import profiler
+from app.utils.metrics import registry, CONTENT_TYPE
 from app.core.logging_config import setup_logging
 from app.core.rate_limit import limiter, rate_limit_exceeded_handler
-from slowapi.middleware import SlowAPIMiddleware
 from slowapi.errors import RateLimitExceeded
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await mongo.connect()
+    await revocation_list.load()
+    revocation_poller = asyncio.create_task(revocation_list.poll())
+    loop_monitor = asyncio.create_task(monitor_event_loop())
+    audit_sink.start()
+    toggle_poller = asyncio.create_task(profiler.poll()) if settings.PROFILING_ENABLED else None
     yield
+    if toggle_poller:
+        toggle_poller.cancel()
+    loop_monitor.cancel()
+    revocation_poller.cancel()
+    await audit_sink.close()  # Flush buffered audit entries while Mongo is still up
     await mongo.disconnect()
 
 setup_logging()
@@ -28,24 +48,41 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-# CORS
+# On-demand profiling (signed X-Profile header or per-route toggles); left out
+# entirely when disabled
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilerMiddleware)
+
+# app.add_middleware(RoleMiddleware, required_roles=["admin", "user"])
+
+# Load shedding: per-tenant and per-route-class concurrency caps
+app.add_middleware(LoadShedMiddleware)
+
+# Rate limiting: per user/tenant sliding windows shared across workers, plus
+# slowapi's per-route IP limits on the auth endpoints. Added after load shedding
+# so it runs before it and over-quota callers never take a load-shedding slot.
+app.state.limiter = limiter
+app.add_middleware(RateLimitMiddleware)
+app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
+
+# Logging (outside the limiters, so 429s and 503s are logged and carry a request id;
+# the duration includes time spent queued for a load-shedding slot)
+app.add_middleware(LoggingMiddleware)
+
+# Metrics (outside the limiters, so rate-limited and shed requests are counted too)
+app.add_middleware(MetricsMiddleware)
+
+# CORS (added last, so outermost: 429s and 503s from the middlewares above
+# carry the CORS headers too and browsers can read Retry-After)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After", "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-Request-ID"],
 )
 
-# Logging
-app.add_middleware(LoggingMiddleware)
-# app.add_middleware(RoleMiddleware, required_roles=["admin", "user"])
-
-# Rate limiting
-app.state.limiter = limiter
-app.add_middleware(SlowAPIMiddleware)
-app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
-
 # Global exception handlers for services
 register_exception_handlers(app)
 
@@ -62,5 +99,15 @@ async def validation_exception_handler(request, exc):
 async def health():
     return {"status": "ok"}
 
+# Prometheus scrape endpoint; everything is collected in-process. Only served
+# with METRICS_TOKEN set, to scrapers presenting it as a bearer token
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    expected = f"Bearer {settings.METRICS_TOKEN}" if settings.METRICS_TOKEN else None
+    supplied = request.headers.get("authorization", "")
+    if not expected or not hmac.compare_digest(supplied.encode(), expected.encode()):
+        return Response(status_code=404)
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
 # Mount API
 app.include_router(api_router, prefix="/api/v1")
@@ -0,0 +1,236 @@
+import asyncio
+import json
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.settings import settings
+from app.services.auth.token import bearer_claims
+from app.services.rate_limit import claims_tier
+
+# Route classes, matched on the path below /api/v1 (first match wins)
+CHECKOUT_PREFIXES = ("/api/v1/sales", "/api/v1/payment", "/api/v1/subscription", "/api/v1/paystack_webhook")
+AUTH_PREFIX = "/api/v1/auth"
+REPORT_MARKERS = ("/export", "/report", "/bulk", "/diagnostics")
+
+
+def route_class(method: str, path: str) -> str:
+    """checkout, auth, reports (exports, bulk jobs, diagnostics), reads, or admin (other writes)."""
+    if path.startswith(CHECKOUT_PREFIXES):
+        return "checkout"
+    if path.startswith(AUTH_PREFIX):
+        return "auth"
+    if any(marker in path for marker in REPORT_MARKERS):
+        return "reports"
+    if method in ("GET", "HEAD", "OPTIONS"):
+        return "reads"
+    return "admin"
+
+
+class Bulkhead:
+    """
+    Concurrency limit with a short FIFO queue. A released slot is handed to the
+    oldest waiter directly, so a queued request cannot be overtaken.
+    """
+
+    def __init__(self, limit: int, queue_size: int):
+        self.limit = max(1, limit)
+        self.queue_size = queue_size
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def idle(self) -> bool:
+        return not self.in_flight and not self._waiters
+
+    async def acquire(self, timeout: float) -> bool:
+        """Take a slot, waiting at most `timeout` seconds; False means shed."""
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return True
+        if len(self._waiters) >= self.queue_size or timeout <= 0:
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait({waiter}, timeout=timeout)
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # Handed a slot just as the client went away
+            else:
+                self._discard(waiter)
+            raise
+        if waiter.done():
+            return True
+        self._discard(waiter)
+        return False
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)  # Slot passes over; in_flight unchanged
+                return
+        self.in_flight -= 1
+
+    def _discard(self, waiter: asyncio.Future) -> None:
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+
+class LoadShedder:
+    """
+    Bulkheads per (tenant, route class) and per route class, plus shed counters.
+    Metric counters are keyed by (limit hit, route class, tenant tier), which
+    stays bounded however many tenants and client IPs come through; which
+    tenants are being shed is tallied separately for the `top_tenants` count
+    most shed, everyone else adding to "other".
+    """
+
+    def __init__(self, top_tenants: int = settings.LOAD_SHED_TOP_TENANTS):
+        self._tenants: Dict[Tuple[str, str], Bulkhead] = {}
+        self._classes: Dict[str, Bulkhead] = {}
+        self.shed: Counter = Counter()  # ("tenant" | "class", route class, tier) -> requests shed
+        self.shed_tenants: Counter = Counter()  # Tenant -> requests shed, at most `top_tenants` + "other"
+        self.top_tenants = top_tenants
+
+    def _count_shed(self, limit: str, tenant: str, klass: str, tier: str) -> None:
+        self.shed[(limit, klass, tier)] += 1
+        if tenant in self.shed_tenants or len(self.shed_tenants) < self.top_tenants:
+            self.shed_tenants[tenant] += 1
+        else:
+            self.shed_tenants["other"] += 1
+
+    async def _take(self, registry: dict, key, limit: int, deadline: float) -> bool:
+        bulkhead = registry.get(key)
+        if bulkhead is None:
+            bulkhead = registry[key] = Bulkhead(limit, settings.LOAD_SHED_QUEUE_SIZE)
+        try:
+            return await bulkhead.acquire(deadline - time.monotonic())
+        finally:
+            if bulkhead.idle:
+                registry.pop(key, None)
+
+    def _release(self, registry: dict, key) -> None:
+        bulkhead = registry[key]
+        bulkhead.release()
+        if bulkhead.idle:
+            del registry[key]  # Tenants come and go; keep only busy ones
+
+    async def acquire(self, tenant: str, klass: str, tier: str = "anonymous") -> bool:
+        """Both the tenant's and the class's slot within one wait budget, or neither."""
+        deadline = time.monotonic() + settings.LOAD_SHED_MAX_WAIT_MS.get(klass, 250) / 1000
+        tenant_key = (tenant, klass)
+        tenant_limit = settings.LOAD_SHED_TENANT_LIMITS.get(klass)
+        class_limit = settings.LOAD_SHED_CLASS_LIMITS.get(klass)
+
+        if tenant_limit and not await self._take(self._tenants, tenant_key, tenant_limit, deadline):
+            self._count_shed("tenant", tenant, klass, tier)
+            return False
+        try:
+            admitted = not class_limit or await self._take(self._classes, klass, class_limit, deadline)
+        except BaseException:
+            if tenant_limit:
+                self._release(self._tenants, tenant_key)
+            raise
+        if not admitted:
+            if tenant_limit:
+                self._release(self._tenants, tenant_key)
+            self._count_shed("class", tenant, klass, tier)
+        return admitted
+
+    def release(self, tenant: str, klass: str) -> None:
+        if settings.LOAD_SHED_CLASS_LIMITS.get(klass):
+            self._release(self._classes, klass)
+        if settings.LOAD_SHED_TENANT_LIMITS.get(klass):
+            self._release(self._tenants, (tenant, klass))
+
+    def stats(self) -> dict:
+        in_flight: Counter = Counter()
+        queued: Counter = Counter()
+        for klass, bulkhead in self._classes.items():
+            in_flight[klass] += bulkhead.in_flight
+            queued[klass] += bulkhead.queued
+        shed = [
+            {"limit": limit, "route_class": klass, "tier": tier, "count": count}
+            for (limit, klass, tier), count in self.shed.items()
+        ]
+        return {
+            "in_flight": dict(in_flight),
+            "queued": dict(queued),
+            "busy_tenants": len({tenant for tenant, _ in self._tenants}),
+            "shed": shed,
+            "shed_tenants": dict(self.shed_tenants.most_common()),
+        }
+
+
+load_shedder = LoadShedder()
+
+
+def load_shed_stats() -> dict:
+    return load_shedder.stats()
+
+
+class LoadShedMiddleware:
+    """
+    Holds a slot of the caller's tenant and route class for the whole request,
+    streamed bodies included, so one tenant's exports or bulk imports cannot
+    starve everyone else's checkout. Requests that cannot get a slot within
+    their class's wait target get an immediate 503 with Retry-After.
+    Unauthenticated callers are grouped per client IP rather than into one
+    shared tenant, so a login burst from many shops is not capped as one.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        shedder: Optional[LoadShedder] = None,
+        exempt_paths: tuple = ("/health", "/metrics")
+    ):
+        self.app = app
+        self.shedder = shedder or load_shedder
+        self.exempt_paths = set(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        claims = bearer_claims(headers.get(b"authorization", b"").decode("latin-1"))
+        client = scope.get("client")
+        tenant = str((claims or {}).get("company_id") or f"ip:{client[0] if client else 'unknown'}")
+        klass = route_class(scope["method"], scope["path"])
+        tier = await claims_tier(claims)  # Cached; the rate limiter resolved it just before
+
+        if not await self.shedder.acquire(tenant, klass, tier):
+            await self._reject(send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.shedder.release(tenant, klass)
+
+    @staticmethod
+    async def _reject(send: Send) -> None:
+        body = json.dumps({"detail": "Server busy, please retry"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", b"1"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -1,13 +1,82 @@
-from time import time
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi import Request
+import random
+import time
+import uuid
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
 from app.core.logger import logger  # Unified import
+from app.core.db_tracing import CommandTrace, current_trace
+from app.core.settings import settings
+from app.services.auth.token import bearer_claims
+
+
+class LoggingMiddleware:
+    """
+    Access log as one structured record per request: request id, tenant, user,
+    route template, status, duration and the Mongo commands it issued. Pure
+    ASGI, so response bodies pass straight through. The request id is taken
+    from `X-Request-ID` when the client sends one, exposed as
+    `request.state.request_id` and echoed back. Command count, DB time and the
+    slowest command also go out as `Server-Timing` (as of the response headers).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        headers = dict(scope.get("headers") or [])
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1")[:64] or uuid.uuid4().hex
+        scope.setdefault("state", {})["request_id"] = request_id
+        status_code = 500  # Reported if the app raises before starting a response
+        trace = CommandTrace()
+        token = current_trace.set(trace)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = [
+                    *message["headers"],
+                    (b"x-request-id", request_id.encode("latin-1")),
+                    (b"server-timing", trace.server_timing().encode("latin-1", "replace")),
+                ]
+            await send(message)
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time()
-        response = await call_next(request)
-        process_time = round(time() - start_time, 4)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_trace.reset(token)
+            duration_ms = (time.perf_counter() - start_time) * 1000
+            route = scope.get("route")
+            template = getattr(route, "path_format", None) or getattr(route, "path", None) or scope["path"]
+            if self._should_log(template, status_code, duration_ms, trace):
+                claims = bearer_claims(headers.get(b"authorization", b"").decode("latin-1")) or {}
+                logger.info(
+                    "%s %s %s", scope["method"], template, status_code,
+                    extra={"fields": {
+                        "request_id": request_id,
+                        "method": scope["method"],
+                        "route": template,
+                        "path": scope["path"],
+                        "status": status_code,
+                        "duration_ms": round(duration_ms, 2),
+                        "tenant": claims.get("company_id"),
+                        "user": claims.get("sub"),
+                        **trace.fields(),
+                    }}
+                )
 
-        logger.info(f"{request.method} {request.url} - {response.status_code} - {process_time}s")
-        return response
+    @staticmethod
+    def _should_log(template: str, status_code: int, duration_ms: float, trace: CommandTrace) -> bool:
+        if status_code >= 400 or duration_ms >= settings.ACCESS_LOG_SLOW_MS:
+            return True
+        if trace.count >= settings.ACCESS_LOG_CHATTY_COMMANDS:
+            return True
+        rate = settings.ACCESS_LOG_ROUTE_SAMPLE_RATES.get(template, settings.ACCESS_LOG_SAMPLE_RATE)
+        return rate >= 1 or random.random() < rate
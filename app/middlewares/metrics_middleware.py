@@ -0,0 +1,59 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import HTTP_IN_FLIGHT, HTTP_LATENCY, HTTP_REQUESTS
+from app.middlewares.load_shed_middleware import route_class
+from app.services.auth.token import bearer_claims
+from app.services.rate_limit import claims_tier
+
+
+class MetricsMiddleware:
+    """
+    Request count, latency histogram and in-flight gauge for `/metrics`. Routes
+    are labelled by template and tenants by tier, which keeps cardinality low.
+    """
+
+    def __init__(self, app: ASGIApp, exempt_paths: tuple = ("/metrics",)):
+        self.app = app
+        self.exempt_paths = set(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        klass = route_class(scope["method"], scope["path"])
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(route_class=klass)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec(route_class=klass)
+            duration = time.perf_counter() - started
+            route = scope.get("route")
+            # Unmatched paths share one label instead of one series per URL
+            template = getattr(route, "path_format", None) or "unmatched"
+            labels = {
+                "route": template,
+                "method": scope["method"],
+                "status": f"{status_code // 100}xx",
+                "tier": await self._tier(scope),
+            }
+            HTTP_REQUESTS.inc(**labels)
+            HTTP_LATENCY.observe(duration, **labels)
+
+    @staticmethod
+    async def _tier(scope: Scope) -> str:
+        headers = dict(scope.get("headers") or [])
+        claims = bearer_claims(headers.get(b"authorization", b"").decode("latin-1"))
+        # Warm from the rate limiter, which resolves the tier on the way in
+        return await claims_tier(claims)
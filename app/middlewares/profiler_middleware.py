@@ -0,0 +1,56 @@
+from beanie import PydanticObjectId
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.auth.token import bearer_claims
+from app.services.profiler import profiler
+
+
+class ProfilerMiddleware:
+    """
+    Runs requests picked by `profiler.trigger` (signed X-Profile header, or a
+    per-route toggle) under the stack sampler and answers with `X-Profile-Id`,
+    the id to download the profile by from /diagnostics/profiles. Everything
+    else passes straight through. Sits inside LoggingMiddleware so the request
+    id is known, and inside the limiters so queueing time is not profiled.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        trigger = profiler.trigger(scope) if scope["type"] == "http" else None
+        sampler = profiler.start() if trigger else None
+        if sampler is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = PydanticObjectId()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-profile-id", str(profile_id).encode("latin-1")),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            headers = dict(scope.get("headers") or [])
+            claims = bearer_claims(headers.get(b"authorization", b"").decode("latin-1")) or {}
+            route = scope.get("route")
+            profiler.finish(
+                sampler,
+                id=profile_id,
+                trigger=trigger,
+                method=scope["method"],
+                route=getattr(route, "path_format", None),
+                path=scope["path"],
+                status=status_code,
+                request_id=scope.get("state", {}).get("request_id"),
+                user_id=claims.get("sub"),
+            )
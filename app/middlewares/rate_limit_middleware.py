@@ -0,0 +1,81 @@
+import json
+import logging
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.rate_limit import SlidingWindowLimiter, RateLimitResult, rate_limiter
+from app.services.rate_limit import request_limits
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitMiddleware:
+    """
+    Counts every HTTP request against the per-user and per-tenant (or per-IP)
+    sliding windows of `request_limits` and answers 429 once one is exhausted.
+    If the counter store is unreachable requests are let through.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: SlidingWindowLimiter = rate_limiter,
+        exempt_paths: tuple = ("/health", "/metrics")
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.exempt_paths = set(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        authorization = headers.get(b"authorization", b"").decode("latin-1")
+        client = scope.get("client")
+
+        try:
+            # One concurrent round trip for the user and tenant buckets; headers report the tightest
+            result = await self.limiter.hit_all(
+                await request_limits(authorization, client[0] if client else None)
+            )
+        except Exception:
+            logger.warning("Rate limiter unavailable; letting request through", exc_info=True)
+            result = None
+
+        if result is not None and not result.allowed:
+            await self._reject(send, result)
+            return
+        if result is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], *self._headers(result)]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    @staticmethod
+    def _headers(result: RateLimitResult) -> list:
+        return [
+            (b"x-ratelimit-limit", str(result.limit).encode()),
+            (b"x-ratelimit-remaining", str(result.remaining).encode()),
+        ]
+
+    async def _reject(self, send: Send, result: RateLimitResult) -> None:
+        body = json.dumps({"detail": "Rate limit exceeded. Please try again later."}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(result.retry_after).encode()),
+                *self._headers(result),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
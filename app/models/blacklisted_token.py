@@ -1,29 +1,33 @@
 from datetime import datetime, timezone
+from typing import Optional
 from beanie import Document
+from pydantic import Field
 from pymongo import ASCENDING, IndexModel
 
 class BlacklistedToken(Document):
-  token: str
+  token_hash: Optional[str] = None  # sha256 of the JWT; acts as its jti
+  token: Optional[str] = None  # Legacy rows only; new rows never store the raw token
   expires_at: datetime  # Same expiry as JWT
-  created_at: datetime = datetime.now(timezone.utc)  # For cleanup monitoring
+  created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))  # Polled by the revocation list
 
   class Settings:
     name = "blacklisted_tokens"
     indexes = [
       IndexModel(
-          [("token", ASCENDING), ("expires_at", ASCENDING)],
-          name="blacklistedtoken_model_token_expires_at"
-          ),
+          [("token_hash", ASCENDING)],
+          name="blacklistedtoken_model_token_hash"
+          ),  # For fast lookup
       IndexModel(
           [("expires_at", ASCENDING)],
+          expireAfterSeconds=0,
           name="blacklistedtoken_model_expires_at"
-          ),  # For TTL index
+          ),  # TTL: Mongo drops rows once the JWT itself has expired
       IndexModel(
           [("token", ASCENDING)],
           name="blacklistedtoken_model_token"
-          ),  # For fast lookup
+          ),
       IndexModel(
           [("created_at", ASCENDING)],
           name="blacklistedtoken_model_created_at"
       )
-    ]
\ No newline at end of file
+    ]
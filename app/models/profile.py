@@ -0,0 +1,29 @@
+from datetime import datetime, timezone
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from typing import Optional
+
+
+class Profile(Document):
+    """
+    One request run under the stack sampler, as collapsed stacks ("frame;frame;... count"
+    per line, readable by flamegraph.pl and speedscope). Lives in a capped
+    collection (see `MongoDB._ensure_capped_collections`).
+    """
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    trigger: str  # "header" (signed X-Profile) or "toggle" (per-route sampling)
+    method: str
+    route: Optional[str] = None  # Route template; None when no route matched
+    path: str
+    status: int
+    request_id: Optional[str] = None
+    user_id: Optional[PydanticObjectId] = None
+    duration_ms: float
+    interval_ms: float
+    samples: int  # Total; duration_ms / interval_ms unless the loop was blocked
+    running_samples: int  # Taken while the request was executing on the event loop
+    stacks: int  # Distinct stacks kept in `collapsed`
+    collapsed: str
+
+    class Settings:
+        name = "profiles"
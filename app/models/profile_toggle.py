@@ -0,0 +1,30 @@
+from datetime import datetime, timezone
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+from typing import Optional
+
+
+class ProfileToggle(Document):
+    """Profile one request in `every` to a route template until `expires_at`."""
+    route: str  # Route template, e.g. "/api/v1/sales/{sale_id}"
+    method: str = "*"  # HTTP method, or "*" for all
+    every: int = 1
+    expires_at: datetime
+    created_by: Optional[PydanticObjectId] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "profile_toggles"
+        indexes = [
+            IndexModel(
+                [("route", ASCENDING), ("method", ASCENDING)],
+                unique=True,
+                name="profiletoggle_model_route_method"
+            ),
+            IndexModel(
+                [("expires_at", ASCENDING)],
+                expireAfterSeconds=0,
+                name="profiletoggle_model_expires_at"
+            ),  # TTL: toggles switch themselves off
+        ]
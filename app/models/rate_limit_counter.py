@@ -0,0 +1,26 @@
+from datetime import datetime
+from beanie import Document
+from pymongo import ASCENDING, IndexModel
+
+
+class RateLimitCounter(Document):
+    """Requests counted for one limiter key in one fixed window, shared by every worker."""
+    key: str  # e.g. "user:<id>", "tenant:<id>", "ip:<addr>"
+    window: int  # Window start, in seconds since the epoch
+    hits: int = 0
+    expires_at: datetime  # End of the following window; the sliding estimate needs it until then
+
+    class Settings:
+        name = "rate_limit_counters"
+        indexes = [
+            IndexModel(
+                [("key", ASCENDING), ("window", ASCENDING)],
+                unique=True,
+                name="ratelimitcounter_model_key_window"
+            ),
+            IndexModel(
+                [("expires_at", ASCENDING)],
+                expireAfterSeconds=0,
+                name="ratelimitcounter_model_expires_at"
+            ),  # TTL: old windows drop out on their own
+        ]
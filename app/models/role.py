@@ -19,7 +19,14 @@ class Role(Document, TimeStampMixin):
         name = "roles"
         indexes = [        
             IndexModel([("name", ASCENDING), ("status", ASCENDING), ("company_id", ASCENDING)], name="role_model_name_status_company_id"),
-            IndexModel([("company_id", ASCENDING)], name="role_company_id_idx")
+            IndexModel([("company_id", ASCENDING)], name="role_company_id_idx"),
+            # Lets CRUD.update detect duplicate names from the write itself
+            IndexModel(
+                [("company_id", ASCENDING), ("name", ASCENDING)],
+                name="role_model_company_id_name",
+                unique=True,
+                collation={"locale": "en", "strength": 2}
+            ),
         ]
 
     model_config = {
@@ -0,0 +1,30 @@
+from datetime import datetime, timezone
+from beanie import Document
+from pydantic import Field
+from typing import Any, Dict, List, Optional
+
+
+class SlowQuery(Document):
+    """
+    One CRUD call that exceeded SLOW_QUERY_MS, with the plan MongoDB chose for it.
+    Lives in a capped collection (see `MongoDB._ensure_capped_collections`).
+    """
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    model: str  # Beanie document class
+    operation: str  # CRUD method: get_by_id, list, count, update, ...
+    duration_ms: float
+    filter_shape: Optional[Dict[str, Any]] = None  # Filter with every value replaced by its type
+    sort: Optional[List[Any]] = None
+    collation: Optional[Dict[str, Any]] = None
+
+    # From explain("executionStats"); empty when the operation could not be explained
+    explained: Optional[str] = None  # Always a find; for writes and counts, one with the same filter
+    plan: Optional[str] = None  # "IXSCAN", "COLLSCAN", "IDHACK", ...
+    stages: List[str] = Field(default_factory=list)
+    index_names: List[str] = Field(default_factory=list)
+    keys_examined: Optional[int] = None
+    docs_examined: Optional[int] = None
+    n_returned: Optional[int] = None
+
+    class Settings:
+        name = "slow_queries"
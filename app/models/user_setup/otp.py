@@ -1,5 +1,6 @@
 from beanie import Document
 from pydantic import EmailStr, Field
+from pymongo import ASCENDING, IndexModel
 from datetime import datetime, timezone
 
 
@@ -12,3 +13,15 @@ class OTP(Document):
 
     class Settings:
         name = "otps"
+        indexes = [
+            IndexModel(
+                [("email", ASCENDING)],
+                unique=True,
+                name="otp_model_email"
+            ),  # One live code per email; issuance upserts on it
+            IndexModel(
+                [("expires_at", ASCENDING)],
+                expireAfterSeconds=0,
+                name="otp_model_expires_at"
+            ),  # TTL: Mongo drops codes once they expire
+        ]
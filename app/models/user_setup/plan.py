@@ -28,7 +28,12 @@ class Plan(Document, TimeStampMixin):
     class Settings:
         name = "plans"
         indexes = [
-            IndexModel([("name", ASCENDING)], name="plan_model_name"),
+            IndexModel(
+                [("name", ASCENDING)],
+                name="plan_model_name",
+                unique=True,
+                collation={"locale": "en", "strength": 2}
+            ),
             IndexModel([("tier", ASCENDING)], name="plan_model_tier"),
             IndexModel([("price", ASCENDING)], name="plan_model_price"),
         ]
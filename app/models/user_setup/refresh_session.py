@@ -0,0 +1,36 @@
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+from typing import Optional
+from datetime import datetime, timezone
+
+
+class RefreshSession(Document):
+    """One row per signed-in device; the refresh JWT itself is never stored."""
+    token_hash: str  # sha256 of the current refresh JWT; replaced on every refresh
+    user_id: PydanticObjectId
+    company_id: PydanticObjectId
+    device: Optional[str] = Field(None, max_length=256, description="User agent of the terminal")
+    ip_address: Optional[str] = None
+    expires_at: datetime
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    last_used_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "refresh_sessions"
+        indexes = [
+            IndexModel(
+                [("token_hash", ASCENDING)],
+                unique=True,
+                name="refreshsession_model_token_hash"
+            ),  # Refresh and logout are a single indexed lookup
+            IndexModel(
+                [("user_id", ASCENDING)],
+                name="refreshsession_model_user_id"
+            ),  # Logout everywhere
+            IndexModel(
+                [("expires_at", ASCENDING)],
+                expireAfterSeconds=0,
+                name="refreshsession_model_expires_at"
+            ),  # TTL: Mongo drops sessions once their refresh token expires
+        ]
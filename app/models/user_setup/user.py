@@ -41,8 +41,7 @@ class User(Document, TimeStampMixin):
     role:  Union[UserRole, RoleStr] = UserRole.CASHIER
     permissions: Set[str] = Field(default_factory=set)   
 
-    refresh_token: Optional[str] = None
-    refresh_token_expires_at: Optional[datetime] = None
+    token_version: int = Field(0, description="Embedded in every JWT as `ver`; bumping it revokes all of them")
 
     is_verified: bool = Field(False, description="Extra checks needed for higher access")
     reset_password: bool = Field(True, description="Request user to change their password")
@@ -1,7 +1,10 @@
-from pydantic import BaseModel, Field, ConfigDict
+from typing import Generic, List, Optional, TypeVar
+from pydantic import BaseModel, Field, ConfigDict, computed_field
 from beanie import PydanticObjectId
 from bson import ObjectId
 
+from app.core.settings import settings
+
 class BaseResponse(BaseModel):
     # accept ObjectId on input, but expose it under `id`
     id: PydanticObjectId = Field(alias="_id")
@@ -14,3 +17,64 @@ class BaseResponse(BaseModel):
             PydanticObjectId: str,
         },
     )
+
+
+T = TypeVar("T")
+CreateT = TypeVar("CreateT")
+UpdateT = TypeVar("UpdateT")
+
+
+class Page(BaseModel, Generic[T]):
+    """Envelope returned by list endpoints."""
+    items: List[T]
+    total: Optional[int] = Field(
+        default=None,
+        description="Number of matching documents; only set when a total was requested"
+    )
+    total_estimated: bool = Field(
+        default=False,
+        description="True when `total` is an estimate or a lower bound"
+    )
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Opaque cursor for the next page; null when there are no more results"
+    )
+
+
+
+class BulkUpdateItem(BaseModel, Generic[UpdateT]):
+    id: PydanticObjectId
+    data: UpdateT
+
+
+class BulkRequest(BaseModel, Generic[CreateT, UpdateT]):
+    """
+    Body of the `POST /{resource}/bulk` endpoints; every section is optional.
+    Sections over BULK_MAX_ITEMS are refused at validation, before any work
+    (such as password hashing) is done for them.
+    """
+    create: List[CreateT] = Field(default_factory=list, max_length=settings.BULK_MAX_ITEMS)
+    update: List[BulkUpdateItem[UpdateT]] = Field(default_factory=list, max_length=settings.BULK_MAX_ITEMS)
+    soft_delete: List[PydanticObjectId] = Field(default_factory=list, max_length=settings.BULK_MAX_ITEMS)
+
+
+class BulkItemResult(BaseModel):
+    op: str = Field(..., description="create, update or soft_delete")
+    index: int = Field(..., description="Position of the item in its section of the request")
+    id: Optional[PydanticObjectId] = None
+    ok: bool
+    error: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    results: List[BulkItemResult] = Field(default_factory=list)
+
+    @computed_field
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for r in self.results if r.ok)
+
+    @computed_field
+    @property
+    def failed(self) -> int:
+        return sum(1 for r in self.results if not r.ok)
@@ -3,6 +3,8 @@ from pydantic import BaseModel, Field, AnyUrl
 from typing import Optional, List
 from datetime import datetime
 
+from app.schemas.base import Page
+
 class CategoryBase(BaseModel):
     name: str
     code: str
@@ -36,7 +38,5 @@ class CategoryResponse(CategoryBase):
     class Config:
         from_attributes = True
 
-class CategoryListResponse(BaseModel):
-    """Paginated response for categories."""
-    total: int
-    items: List[CategoryResponse]
\ No newline at end of file
+class CategoryListResponse(Page[CategoryResponse]):
+    """Paginated response for categories."""
\ No newline at end of file
@@ -0,0 +1,45 @@
+from typing import Optional
+from datetime import datetime
+
+from beanie import PydanticObjectId
+from pydantic import BaseModel, Field
+
+from app.schemas.base import BaseResponse
+
+
+class ProfileResponse(BaseResponse):
+    timestamp: datetime
+    trigger: str
+    method: str
+    route: Optional[str] = None
+    path: str
+    status: int
+    request_id: Optional[str] = None
+    user_id: Optional[PydanticObjectId] = None
+    duration_ms: float
+    interval_ms: float
+    samples: int
+    running_samples: int
+    stacks: int
+
+
+class ProfileToggleCreate(BaseModel):
+    route: str = Field(..., description="Route template, e.g. `/api/v1/sales/{sale_id}`")
+    method: str = Field("*", description="HTTP method, or `*` for all")
+    every: int = Field(1, ge=1, le=10000, description="Profile one request in N")
+    minutes: int = Field(15, ge=1, le=1440, description="Switch off after this long")
+
+
+class ProfileToggleResponse(BaseResponse):
+    route: str
+    method: str
+    every: int
+    expires_at: datetime
+    created_by: Optional[PydanticObjectId] = None
+    created_at: datetime
+
+
+class ProfileHeaderResponse(BaseModel):
+    header: str = "X-Profile"
+    value: str
+    expires_at: datetime
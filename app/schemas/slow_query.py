@@ -0,0 +1,21 @@
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+from app.schemas.base import BaseResponse
+
+
+class SlowQueryResponse(BaseResponse):
+    timestamp: datetime
+    model: str
+    operation: str
+    duration_ms: float
+    filter_shape: Optional[Dict[str, Any]] = None
+    sort: Optional[List[Any]] = None
+    collation: Optional[Dict[str, Any]] = None
+    explained: Optional[str] = None
+    plan: Optional[str] = None
+    stages: List[str] = []
+    index_names: List[str] = []
+    keys_examined: Optional[int] = None
+    docs_examined: Optional[int] = None
+    n_returned: Optional[int] = None
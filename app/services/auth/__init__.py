@@ -5,7 +5,8 @@ from app.services.auth.token import (
 
 # password
 from app.services.auth.password import (
-  get_password_hash, verify_password, reset_password
+  get_password_hash, hash_passwords, verify_password, verify_and_update_password,
+  reset_password, password_hash_stats
 )
 
 # otp
@@ -17,7 +18,15 @@ from app.services.auth.user_auth import (
 )
 
 # logout
-from app.services.auth.logout import logout, cleanup_expired_tokens
+from app.services.auth.logout import (
+  logout, logout_everywhere, revoke_user_tokens, cleanup_expired_tokens
+)
+
+# sessions
+from app.services.auth.session import open_session, rotate_session, close_session
+
+# revocation
+from app.services.auth.revocation import is_token_revoked, revoke_token
 
 # dependencies
 from app.services.auth.dependencies import (
@@ -28,5 +37,7 @@ from app.services.auth.dependencies import (
     oauth2_scheme,
     require_permissions,
     require_roles_or_permissions,
-    get_current_user_id
+    get_current_user_id,
+    get_current_principal,
+    get_auth_context
 )
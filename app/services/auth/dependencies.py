@@ -1,16 +1,19 @@
+from dataclasses import dataclass
+from typing import Any, Dict
+
 from beanie import PydanticObjectId
 from fastapi import Depends, Request
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError
 import hashlib
 import hmac, logging
 
 from app.models.user_setup.user import User
-from app.models.blacklisted_token import BlacklistedToken 
-from app.models.user_setup.tenant import Tenant
 
-from app.services.exceptions import  ValidationError, UnAuthorized, NotFoundError
+from app.services.exceptions import UnAuthorized, NotFoundError
 from app.services.auth.token import decode_token
+from app.services.auth.revocation import is_token_revoked
+from app.services.auth.principal import Principal, load_principal
+from app.services.auth.permission_bits import permission_index
 
 from app.constants import LogLevel
 
@@ -23,66 +26,63 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 xlog = logging.getLogger("paystack")
 
-async def get_current_company(token: str = Depends(oauth2_scheme)) -> PydanticObjectId:
-    try:
-        payload = decode_token(token)
-    except JWTError:
-        raise ValidationError("Invalid token")
-    except Exception:
-        raise
-    
-    company_id = payload.get("company_id")
-    if not company_id:
-        raise ValidationError("User not assigned to a company")
-    
-    try:
-        oid = PydanticObjectId(company_id)
-    except Exception:
-        raise ValidationError("Invalid company identifier")
-    
-    tenant = await Tenant.find_one({"_id": oid})
-    if not tenant:
-        raise NotFoundError("Tenant not found")
-    return oid
+@dataclass
+class AuthContext:
+    token: str
+    payload: Dict[str, Any]
 
-async def get_current_user_id(token: str = Depends(oauth2_scheme)) -> PydanticObjectId:
-    try:
-        payload = decode_token(token)
-    except JWTError:
-        raise ValidationError("Invalid token")
-    except Exception:
-        raise
-    
-    user_id = payload.get("sub")
+
+async def get_auth_context(request: Request, token: str = Depends(oauth2_scheme)) -> AuthContext:
+    """
+    Revocation-check and decode the bearer token once per request; every other
+    auth dependency builds on this one.
+    """
+    context = getattr(request.state, "auth", None)
+    if context is not None and context.token == token:
+        return context
+
+    # 1. Check if token is blacklisted (in memory; Mongo only before the list is loaded)
+    if await is_token_revoked(token):
+        raise UnAuthorized("Token revoked")
+
+    # 2. Decode token
+    context = AuthContext(token=token, payload=decode_token(token))
+    request.state.auth = context
+    return context
+
+
+async def get_current_principal(context: AuthContext = Depends(get_auth_context)) -> Principal:
+    """Caller's id, tenant, role and permissions; served from the principal cache."""
+    user_id = context.payload.get("sub")
     if not user_id:
-        raise ValidationError("Invalid token")
-    
+        raise UnAuthorized("Invalid token. User ID not found.")
+
     try:
         oid = PydanticObjectId(user_id)
     except Exception:
-        raise ValidationError("Invalid user identifier")
-
-    return oid 
+        raise UnAuthorized("Invalid token. User ID not found.")
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
-     # 1. Check if token is blacklisted
-    if await BlacklistedToken.find_one({"token": token}):
+    principal = await load_principal(oid)
+    if context.payload.get("ver", 0) != principal.token_version:
         raise UnAuthorized("Token revoked")
+    if principal.is_deleted or not principal.is_active:
+        raise UnAuthorized("Your account has been disabled. Contact your administrator.")
+    return principal
 
-    # 2. Decode token and extract user ID
-    payload = decode_token(token)
-    user_id = payload.get("sub")
-    if not user_id:
-        raise UnAuthorized("Invalid token. User ID not found.")
 
-    # 3. Lookup user by ID
-    user = await User.get(user_id)
+async def get_current_company(principal: Principal = Depends(get_current_principal)) -> PydanticObjectId:
+    if principal.tenant_status is None:
+        raise NotFoundError("Tenant not found")
+    return principal.company_id
+
+async def get_current_user_id(principal: Principal = Depends(get_current_principal)) -> PydanticObjectId:
+    return principal.id
+
+async def get_current_user(principal: Principal = Depends(get_current_principal)) -> User:
+    """The full `User` document; prefer `get_current_principal` unless you need it."""
+    user = await User.get(principal.id)
     if not user:
         raise UnAuthorized("User not found")
-    
-    if not user.company_id:
-            raise ValidationError("User not assigned to a company")
-
     return user
 
 async def get_current_token(token: str = Depends(oauth2_scheme)) -> str:
@@ -104,8 +104,10 @@ async def get_current_token(token: str = Depends(oauth2_scheme)) -> str:
 #         return False
 
 def require_permission(permission: str):
-    async def dependency(current_user: User = Depends(get_current_user)):
-        if permission not in current_user.permissions:
+    required = permission_index.required(permission)
+
+    async def dependency(current_user: Principal = Depends(get_current_principal)):
+        if not current_user.mask & required:
             raise UnAuthorized(f"Missing permission: {permission}")
         return current_user
     return dependency
@@ -113,15 +115,13 @@ def require_permission(permission: str):
 
 def require_permissions(*required_permissions: str):
     """
-    Checks if user has ANY of the required permissions
-    (User model must have permissions: List[str] field)
+    Checks if user has ANY of the required permissions.
+    `*`/`super_admin` holders pass every check (their mask has all bits set).
     """
-    async def wrapper(user = Depends(get_current_user)):
-        # If user has super_admin, skip check
-        if "super_admin" in user.permissions:
-            return user
-        
-        if not any(perm in user.permissions for perm in required_permissions):
+    required = permission_index.required(*required_permissions)
+
+    async def wrapper(user: Principal = Depends(get_current_principal)):
+        if not user.mask & required:
             raise UnAuthorized( f"Requires any of: {', '.join(required_permissions)}" )
         return user
     return wrapper
@@ -129,15 +129,13 @@ def require_permissions(*required_permissions: str):
 # usage:
 # Depends(require_roles_or_permissions("admin", "user:create","*"))
 def require_roles_or_permissions(*allowed: str):
-    async def checker(current_user: User = Depends(get_current_user), request: Request = None):
-        # App Administrator only
-        if "*" in current_user.permissions:
-            return current_user.id
+    # Each name may be a permission or a role; compiled once per route
+    required = permission_index.required(*allowed, roles=True)
 
-        # Check normal permissions and roles
-        if not any((p in current_user.permissions) or (current_user.role == p) for p in allowed):            
+    async def checker(current_user: Principal = Depends(get_current_principal), request: Request = None):
+        if not current_user.mask & required:
             audit_log_bg(request, LogLevel.SECURITY, exc="You do not have the required privileges")
             raise UnAuthorized("You do not have the required privileges")
 
         return current_user.id
-    return checker
\ No newline at end of file
+    return checker
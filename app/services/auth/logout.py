@@ -1,20 +1,66 @@
 from datetime import datetime, timezone
+from typing import Optional
+
+from beanie import PydanticObjectId
+from pymongo import ReturnDocument
 
 from app.models.blacklisted_token import BlacklistedToken
+from app.models.user_setup.user import User
+
+from app.services.crud_services import CRUD
+from app.services.exceptions import NotFoundError, ValidationError
+from app.services.auth.token import bearer_claims, decode_token
+from app.services.auth.revocation import revoke_token
+from app.services.auth.session import close_session, close_user_sessions
+
+crud = CRUD(User)
+
 
-from app.services.auth.token import decode_token
+async def revoke_user_tokens(user_id: PydanticObjectId) -> int:
+    """
+    Invalidate every access and refresh token issued to the user so far with one
+    atomic `$inc` of `token_version`; returns the new version to sign with.
+    Other workers notice once their cached principal expires.
+    """
+    doc = await User.get_motor_collection().find_one_and_update(
+        {"_id": user_id},
+        {"$inc": {"token_version": 1}},
+        projection={"token_version": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if not doc:
+        raise NotFoundError("User not found")
+    crud.invalidate(user_id)  # Drops the cached principal
+    await close_user_sessions(user_id)
+    return doc["token_version"]
 
 
-async def logout(refresh_token: str) -> dict[str, str]:
-    # Decode token to get expiry time
+async def logout(refresh_token: str, authorization: Optional[str] = None) -> dict[str, str]:
+    """
+    Sign out one device. Its refresh session ends, and the access token it sent
+    in `authorization`, if any, is blacklisted until it expires so it stops
+    working now rather than at expiry. Other devices stay signed in.
+    """
     decoded = decode_token(refresh_token)
-    expires_at = datetime.fromtimestamp(decoded["exp"])
+    if decoded.get("type") != "refresh_token":
+        raise ValidationError("Invalid refresh token")
 
-    # Store in MongoDB
-    await BlacklistedToken(token=refresh_token, expires_at=expires_at).insert()
-    
+    await close_session(refresh_token)
+
+    access = bearer_claims(authorization)
+    if access and access.get("type") == "access_token" and access.get("sub") == decoded.get("sub"):
+        await revoke_token(
+            authorization.partition(" ")[2],
+            datetime.fromtimestamp(access["exp"], timezone.utc)
+        )
     return {"message": "Logged out successfully"}
 
-# Run in cron
+
+async def logout_everywhere(user_id: PydanticObjectId) -> dict[str, str]:
+    await revoke_user_tokens(user_id)
+    return {"message": "Logged out of all sessions"}
+
+
+# Legacy blacklist rows; the TTL index on `expires_at` already drops them. Kept for manual cleanup
 async def cleanup_expired_tokens():
     await BlacklistedToken.find({"expires_at": {"$lt": datetime.now(timezone.utc)}}).delete()
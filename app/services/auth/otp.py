@@ -1,5 +1,7 @@
 import secrets
 from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from pymongo import ReturnDocument
 
 from app.models.user_setup.user import User
 from app.models.user_setup.otp import OTP
@@ -9,53 +11,69 @@ from app.core.settings import settings
 from app.services.exceptions import (
     OTPExpired, NotFoundError, OTPAttemptsExceeded, InvalidOTP
 )
-from app.services.auth.token import create_access_token, create_refresh_token
+from app.services.auth.session import open_session
 
 async def generate_otp(email: str) -> str:
+    """Issue a fresh code, replacing any previous one, in a single upsert."""
     otp = str(secrets.randbelow(9000) + 1000)
-    expires = datetime.now(timezone.utc) + timedelta(minutes=settings.OTP_EXPIRY_TIME_MINUTES)
-
-    await OTP.find({"email": email}).delete()
-
-    await OTP(
-        email=email,
-        otp_code=otp,
-        expires_at=expires,
-        attempts_left=3,
-        created_at=datetime.now(timezone.utc)
-    ).insert()
-
+    now = datetime.now(timezone.utc)
+
+    await OTP.get_motor_collection().update_one(
+        {"email": email},
+        {"$set": {
+            "otp_code": otp,
+            "expires_at": now + timedelta(minutes=settings.OTP_EXPIRY_TIME_MINUTES),
+            "attempts_left": OTP.model_fields["attempts_left"].default,
+            "created_at": now,
+        }},
+        upsert=True
+    )
     return otp
 
 
-async def verify_otp(email: str, input_otp: str) -> str:
-    record = await OTP.find_one(OTP.email == email)
+async def _otp_failure(email: str) -> Exception:
+    # Only reached on a failed attempt, to pick the right error
+    record = await OTP.get_motor_collection().find_one({"email": email})
     if not record:
-        raise NotFoundError("OTP not found or expired")
-
-    if record.attempts_left < 1:
-        raise OTPAttemptsExceeded("Too many incorrect attempts")
-
-    if record.expires_at < datetime.now(timezone.utc):
-        raise OTPExpired("OTP expired")
+        return NotFoundError("OTP not found or expired")
+    if record["attempts_left"] < 1:
+        return OTPAttemptsExceeded("Too many incorrect attempts")
+    return OTPExpired("OTP expired")
+
+
+async def verify_otp(
+    email: str,
+    input_otp: str,
+    device: Optional[str] = None,
+    ip_address: Optional[str] = None
+) -> Tuple[str, str]:
+    """
+    Every attempt atomically spends one try on an unexpired code before the
+    comparison, so concurrent guesses can never test more than `attempts_left`
+    codes. The winning attempt deletes the record; a replay racing it loses.
+    """
+    collection = OTP.get_motor_collection()
+    record = await collection.find_one_and_update(
+        {"email": email, "attempts_left": {"$gt": 0}, "expires_at": {"$gt": datetime.now(timezone.utc)}},
+        {"$inc": {"attempts_left": -1}},
+        return_document=ReturnDocument.BEFORE
+    )
+    if not record:
+        raise await _otp_failure(email)
 
-    if record.otp_code != input_otp:
-        record.attempts_left -= 1
-        await record.save()
+    # As bytes: compare_digest refuses non-ASCII str, and any input may arrive here
+    if not secrets.compare_digest(record["otp_code"].encode(), input_otp.encode()):
         raise InvalidOTP("Invalid OTP")
 
-    await OTP.find(OTP.email == email).delete()
+    # Matching the code too, so a code reissued since the lookup is not consumed
+    deleted = await collection.delete_one({"_id": record["_id"], "otp_code": record["otp_code"]})
+    if not deleted.deleted_count:
+        raise NotFoundError("OTP not found or expired")
 
     user = await User.find_one(User.email == email)
     if not user:
         raise NotFoundError("User not found")
-    
-    
-    access_token = create_access_token(subject=user.id, company_id=user.company_id)    
-    refresh_token = create_refresh_token(subject=user.id, company_id=user.company_id)
-
-    user.refresh_token = refresh_token
-    user.refresh_token_expires_at = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    await user.save()
 
-    return access_token, refresh_token
+    return await open_session(
+        user.id, user.company_id, user.token_version, device=device, ip_address=ip_address
+    )
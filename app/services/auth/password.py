@@ -1,34 +1,163 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
 from passlib.context import CryptContext
 from beanie import PydanticObjectId
 
 from app.models.user_setup.user import User
 
+from app.core.settings import settings
 from app.services.crud_services import CRUD
-from app.services.auth import create_access_token, create_refresh_token
+from app.services.auth.logout import revoke_user_tokens
+from app.services.auth.session import open_session
+
+from app.services.exceptions import InvalidCredentials, ServiceBusy
 
-from app.services.exceptions import InvalidCredentials
+logger = logging.getLogger(__name__)
 
 crud = CRUD(User)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes below BCRYPT_ROUNDS count as deprecated, so `verify_and_update` upgrades them
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
+
+# Keep rehash tasks referenced until they finish
+_pending: Set[asyncio.Task] = set()
+
+
+class HashPool:
+    """
+    Bounded thread pool for bcrypt. The bcrypt extension releases the GIL while
+    hashing, so threads run in parallel and the event loop stays free. Work is
+    admitted only while fewer than `max_pending` calls are running or queued;
+    past that a login burst fails fast with ServiceBusy instead of queueing
+    behind seconds of CPU.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = max(1, workers)
+        self.max_pending = max(self.workers, max_pending)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="password-hash"
+        )
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_ms_total = 0.0
+        self.run_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.run_ms_max = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise ServiceBusy("Too many sign-ins in progress, please retry")
+
+        def job() -> Tuple[float, Any, float]:
+            started = time.perf_counter()
+            return started, fn(*args), time.perf_counter()
+
+        self.pending += 1
+        submitted = time.perf_counter()
+        try:
+            started, result, finished = await asyncio.get_running_loop().run_in_executor(
+                self._executor, job
+            )
+        finally:
+            self.pending -= 1
+
+        wait_ms = (started - submitted) * 1000
+        run_ms = (finished - started) * 1000
+        self.completed += 1
+        self.wait_ms_total += wait_ms
+        self.run_ms_total += run_ms
+        self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+        self.run_ms_max = max(self.run_ms_max, run_ms)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        done = self.completed or 1
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": min(self.pending, self.workers),
+            "queue_depth": max(0, self.pending - self.workers),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.wait_ms_total / done, 2),
+            "max_wait_ms": round(self.wait_ms_max, 2),
+            "avg_hash_ms": round(self.run_ms_total / done, 2),
+            "max_hash_ms": round(self.run_ms_max, 2),
+        }
+
+
+hash_pool = HashPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
 
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+def password_hash_stats() -> Dict[str, Any]:
+    return hash_pool.stats()
+
+
+async def get_password_hash(password: str) -> str:
+    return await hash_pool.run(pwd_context.hash, password)
+
+async def hash_passwords(passwords: List[str]) -> List[str]:
+    """Hash a batch a pool's width at a time, so imports never trip the pending limit."""
+    hashes: List[str] = []
+    for start in range(0, len(passwords), hash_pool.workers):
+        chunk = passwords[start:start + hash_pool.workers]
+        hashes += await asyncio.gather(*(get_password_hash(p) for p in chunk))
+    return hashes
+
+async def verify_password(plain: str, hashed: str) -> bool:
+    return await hash_pool.run(pwd_context.verify, plain, hashed)
+
+async def verify_and_update_password(plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """`(valid, new_hash)`; `new_hash` is set when `hashed` uses outdated parameters."""
+    return await hash_pool.run(pwd_context.verify_and_update, plain, hashed)
+
+
+async def _store_rehash(user_id: PydanticObjectId, old_hash: str, new_hash: str) -> None:
+    try:
+        # Conditional on the old hash so a password changed meanwhile is not overwritten
+        await User.get_motor_collection().update_one(
+            {"_id": user_id, "hashed_password": old_hash},
+            {"$set": {"hashed_password": new_hash}}
+        )
+    except Exception:
+        logger.warning("Could not store rehashed password for %s", user_id, exc_info=True)
+
+
+def rehash_in_background(user_id: PydanticObjectId, old_hash: str, new_hash: str) -> None:
+    """Persist an upgraded hash after login without delaying the response."""
+    task = asyncio.get_running_loop().create_task(_store_rehash(user_id, old_hash, new_hash))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
 
 async def reset_password(
     password: str,
     user_id: PydanticObjectId,
-    company_id: PydanticObjectId
-) -> str:
-    
-    user = await crud.update(user_id, company_id, 
-        {"hashed_password": pwd_context.hash(password), "reset_password":False}
+    company_id: PydanticObjectId,
+    device: Optional[str] = None,
+    ip_address: Optional[str] = None
+) -> Tuple[str, str]:
+
+    user = await crud.update(
+        {"hashed_password": await get_password_hash(password), "reset_password": False},
+        doc_id=user_id,
+        user_id=user_id,
+        company_id=company_id
     )
     if not user:
         raise InvalidCredentials("Invalid credentials")
-    access_token = create_access_token(subject=user.id, company_id=user.company_id)
-    refresh_token = create_refresh_token(subject=user.id, company_id=user.company_id)
-    return access_token, refresh_token
+
+    # Sessions opened with the old password end here
+    version = await revoke_user_tokens(user.id)
+    return await open_session(
+        user.id, user.company_id, version, device=device, ip_address=ip_address
+    )
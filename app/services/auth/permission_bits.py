@@ -0,0 +1,65 @@
+from typing import Dict, Iterable, Iterator
+
+from app.constants.permissions import PERMISSION_GROUPS, APP_PERMISSIONS
+
+# Either grant bypasses every permission check
+SUPERUSER_PERMISSIONS = {"*", "super_admin"}
+
+# All bits set (Python ints are unbounded), so `ALL & required` is never 0
+ALL = -1
+
+
+def _catalog() -> Iterator[str]:
+    for group in [*PERMISSION_GROUPS, *APP_PERMISSIONS]:
+        for permission in group["permissions"]:
+            yield permission["value"]
+
+
+class PermissionIndex:
+    """
+    Fixed bit position per permission, compiled from the catalog in
+    `app/constants/permissions.py` at import. Names outside the catalog (route
+    guards not listed there yet, role names) get the next free bit on first
+    use. Positions are only stable within a process, so masks are cached,
+    never persisted.
+    """
+
+    def __init__(self, catalog: Iterable[str]):
+        self._bits: Dict[str, int] = {}
+        for name in catalog:
+            self.bit(name)
+
+    def __len__(self) -> int:
+        return len(self._bits)
+
+    def bit(self, name: str) -> int:
+        position = self._bits.get(name)
+        if position is None:
+            position = self._bits[name] = len(self._bits)
+        return 1 << position
+
+    def role_bit(self, role: str) -> int:
+        # Roles share the index under their own namespace so a role and a
+        # permission with the same name stay distinct
+        return self.bit(f"role::{role}")
+
+    def mask(self, permissions: Iterable[str]) -> int:
+        """Precompute a user's mask; superusers get every bit."""
+        mask = 0
+        for name in permissions:
+            if name in SUPERUSER_PERMISSIONS:
+                return ALL
+            mask |= self.bit(name)
+        return mask
+
+    def required(self, *names: str, roles: bool = False) -> int:
+        """Mask a guard compares against; `roles` also accepts each name as a role."""
+        mask = 0
+        for name in names:
+            mask |= self.bit(name)
+            if roles:
+                mask |= self.role_bit(name)
+        return mask
+
+
+permission_index = PermissionIndex(_catalog())
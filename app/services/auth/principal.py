@@ -0,0 +1,115 @@
+from dataclasses import dataclass
+from typing import FrozenSet, Iterable, List, Optional, Set
+
+from beanie import PydanticObjectId
+
+from app.models.user_setup.user import User
+from app.models.user_setup.tenant import Tenant
+from app.models.role import Role
+
+from app.services.exceptions import ValidationError, UnAuthorized
+from app.services.crud_services import CRUD, CI_COLLATION
+from app.services.auth.permission_bits import permission_index
+
+from app.core.settings import settings
+from app.utils.cache import TTLCache, get_cache
+
+PRINCIPAL_CACHE = "auth:principal"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Everything authorization needs about the caller; cached across requests."""
+    id: PydanticObjectId
+    company_id: PydanticObjectId
+    role: str
+    permissions: FrozenSet[str]  # Effective: role grants - role exclusions + direct grants
+    mask: int  # `permissions` plus the role compiled by `permission_index`; ALL for superusers
+    is_active: bool
+    is_deleted: bool
+    is_verified: bool
+    tenant_status: Optional[str]  # None when the tenant no longer exists
+    token_version: int  # Tokens carrying another `ver` claim are revoked
+
+
+def _cache() -> TTLCache:
+    return get_cache(
+        PRINCIPAL_CACHE,
+        maxsize=settings.PRINCIPAL_CACHE_MAX_ITEMS,
+        ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+    )
+
+
+async def effective_permissions(
+    company_id: PydanticObjectId,
+    role: str,
+    direct: Iterable[str]
+) -> FrozenSet[str]:
+    """Grants of the user's role minus its exclusions, plus the user's direct grants."""
+    granted: Set[str] = set()
+    # The tenant's own role wins over a global (company_id=None) one of the same name
+    async for doc in Role.get_motor_collection().find(
+        {"name": role, "company_id": {"$in": [company_id, None]}, "is_deleted": {"$ne": True}},
+        {"permissions": 1, "exclusions": 1, "company_id": 1},
+        collation=CI_COLLATION
+    ).sort("company_id", -1).limit(1):
+        granted = set(doc.get("permissions") or []) - set(doc.get("exclusions") or [])
+    return frozenset(granted | set(direct or []))
+
+
+async def load_principal(user_id: PydanticObjectId) -> Principal:
+    cache = _cache()
+    principal = cache.get(user_id)
+    if principal is not None:
+        return principal
+    generation = cache.generation
+
+    user = await User.get(user_id)
+    if not user:
+        raise UnAuthorized("User not found")
+    if not user.company_id:
+        raise ValidationError("User not assigned to a company")
+
+    tenant = await Tenant.get(user.company_id)
+    role = getattr(user.role, "value", user.role)
+    permissions = await effective_permissions(user.company_id, role, user.permissions)
+    principal = Principal(
+        id=user.id,
+        company_id=user.company_id,
+        role=role,
+        permissions=permissions,
+        mask=permission_index.mask(permissions) | permission_index.role_bit(role),
+        is_active=user.is_active,
+        is_deleted=user.is_deleted,
+        is_verified=user.is_verified,
+        tenant_status=getattr(tenant.status, "value", tenant.status) if tenant else None,
+        token_version=user.token_version,
+    )
+
+    # Grouped by tenant so a tenant change drops all of its users at once
+    if cache.generation == generation:
+        cache.set(user_id, principal, group=user.company_id)
+    return principal
+
+
+def _drop_users(user_ids: List[PydanticObjectId]) -> None:
+    cache = _cache()
+    for user_id in user_ids:
+        cache.pop(user_id)
+
+
+def _drop_tenants(tenant_ids: List[PydanticObjectId]) -> None:
+    cache = _cache()
+    for tenant_id in tenant_ids:
+        cache.pop_group(tenant_id)
+
+
+def _drop_all(role_ids: List[PydanticObjectId]) -> None:
+    # Users reference roles by name, so any role write may affect anyone; a
+    # create too (ids empty), since it can fill a name users already carry
+    _cache().clear()
+
+
+CRUD.on_write(User, _drop_users)
+CRUD.on_write(Tenant, _drop_tenants)
+CRUD.on_write(Role, _drop_all)
@@ -0,0 +1,145 @@
+import asyncio
+import hashlib
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from app.core.settings import settings
+from app.models.blacklisted_token import BlacklistedToken
+
+logger = logging.getLogger(__name__)
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over sha256 hex digests. The digest is already
+    uniformly distributed, so its two halves seed double hashing directly.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, digest: str):
+        h1, h2 = int(digest[:16], 16), int(digest[16:32], 16) | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, digest: str) -> None:
+        for pos in self._positions(digest):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, digest: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(digest))
+
+
+class RevocationList:
+    """
+    Process-local view of `BlacklistedToken`: a Bloom filter answers the common
+    "not revoked" case without touching Mongo, and an exact hash -> expiry map
+    settles the rare filter hits. Loaded once at startup, then kept current by
+    polling for rows newer than the last one seen; tokens revoked in another
+    worker are therefore honoured within REVOCATION_POLL_SECONDS.
+    """
+
+    def __init__(self):
+        self._bloom = BloomFilter(settings.REVOCATION_BLOOM_CAPACITY, settings.REVOCATION_BLOOM_ERROR_RATE)
+        self._expires: Dict[str, datetime] = {}
+        self._last_seen: Optional[datetime] = None
+        self.loaded = False
+
+    def add(self, token_hash: str, expires_at: datetime) -> None:
+        self._bloom.add(token_hash)
+        self._expires[token_hash] = _aware(expires_at)
+
+    def is_revoked(self, token_hash: str) -> Optional[bool]:
+        """None until the list is loaded; callers then have to ask Mongo."""
+        if not self.loaded:
+            return None
+        if token_hash not in self._bloom:
+            return False
+        return token_hash in self._expires
+
+    async def load(self) -> None:
+        self._expires.clear()
+        self._last_seen = None
+        await self._fetch({"expires_at": {"$gt": datetime.now(timezone.utc)}})
+        self._rebuild()
+        self.loaded = True
+        logger.info("Revocation list loaded: %d tokens", len(self._expires))
+
+    async def refresh(self) -> None:
+        # Overlap one poll interval so rows stamped by a worker with a slightly
+        # late clock are not missed; re-adding a known hash is harmless
+        query = {}
+        if self._last_seen:
+            overlap = timedelta(seconds=settings.REVOCATION_POLL_SECONDS)
+            query = {"created_at": {"$gte": self._last_seen - overlap}}
+        await self._fetch(query)
+
+        now = datetime.now(timezone.utc)
+        expired = [h for h, exp in self._expires.items() if exp <= now]
+        for token_hash in expired:
+            del self._expires[token_hash]
+        if expired:
+            # Bloom filters cannot forget; rebuild so aged-out tokens stop causing lookups
+            self._rebuild()
+
+    async def poll(self) -> None:
+        while True:
+            await asyncio.sleep(settings.REVOCATION_POLL_SECONDS)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.warning("Revocation list refresh failed", exc_info=True)
+
+    async def _fetch(self, query: dict) -> None:
+        collection = BlacklistedToken.get_motor_collection()
+        cursor = collection.find(
+            query, {"token_hash": 1, "token": 1, "expires_at": 1, "created_at": 1}
+        ).sort("created_at", 1)
+        async for row in cursor:
+            token_hash = row.get("token_hash") or (row.get("token") and hash_token(row["token"]))
+            if token_hash and row.get("expires_at"):
+                self.add(token_hash, row["expires_at"])
+            if row.get("created_at"):
+                created_at = _aware(row["created_at"])
+                if self._last_seen is None or created_at > self._last_seen:
+                    self._last_seen = created_at
+
+    def _rebuild(self) -> None:
+        capacity = max(settings.REVOCATION_BLOOM_CAPACITY, 2 * len(self._expires))
+        self._bloom = BloomFilter(capacity, settings.REVOCATION_BLOOM_ERROR_RATE)
+        for token_hash in self._expires:
+            self._bloom.add(token_hash)
+
+
+revocation_list = RevocationList()
+
+
+async def is_token_revoked(token: str) -> bool:
+    token_hash = hash_token(token)
+    revoked = revocation_list.is_revoked(token_hash)
+    if revoked is None:
+        revoked = await BlacklistedToken.find_one(
+            {"$or": [{"token_hash": token_hash}, {"token": token}]}
+        ) is not None
+    return revoked
+
+
+async def revoke_token(token: str, expires_at: datetime) -> None:
+    token_hash = hash_token(token)
+    await BlacklistedToken(token_hash=token_hash, expires_at=expires_at).insert()
+    # Visible to this worker at once; other workers pick it up on their next poll
+    revocation_list.add(token_hash, expires_at)
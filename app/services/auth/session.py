@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from beanie import PydanticObjectId
+
+from app.models.user_setup.refresh_session import RefreshSession
+
+from app.core.settings import settings
+from app.services.exceptions import UnAuthorized
+from app.services.auth.token import create_access_token, create_refresh_token, decode_token
+from app.services.auth.revocation import hash_token
+from app.services.auth.principal import load_principal
+
+
+def _refresh_expiry() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+
+def _issue(
+    user_id: PydanticObjectId,
+    company_id: PydanticObjectId,
+    token_version: int
+) -> Tuple[str, str]:
+    access_token = create_access_token(
+        subject=user_id, company_id=company_id, token_version=token_version
+    )
+    refresh_token = create_refresh_token(
+        subject=user_id, company_id=company_id, token_version=token_version
+    )
+    return access_token, refresh_token
+
+
+async def open_session(
+    user_id: PydanticObjectId,
+    company_id: PydanticObjectId,
+    token_version: int,
+    device: Optional[str] = None,
+    ip_address: Optional[str] = None
+) -> Tuple[str, str]:
+    """Sign in one device: returns (access, refresh) and stores the refresh token's hash."""
+    access_token, refresh_token = _issue(user_id, company_id, token_version)
+    await RefreshSession(
+        token_hash=hash_token(refresh_token),
+        user_id=user_id,
+        company_id=company_id,
+        device=device[:256] if device else None,
+        ip_address=ip_address,
+        expires_at=_refresh_expiry()
+    ).insert()
+    return access_token, refresh_token
+
+
+async def rotate_session(refresh_token: str) -> Tuple[str, str]:
+    """
+    Exchange a refresh token for a new pair. The session row swaps to the new
+    token's hash in one conditional update on the unique hash index, so each
+    refresh token works exactly once; a replayed or concurrent second use fails.
+    """
+    payload = decode_token(refresh_token)
+    if payload.get("type") != "refresh_token":
+        raise UnAuthorized("Refresh token expired or invalid")
+
+    try:
+        principal = await load_principal(PydanticObjectId(payload["sub"]))
+    except Exception:
+        raise UnAuthorized("Refresh token expired or invalid")
+    if payload.get("ver", 0) != principal.token_version:
+        raise UnAuthorized("Refresh token expired or invalid")
+    if principal.is_deleted or not principal.is_active:
+        raise UnAuthorized("Your account has been disabled. Contact your administrator.")
+
+    access_token, new_refresh_token = _issue(principal.id, principal.company_id, principal.token_version)
+    now = datetime.now(timezone.utc)
+    session = await RefreshSession.get_motor_collection().find_one_and_update(
+        {"token_hash": hash_token(refresh_token), "expires_at": {"$gt": now}},
+        {"$set": {
+            "token_hash": hash_token(new_refresh_token),
+            "expires_at": _refresh_expiry(),
+            "last_used_at": now,
+        }},
+        projection={"_id": 1}
+    )
+    if not session:
+        raise UnAuthorized("Refresh token expired or invalid")
+    return access_token, new_refresh_token
+
+
+async def close_session(refresh_token: str) -> bool:
+    """Sign out the device holding `refresh_token`; other devices stay signed in."""
+    result = await RefreshSession.get_motor_collection().delete_one(
+        {"token_hash": hash_token(refresh_token)}
+    )
+    return bool(result.deleted_count)
+
+
+async def close_user_sessions(user_id: PydanticObjectId) -> int:
+    result = await RefreshSession.get_motor_collection().delete_many({"user_id": user_id})
+    return result.deleted_count
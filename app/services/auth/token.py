@@ -1,35 +1,79 @@
+import hashlib
+import secrets
+import time
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 from jose import jwt, JWTError
 
 from app.core.settings import settings
 
 from app.services.exceptions import UnAuthorized
+from app.utils.cache import TTLCache, get_cache
 
 
+def _decoded_cache() -> TTLCache:
+    return get_cache(
+        "auth:decoded",
+        maxsize=settings.TOKEN_DECODE_CACHE_MAX_ITEMS,
+        ttl=settings.TOKEN_DECODE_CACHE_TTL_SECONDS
+    )
+
 
 def decode_token(token: str) -> dict:
+    """
+    Verify and decode a JWT. Verified payloads are cached by token digest until
+    the token's own `exp` (capped by TOKEN_DECODE_CACHE_TTL_SECONDS), so repeat
+    calls with the same token skip the signature check; failures never cache.
+    """
+    cache = _decoded_cache()
+    key = hashlib.sha256(token.encode()).digest()
+    payload = cache.get(key)
+    if payload is not None:
+        return dict(payload)
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        return payload
     except JWTError:
         raise UnAuthorized("Invalid or expired token")
 
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        remaining = exp - time.time()
+        if remaining > 0:
+            cache.set(key, dict(payload), ttl=min(remaining, settings.TOKEN_DECODE_CACHE_TTL_SECONDS))
+    return payload
+
+def bearer_claims(authorization: Optional[str]) -> Optional[dict]:
+    """Payload of an `Authorization: Bearer` header, or None if absent or invalid."""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return decode_token(token)
+    except UnAuthorized:
+        return None
+
 def create_access_token(
         subject: str,
         company_id: str,
-        expires_delta: timedelta = None
+        expires_delta: timedelta = None,
+        token_version: int = 0
 ) -> str:
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode = {"exp": expire, "sub": str(subject), "company_id": str(company_id), "type": "access_token" }
+    to_encode = {"exp": expire, "sub": str(subject), "company_id": str(company_id), "type": "access_token", "ver": token_version }
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
 def create_refresh_token(
         subject: str,
         company_id: str,
-        expires_delta: timedelta = None
+        expires_delta: timedelta = None,
+        token_version: int = 0
 ) -> str:
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS))
-    to_encode = {"exp": expire, "sub": str(subject), "company_id": str(company_id), "type": "refresh_token" }
+    to_encode = {
+        "exp": expire, "sub": str(subject), "company_id": str(company_id), "type": "refresh_token", "ver": token_version,
+        "jti": secrets.token_urlsafe(16)  # Distinct per device, so session hashes never collide
+    }
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
 
@@ -6,14 +6,22 @@ from app.models.user_setup.user import User
 
 from app.schemas.auth import LoginRequest, OTPResendRequest, Token
 
-from app.services.auth import create_access_token, decode_token, verify_password
+from app.services.auth import decode_token
+from app.services.auth.password import verify_and_update_password, rehash_in_background
+from app.services.auth.session import rotate_session
 from app.services.exceptions import ValidationError, UnAuthorized, ResetPassword
 
 
 async def authenticate_user(data: LoginRequest) -> User:
     user = await User.find_one(User.email == data.email)
-    if not user or not verify_password(data.password, user.hashed_password):
+    if not user:
+        raise ValidationError("Invalid user credentials")
+    valid, new_hash = await verify_and_update_password(data.password, user.hashed_password)
+    if not valid:
         raise ValidationError("Invalid user credentials")
+    if new_hash:  # Stored with an older work factor; upgrade while we have the plaintext
+        rehash_in_background(user.id, user.hashed_password, new_hash)
+        user.hashed_password = new_hash
     if not user.company_id:  # Ensure user has tenant context
         raise ValidationError("User not assigned to a company")
     if not user.is_verified:  # Ensure user has tenant context
@@ -60,18 +68,6 @@ async def verify_account(verification_token:str):
   except JWTError:
       raise ValidationError("Invalid verification link")
   
-async def refresh_user_token(refresh_token:str):
-    payload = decode_token(refresh_token)
-    user_id = PydanticObjectId(payload["sub"])
-    company_id = PydanticObjectId(payload["company_id"])
-
-    user = await User.find_one({"_id":user_id, "company_id":company_id, "refresh_token":refresh_token})
-
-    if not user or user.refresh_token_expires_at < datetime.now(timezone.utc):
-        raise UnAuthorized("Refresh token expired or invalid")
-
-
-    access_token = create_access_token(subject=user_id, company_id=company_id)
-
-    
-    return Token(access_token=access_token, refresh_token=refresh_token)
\ No newline at end of file
+async def refresh_user_token(refresh_token:str) -> Token:
+    access_token, refresh_token = await rotate_session(refresh_token)
+    return Token(access_token=access_token, refresh_token=refresh_token)
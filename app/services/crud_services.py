@@ -1,27 +1,107 @@
+import re
+import time
 from typing import (
-    Type, TypeVar, Generic, List, Optional, Union, Dict, Any, Tuple
+    Type, TypeVar, Generic, List, Optional, Union, Dict, Any, Tuple, AsyncIterator,
+    Callable
 )
 from fastapi import Request
 from pydantic import BaseModel
 from beanie import Document, PydanticObjectId
+from beanie.odm.queries.update import UpdateResponse
+from beanie.odm.utils.encoder import Encoder
 from collections.abc import Mapping
 from datetime import datetime, timezone
+from pymongo import UpdateOne, IndexModel
+from bson import json_util
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 from app.services.exceptions import (
-    NotFoundError, AlreadyExistsError, ValidationError
+    NotFoundError, AlreadyExistsError, ValidationError, ServiceError, ConflictError
 )
+from app.core.settings import settings
 
-from app.constants import SortOrder, LogLevel
-from app.models.logs import Log
+from app.constants import SortOrder, LogLevel, CountMode
+from app.core.audit_log import audit_sink, audit_entry
+from app.schemas.base import Page, BulkItemResult
+from app.utils.cursor import encode_cursor, decode_cursor
+from app.utils.dataloader import DataLoader
+from app.utils.cache import TTLCache, get_cache, find_cache
+from app.services.slow_query import observe
 
 ModelType = TypeVar("ModelType", bound=Document)
 
 PROTECTED_FIELDS = {"_id", "id", "company_id", "created_by", "created_at"}
 
+# Never sortable or projectable: sort values end up inside pagination cursors
+HIDDEN_FIELDS = {"hashed_password", "refresh_token"}
+
+DUPLICATE_KEY_ERROR = 11000
+
+# Collation of the case-insensitive indexes (name, email, ...). A query can only
+# seek on those indexes when it runs with the very same collation.
+CI_COLLATION = {"locale": "en", "strength": 2}
+
+# Sorts after every other code point under ICU collation; closes prefix ranges
+PREFIX_UPPER_BOUND = "\uffff"
+
+# Model name -> callbacks run with the ids of every document CRUD writes
+WriteListener = Callable[[List[PydanticObjectId]], None]
+_write_listeners: Dict[str, List[WriteListener]] = {}
+
 
 class CRUD(Generic[ModelType]):
-    def __init__(self, model: Type[ModelType]):
+    def __init__(
+        self,
+        model: Type[ModelType],
+        cache_ttl: Optional[float] = None,  # Opt-in read-through cache for get_by_id
+        cache_size: Optional[int] = None
+    ):
         self.model = model
+        self._cache_name = f"crud:{model.__name__}"
+        self._collated: Optional[set] = None
+        if cache_ttl:
+            get_cache(
+                self._cache_name,
+                maxsize=cache_size or settings.CRUD_CACHE_MAX_ITEMS,
+                ttl=cache_ttl
+            )
+
+    @property
+    def cache(self) -> Optional[TTLCache]:
+        # Resolved by model name so every CRUD of the model shares (and invalidates) one cache
+        return find_cache(self._cache_name)
+
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        cache = self.cache
+        return cache.stats() if cache is not None else None
+
+    @staticmethod
+    def on_write(model: Type[Document], listener: WriteListener) -> None:
+        """
+        Register `listener` to be called with the ids of every `model` document
+        written through CRUD (an empty list for inserts), so caches derived from
+        those documents elsewhere can be dropped.
+        """
+        _write_listeners.setdefault(model.__name__, []).append(listener)
+
+    def invalidate(self, *doc_ids: Union[PydanticObjectId, str]) -> None:
+        """
+        Drop every cached variant (tenant, include flags) of the given documents,
+        plus all cached list totals of the model, which any write can change.
+        """
+        oids = [PydanticObjectId(doc_id) for doc_id in doc_ids]
+        counts = find_cache(f"count:{self.model.__name__}")
+        if counts is not None:
+            counts.clear()
+
+        for listener in _write_listeners.get(self.model.__name__, []):
+            listener(oids)
+
+        cache = self.cache
+        if cache is None:
+            return
+        for oid in oids:
+            cache.pop_group(oid)
 
     def _build_query_filter(
         self,
@@ -29,7 +109,8 @@ class CRUD(Generic[ModelType]):
         use_company_id: bool = True,  # Flag to conditionally include company_id
         include_deleted: bool = False,
         include_deactivated: bool = False,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        collated: bool = False  # Query runs with CI_COLLATION; see _string_match
     ) -> Dict[str, Any]:
         """
         Helper function to build the query filter based on conditions.
@@ -51,13 +132,151 @@ class CRUD(Generic[ModelType]):
             for field, value in filters.items():
                 if value is not None:
                     query_filter[field] = (
-                        {"$regex": f"^{value}$", "$options": "i"}
+                        self._string_match(value, exact=True, collated=collated)
                         if isinstance(value, str)
                         else value
                     )
 
         return query_filter
 
+    def _collated_fields(self) -> set:
+        """Fields covered by an index declared with CI_COLLATION."""
+        if self._collated is None:
+            fields = set()
+            for name, info in self.model.model_fields.items():
+                for meta in [info.annotation, *info.metadata]:
+                    indexed = getattr(meta, "_indexed", None)
+                    if indexed and indexed[1].get("collation") == CI_COLLATION:
+                        fields.add(name)
+            for index in getattr(getattr(self.model, "Settings", None), "indexes", None) or []:
+                if isinstance(index, IndexModel) and index.document.get("collation") == CI_COLLATION:
+                    fields.update(index.document["key"].keys())
+            self._collated = fields
+        return self._collated
+
+    @staticmethod
+    def _string_match(value: str, exact: bool, collated: bool) -> Any:
+        """
+        Case-insensitive match on a string field. Under CI_COLLATION this is an
+        equality or an anchored range, both index seeks; otherwise an escaped,
+        anchored regex (which can never use an index case-insensitively).
+        """
+        if collated:
+            return value if exact else {"$gte": value, "$lt": value + PREFIX_UPPER_BOUND}
+        pattern = f"^{re.escape(value)}$" if exact else f"^{re.escape(value)}"
+        return {"$regex": pattern, "$options": "i"}
+
+    def _build_list_filter(
+        self,
+        company_id: Union[PydanticObjectId, str, None] = None,
+        use_company_id: bool = True,
+        include_deleted: bool = False,
+        include_deactivated: bool = False,
+        filters: Optional[Dict[str, Any]] = None,
+        search: Optional[Dict[str, str]] = None,
+        exact_match: bool = False
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        Query filter shared by `list`, `stream` and totals: tenant/flag filters
+        plus search terms (prefix matches unless `exact_match`).
+
+        Returns `(filter, collation)`. When a string predicate targets a field
+        with a case-insensitive index, the whole query runs with CI_COLLATION
+        so the predicates (and the sort) can seek on that index.
+        """
+        try:
+            company_oid = PydanticObjectId(company_id) if company_id else None
+        except Exception as e:
+            raise ValidationError("Invalid company identifier") from e
+
+        string_fields = [
+            field for field, value in [*(filters or {}).items(), *(search or {}).items()]
+            if isinstance(value, str)
+        ]
+        collated = bool(self._collated_fields().intersection(string_fields))
+
+        # Use the _build_query_filter helper to generate the filter
+        query_filter = self._build_query_filter(
+            company_id=company_oid,
+            use_company_id=use_company_id,
+            include_deleted=include_deleted,
+            include_deactivated=include_deactivated,
+            filters=filters,
+            collated=collated
+        )
+
+        # Apply search criteria
+        if search:
+            for field, term in search.items():
+                if term is not None:
+                    query_filter[field] = self._string_match(
+                        str(term), exact=exact_match, collated=collated
+                    )
+
+        return query_filter, (CI_COLLATION if collated else None)
+
+    @staticmethod
+    def _check_visible(fields: List[str]) -> None:
+        for field in fields:
+            if field.split(".")[0] in HIDDEN_FIELDS:
+                raise ValidationError(f"Field '{field}' is not available")
+
+    @staticmethod
+    def _normalize_sort(
+        sort: Optional[List[Tuple[str, SortOrder]]]
+    ) -> List[Tuple[str, SortOrder]]:
+        """
+        Make the sort total by ending it on `_id`, so every document has a
+        unique position that a cursor can resume from.
+        """
+        normalized: List[Tuple[str, SortOrder]] = []
+        for field, order in sort or []:
+            field = "_id" if field == "id" else field
+            normalized.append((field, order))
+            if field == "_id":
+                return normalized
+
+        tie_break = normalized[-1][1] if normalized else SortOrder.ASC
+        normalized.append(("_id", tie_break))
+        return normalized
+
+    @staticmethod
+    def _sort_value(doc: Union[ModelType, Dict[str, Any]], field: str) -> Any:
+        if field == "_id":
+            return doc["_id"] if isinstance(doc, Mapping) else doc.id
+        value: Any = doc
+        for part in field.split("."):
+            if value is None:
+                break
+            value = value.get(part) if isinstance(value, Mapping) else getattr(value, part, None)
+        return value
+
+    @staticmethod
+    def _keyset_filter(
+        sort: List[Tuple[str, SortOrder]],
+        values: List[Any]
+    ) -> Dict[str, Any]:
+        """
+        Range predicate selecting everything strictly after `values` in `sort` order:
+        (f1 > v1) OR (f1 = v1 AND f2 > v2) OR ... with `$lt` for descending keys.
+        Nulls sort first in Mongo, so they are handled explicitly.
+        """
+        clauses = []
+        for i, (field, order) in enumerate(sort):
+            value = values[i]
+            if order == SortOrder.ASC:
+                after = {field: {"$ne": None}} if value is None else {field: {"$gt": value}}
+            else:
+                if value is None:
+                    continue  # nothing sorts below null
+                after = {"$or": [{field: {"$lt": value}}, {field: None}]}
+
+            clause = {f: v for (f, _), v in zip(sort[:i], values[:i])}
+            clause.update(after)
+            clauses.append(clause)
+
+        return {"$or": clauses}
+
     async def create(
         self,
         payload: Union[BaseModel, Dict[str, Any]],
@@ -83,6 +302,7 @@ class CRUD(Generic[ModelType]):
             filters.append({field: val.strip()})
 
         # 2) Check for duplicates
+        started = time.perf_counter()
         if filters:
             existing = await self.model.find_one({"$or": filters}, session=session)
             if existing:
@@ -95,6 +315,8 @@ class CRUD(Generic[ModelType]):
         # 3) Instantiate & insert
         instance = self.model(**data)
         await instance.insert(session=session)
+        observe(self.model, "create", started, {"$or": filters} if filters else None)
+        self.invalidate()
         return instance
 
     async def get_by_id(
@@ -104,7 +326,8 @@ class CRUD(Generic[ModelType]):
         include_deleted: bool = False,
         include_deactivated: bool = False,
         session=None,
-        use_company_id: bool = True  # Use the flag to decide if company_id is included
+        use_company_id: bool = True,  # Use the flag to decide if company_id is included
+        use_cache: bool = True
     ) -> ModelType:
         try:
             doc_oid = PydanticObjectId(doc_id)
@@ -112,6 +335,19 @@ class CRUD(Generic[ModelType]):
         except Exception as e:
             raise ValidationError("Invalid document identifier") from e
 
+        # Reads inside a transaction may see uncommitted data; never cache them
+        cache = self.cache if use_cache and session is None else None
+        if cache is not None:
+            key = (
+                doc_oid, company_oid if use_company_id else None,
+                include_deleted, include_deactivated
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                # Callers mutate and save documents; hand out a private copy
+                return cached.model_copy(deep=True)
+            generation = cache.generation
+
         query = self._build_query_filter(
             company_id=company_oid,
             use_company_id=use_company_id,
@@ -120,12 +356,124 @@ class CRUD(Generic[ModelType]):
         )
         query["_id"] = doc_oid
 
+        started = time.perf_counter()
         obj = await self.model.find_one(query, session=session)
+        observe(self.model, "get_by_id", started, query, limit=1)
         if not obj:
             raise NotFoundError("Document not found or inaccessible")
 
+        # Skip the fill if a write invalidated the cache while we were reading
+        if cache is not None and cache.generation == generation:
+            cache.set(key, obj.model_copy(deep=True), group=doc_oid)
+
         return obj
 
+    async def get_many(
+        self,
+        doc_ids: List[Union[PydanticObjectId, str]],
+        company_id: Union[PydanticObjectId, str] = None,
+        include_deleted: bool = False,
+        include_deactivated: bool = False,
+        session=None,
+        use_company_id: bool = True
+    ) -> Dict[PydanticObjectId, ModelType]:
+        """
+        Resolve many ids with a single `$in` query. Ids that do not exist or are
+        not visible to the tenant are simply absent from the returned mapping.
+        """
+        try:
+            doc_oids = list(dict.fromkeys(PydanticObjectId(doc_id) for doc_id in doc_ids))
+            company_oid = PydanticObjectId(company_id) if company_id else None
+        except Exception as e:
+            raise ValidationError("Invalid document identifier") from e
+
+        if not doc_oids:
+            return {}
+        if use_company_id and not company_oid:
+            raise ValidationError("Invalid company identifier")
+
+        query = self._build_query_filter(
+            company_id=company_oid,
+            use_company_id=use_company_id,
+            include_deleted=include_deleted,
+            include_deactivated=include_deactivated
+        )
+        query["_id"] = {"$in": doc_oids}
+
+        docs = await self.model.find(query, session=session).to_list()
+        return {doc.id: doc for doc in docs}
+
+    def loader(
+        self,
+        company_id: Union[PydanticObjectId, str] = None,
+        include_deleted: bool = False,
+        include_deactivated: bool = False,
+        use_company_id: bool = True
+    ) -> DataLoader:
+        """
+        DataLoader backed by `get_many`. Prefer `Loaders.get(...)` so the
+        loader (and its memoized results) is shared for the whole request.
+        """
+        async def batch(keys: List[PydanticObjectId]) -> Dict[PydanticObjectId, ModelType]:
+            return await self.get_many(
+                keys,
+                company_id=company_id,
+                include_deleted=include_deleted,
+                include_deactivated=include_deactivated,
+                use_company_id=use_company_id
+            )
+
+        return DataLoader(batch, key_fn=PydanticObjectId)
+
+    async def count(
+        self,
+        query_filter: Dict[str, Any],
+        mode: CountMode = CountMode.EXACT,
+        session=None,
+        collation: Optional[Dict[str, Any]] = None
+    ) -> Tuple[int, bool]:
+        """
+        Total for a list filter, served from a short-TTL cache keyed by the
+        normalized filter. Returns `(total, estimated)`.
+
+        `ESTIMATED` reads collection metadata when the filter is empty and
+        otherwise stops counting at COUNT_ESTIMATE_LIMIT, reporting that
+        limit as a lower bound.
+        """
+        cache = None
+        if session is None:
+            cache = get_cache(
+                f"count:{self.model.__name__}",
+                maxsize=settings.COUNT_CACHE_MAX_ITEMS,
+                ttl=settings.COUNT_CACHE_TTL_SECONDS
+            )
+            key = (mode, bool(collation), json_util.dumps(query_filter, sort_keys=True))
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+            generation = cache.generation
+
+        collection = self.model.get_motor_collection()
+        started = time.perf_counter()
+        if mode == CountMode.ESTIMATED and not query_filter:
+            result = (await collection.estimated_document_count(), True)
+        elif mode == CountMode.ESTIMATED:
+            cap = settings.COUNT_ESTIMATE_LIMIT
+            total = await collection.count_documents(
+                query_filter, limit=cap, session=session, collation=collation
+            )
+            result = (total, total >= cap)
+        else:
+            total = await collection.count_documents(
+                query_filter, session=session, collation=collation
+            )
+            result = (total, False)
+        observe(self.model, "count", started, query_filter or None, collation=collation)
+
+        if cache is not None and cache.generation == generation:
+            cache.set(key, result)
+        return result
+
     async def list(
         self,
         company_id: Union[PydanticObjectId, str] = None,
@@ -137,36 +485,136 @@ class CRUD(Generic[ModelType]):
         search: Optional[Dict[str, str]] = None,
         exact_match: bool = False,
         sort: Optional[List[Tuple[str, SortOrder]]] = None,
-        use_company_id: bool = True  # Flag to conditionally apply company_id
-    ) -> List[ModelType]:
-        try:
-            company_oid = PydanticObjectId(company_id) if company_id else None
-        except Exception as e:
-            raise ValidationError("Invalid company identifier") from e
+        use_company_id: bool = True,  # Flag to conditionally apply company_id
+        cursor: Optional[str] = None,  # Keyset pagination; takes precedence over skip
+        projection: Optional[List[str]] = None,  # Lean mode: raw dicts with only these fields
+        count: Optional[CountMode] = None  # Also report the total, exact or estimated
+    ) -> Page:
+        query_filter, collation = self._build_list_filter(
+            company_id=company_id,
+            use_company_id=use_company_id,
+            include_deleted=include_deleted,
+            include_deactivated=include_deactivated,
+            filters=filters,
+            search=search,
+            exact_match=exact_match
+        )
 
-        # Use the _build_query_filter helper to generate the filter
-        query_filter = self._build_query_filter(
-            company_id=company_oid,
+        # Sorting logic
+        sort_spec = self._normalize_sort(sort)
+        self._check_visible([f for f, _ in sort_spec] + list(projection or []))
+        sort_params = [(field, order.value) for field, order in sort_spec]
+
+        # Totals describe the whole result set, not what is left after the cursor
+        total, total_estimated = None, False
+        if count is not None:
+            total, total_estimated = await self.count(
+                query_filter, CountMode(count), collation=collation
+            )
+
+        # Resume after the last document of the previous page instead of skipping
+        if cursor:
+            try:
+                decoded = decode_cursor(cursor)
+            except ValueError as e:
+                raise ValidationError("Invalid cursor") from e
+            if decoded["sort"] != sort_spec:
+                raise ValidationError("Cursor does not match the requested sort order")
+            query_filter = {"$and": [query_filter, self._keyset_filter(sort_spec, decoded["values"])]}
+            skip = 0
+
+        # Fetch one extra document to learn whether another page exists
+        started = time.perf_counter()
+        if projection is not None:
+            # Lean read: skip Beanie/Pydantic hydration entirely. Sort keys are
+            # projected too so the cursor can be built, then dropped again.
+            wanted = dict.fromkeys(projection)
+            extra = [f for f, _ in sort_spec if f.split(".")[0] not in wanted]
+            fields_proj = {field: 1 for field in [*wanted, *extra]}
+            docs = await (
+                self.model.get_motor_collection()
+                .find(query_filter, fields_proj, collation=collation)
+                .sort(sort_params).skip(skip).limit(limit + 1)
+                .to_list(length=limit + 1)
+            )
+        else:
+            docs = await (
+                self.model.find(query_filter, collation=collation)
+                .sort(sort_params).skip(skip).limit(limit + 1).to_list()
+            )
+        observe(
+            self.model, "list", started, query_filter,
+            sort=sort_params, collation=collation, limit=skip + limit + 1
+        )
+
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = encode_cursor(
+                sort_spec, [self._sort_value(docs[-1], field) for field, _ in sort_spec]
+            )
+
+        if projection is not None:
+            for doc in docs:
+                for field in extra:
+                    doc.pop(field.split(".")[0], None)
+
+        return Page(
+            items=docs, total=total, total_estimated=total_estimated, next_cursor=next_cursor
+        )
+
+    async def stream(
+        self,
+        company_id: Union[PydanticObjectId, str] = None,
+        include_deleted: bool = False,
+        include_deactivated: bool = False,
+        filters: Optional[Dict[str, Any]] = None,
+        search: Optional[Dict[str, str]] = None,
+        exact_match: bool = False,
+        sort: Optional[List[Tuple[str, SortOrder]]] = None,
+        use_company_id: bool = True,
+        projection: Optional[List[str]] = None,
+        batch_size: int = 500,
+        session=None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield every matching document as a raw dict straight off a Motor cursor,
+        `batch_size` documents per round trip, so memory stays flat regardless
+        of the result size (exports, reports, migrations).
+        """
+        query_filter, collation = self._build_list_filter(
+            company_id=company_id,
             use_company_id=use_company_id,
             include_deleted=include_deleted,
             include_deactivated=include_deactivated,
-            filters=filters
+            filters=filters,
+            search=search,
+            exact_match=exact_match
         )
 
-        # Apply search criteria
-        if search:
-            for field, term in search.items():
-                if term is not None:
-                    query_filter[field] = (
-                        {"$regex": f"^{term}$", "$options": "i"} 
-                        if exact_match 
-                        else {"$regex": term, "$options": "i"}
-                    )
+        sort_spec = self._normalize_sort(sort)
+        self._check_visible([f for f, _ in sort_spec] + list(projection or []))
+        sort_params = [(field, order.value) for field, order in sort_spec]
 
-        # Sorting logic
-        sort_params = [(field, order.value) for field, order in (sort or [("_id", SortOrder.ASC)])]
+        fields_proj = (
+            {field: 1 for field in projection} if projection
+            else {field: 0 for field in HIDDEN_FIELDS}
+        )
 
-        return await self.model.find(query_filter).sort(sort_params).skip(skip).limit(limit).to_list()
+        cursor = (
+            self.model.get_motor_collection()
+            .find(
+                query_filter, fields_proj,
+                batch_size=batch_size, session=session, collation=collation
+            )
+            .sort(sort_params)
+        )
+        try:
+            async for doc in cursor:
+                yield doc
+        finally:
+            # Client went away mid-export: release the server-side cursor
+            await cursor.close()
 
     async def update(
         self,
@@ -177,12 +625,20 @@ class CRUD(Generic[ModelType]):
         unique_fields: Optional[List[str]] = None,
         session=None,
         use_company_id: bool = True,  # Flag to conditionally apply company_id
+        expected_updated_at: Optional[datetime] = None,  # Optimistic concurrency guard
     ) -> ModelType:
-        obj = await self.get_by_id(
-            doc_id=doc_id, company_id=company_id,
-            session=session, use_company_id=use_company_id,
-            include_deleted=True, include_deactivated=True
-        )
+        """
+        Partial update in a single `find_one_and_update` round trip.
+
+        Duplicates are reported from unique-index violations rather than
+        pre-queries, so every field listed in `unique_fields` must be backed
+        by a unique index. When `expected_updated_at` is given the write only
+        applies if the document has not changed since the caller read it.
+        """
+        try:
+            doc_oid = PydanticObjectId(doc_id)
+        except Exception as e:
+            raise ValidationError("Invalid document identifier") from e
 
         # Validate user_id
         try:
@@ -190,6 +646,9 @@ class CRUD(Generic[ModelType]):
         except Exception:
             raise ValidationError("Invalid user_id")
 
+        if use_company_id and not company_id:
+            raise ValidationError("Invalid company identifier")
+
         # Normalize payload
         if isinstance(payload, BaseModel):
             incoming = payload.model_dump(exclude_unset=True)
@@ -203,55 +662,58 @@ class CRUD(Generic[ModelType]):
             if f in PROTECTED_FIELDS:
                 incoming.pop(f)
 
-        # Uniqueness checks (accept non-strings too)
-        checks = [f for f in (unique_fields or []) if f in incoming]
-        dup_filters = []
-        for field in checks:
-            val = incoming[field]
+        for field in (unique_fields or []):
+            val = incoming.get(field)
             if isinstance(val, str) and not val.strip():
                 raise ValidationError(f"'{field}' must not be empty")
-            filt = {field: val}
-            if use_company_id and getattr(obj, "company_id", None):
-                filt["company_id"] = obj.company_id
-            filt["_id"] = {"$ne": obj.id}
-            dup_filters.append(filt)
-
-        if dup_filters:
-            existing = await self.model.find_one({"$or": dup_filters}, session=session)
-            if existing:
-                raise AlreadyExistsError(f"{self.model.__name__} with these values already exists")
 
-        # Compute delta vs current object to avoid no-op writes
-        to_set = {}
-        for k, v in incoming.items():
-            if getattr(obj, k, None) != v:
-                to_set[k] = v
-
-        if not to_set:
+        if not incoming:
             # Nothing changed; return without mutating audit fields
-            return obj
+            return await self.get_by_id(
+                doc_id=doc_oid, company_id=company_id,
+                session=session, use_company_id=use_company_id,
+                include_deleted=True, include_deactivated=True
+            )
 
-        # Audit fields
-        to_set["updated_by"] = user_oid
-        # to_set["updated_at"] = datetime.now(timezone.utc)
-
-        # Optional optimistic concurrency (if you track updated_at or version)
-        # match = {"_id": obj.id, "updated_at": obj.updated_at}  # if present
-        match = {"_id": obj.id}
-
-        # Atomic update
-        updated = await self.model.find_one(match, session=session).update({"$set": to_set})
-        if not updated:
-            # If using optimistic locking with updated_at/version, this indicates a conflict
-            # raise ConflictError("Document was updated by someone else. Please retry.")
-            pass
-
-        # Re-fetch fresh document
-        return await self.get_by_id(
-            doc_id=doc_id, company_id=company_id,
-            session=session, use_company_id=use_company_id,
-            include_deleted=True, include_deactivated=True
+        match = self._build_query_filter(
+            company_id=company_id,
+            use_company_id=use_company_id,
+            include_deleted=True,
+            include_deactivated=True
         )
+        match["_id"] = doc_oid
+        if expected_updated_at is not None:
+            # Mongo stores milliseconds; clients may echo microsecond timestamps
+            match["updated_at"] = expected_updated_at.replace(
+                microsecond=expected_updated_at.microsecond // 1000 * 1000
+            )
+
+        # Audit fields
+        incoming["updated_by"] = user_oid
+        incoming["updated_at"] = datetime.now(timezone.utc)
+
+        # Atomic update returning the new version of the document
+        started = time.perf_counter()
+        try:
+            updated = await self.model.find_one(match, session=session).update(
+                {"$set": incoming},
+                session=session,
+                response_type=UpdateResponse.NEW_DOCUMENT
+            )
+        except DuplicateKeyError as e:
+            raise AlreadyExistsError(f"{self.model.__name__} with these values already exists") from e
+        observe(self.model, "update", started, match, limit=1)
+
+        if updated is None:
+            # Only on failure: tell a lost race apart from a missing document
+            if expected_updated_at is not None:
+                match.pop("updated_at")
+                if await self.model.find_one(match, session=session):
+                    raise ConflictError("Document was updated by someone else. Please retry.")
+            raise NotFoundError("Document not found or inaccessible")
+
+        self.invalidate(doc_oid)
+        return updated
 
     async def update_flags(
         self,
@@ -267,7 +729,8 @@ class CRUD(Generic[ModelType]):
         obj = await self.get_by_id(
             doc_id=doc_id, company_id=company_id, 
             include_deleted=True, include_deactivated=True,            
-            session=session, use_company_id=use_company_id
+            session=session, use_company_id=use_company_id,
+            use_cache=False  # Saving a cached copy could overwrite newer fields
         )
 
         # Validate user_id
@@ -287,10 +750,308 @@ class CRUD(Generic[ModelType]):
             setattr(obj, field, value)
 
         setattr(obj, "updated_by", user_oid)
+        # save() fires no Update/Replace hook; bump it so If-Match guards see the change
+        setattr(obj, "updated_at", datetime.now(timezone.utc))
 
         await obj.save(session=session)
+        self.invalidate(obj.id)
         return obj
 
+    # ------------------------------------------------------------------
+    # Bulk operations
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _check_bulk_size(count: int) -> None:
+        if count > settings.BULK_MAX_ITEMS:
+            raise ValidationError(f"Bulk operations are limited to {settings.BULK_MAX_ITEMS} items")
+
+    @staticmethod
+    def _payload_to_dict(payload: Union[BaseModel, Dict[str, Any]], exclude_unset: bool = False) -> Dict[str, Any]:
+        if isinstance(payload, BaseModel):
+            return payload.model_dump(exclude_unset=exclude_unset)
+        if isinstance(payload, Mapping):
+            return dict(payload)
+        raise ValidationError("Payload must be a Pydantic model or a dictionary")
+
+    def _write_error_message(self, error: Dict[str, Any]) -> str:
+        if error.get("code") == DUPLICATE_KEY_ERROR:
+            return f"{self.model.__name__} with these values already exists"
+        return error.get("errmsg") or "Write failed"
+
+    async def bulk_create(
+        self,
+        payloads: List[Union[BaseModel, Dict[str, Any]]],
+        unique_fields: Optional[List[str]] = None,
+        session=None
+    ) -> List[BulkItemResult]:
+        """
+        Insert many documents with one batched duplicate check and one unordered
+        `insert_many`. Failures are reported per item instead of aborting the batch.
+        """
+        self._check_bulk_size(len(payloads))
+        checks = unique_fields or []
+        results: Dict[int, BulkItemResult] = {}
+        pending: List[Tuple[int, Dict[str, Any]]] = []
+        seen: Dict[str, set] = {field: set() for field in checks}
+
+        # 1) Validate each payload, including duplicates inside the batch itself
+        for i, payload in enumerate(payloads):
+            try:
+                data = self._payload_to_dict(payload)
+                for field in checks:
+                    val = data.get(field, "")
+                    if not isinstance(val, str) or not val.strip():
+                        raise ValidationError(f"'{field}' must not be empty")
+                    if val.strip() in seen[field]:
+                        raise AlreadyExistsError(
+                            f"{self.model.__name__} '{field}' = {val!r} is repeated in the request"
+                        )
+                for field in checks:
+                    seen[field].add(data[field].strip())
+                pending.append((i, data))
+            except ServiceError as e:
+                results[i] = BulkItemResult(op="create", index=i, ok=False, error=str(e))
+
+        # 2) One $in query for every unique field instead of one find_one per item
+        if pending and checks:
+            taken: Dict[str, set] = {field: set() for field in checks}
+            query = {"$or": [{field: {"$in": list(seen[field])}} for field in checks]}
+            projection = {field: 1 for field in checks}
+            async for doc in self.model.get_motor_collection().find(query, projection, session=session):
+                for field in checks:
+                    if field in doc:
+                        taken[field].add(doc[field])
+
+            remaining = []
+            for i, data in pending:
+                clash = next((f for f in checks if data[f].strip() in taken[f]), None)
+                if clash:
+                    results[i] = BulkItemResult(
+                        op="create", index=i, ok=False,
+                        error=f"{self.model.__name__} '{clash}' = {data[clash]!r} already exists"
+                    )
+                else:
+                    remaining.append((i, data))
+            pending = remaining
+
+        # 3) Instantiate with pre-assigned ids so results can report them
+        to_insert: List[Tuple[int, ModelType]] = []
+        for i, data in pending:
+            try:
+                instance = self.model(**data)
+            except Exception as e:
+                results[i] = BulkItemResult(op="create", index=i, ok=False, error=str(e))
+                continue
+            instance.id = PydanticObjectId()
+            to_insert.append((i, instance))
+
+        # 4) Single unordered insert; a bad document does not stop the others
+        failed: Dict[int, str] = {}
+        if to_insert:
+            try:
+                await self.model.insert_many(
+                    [instance for _, instance in to_insert], session=session, ordered=False
+                )
+            except BulkWriteError as e:
+                for error in e.details.get("writeErrors", []):
+                    failed[error["index"]] = self._write_error_message(error)
+            self.invalidate()
+
+        for pos, (i, instance) in enumerate(to_insert):
+            if pos in failed:
+                results[i] = BulkItemResult(op="create", index=i, ok=False, error=failed[pos])
+            else:
+                results[i] = BulkItemResult(op="create", index=i, id=instance.id, ok=True)
+
+        return [results[i] for i in sorted(results)]
+
+    async def bulk_update(
+        self,
+        items: List[Tuple[Union[PydanticObjectId, str], Union[BaseModel, Dict[str, Any]]]],
+        user_id: Union[PydanticObjectId, str],
+        company_id: Union[PydanticObjectId, str, None] = None,
+        unique_fields: Optional[List[str]] = None,
+        session=None,
+        use_company_id: bool = True,
+    ) -> List[BulkItemResult]:
+        """
+        Apply many `(doc_id, payload)` partial updates through one unordered `bulk_write`.
+        Existence and uniqueness are each checked with a single batched query.
+        """
+        self._check_bulk_size(len(items))
+        try:
+            user_oid = PydanticObjectId(str(user_id))
+        except Exception:
+            raise ValidationError("Invalid user_id")
+
+        scope = self._build_query_filter(
+            company_id=company_id, use_company_id=use_company_id,
+            include_deleted=True, include_deactivated=True
+        )
+        checks = unique_fields or []
+        results: Dict[int, BulkItemResult] = {}
+        pending: List[Tuple[int, PydanticObjectId, Dict[str, Any]]] = []
+
+        # 1) Validate ids and payloads
+        for i, (doc_id, payload) in enumerate(items):
+            try:
+                try:
+                    doc_oid = PydanticObjectId(doc_id)
+                except Exception as e:
+                    raise ValidationError("Invalid document identifier") from e
+                incoming = {
+                    k: v for k, v in self._payload_to_dict(payload, exclude_unset=True).items()
+                    if k not in PROTECTED_FIELDS
+                }
+                if not incoming:
+                    raise ValidationError("No fields provided")
+                for field in checks:
+                    val = incoming.get(field)
+                    if isinstance(val, str) and not val.strip():
+                        raise ValidationError(f"'{field}' must not be empty")
+                pending.append((i, doc_oid, incoming))
+            except ServiceError as e:
+                results[i] = BulkItemResult(op="update", index=i, id=None, ok=False, error=str(e))
+
+        # 2) One query to learn which targets exist within the tenant
+        ids = [doc_oid for _, doc_oid, _ in pending]
+        existing = set()
+        if ids:
+            async for doc in self.model.get_motor_collection().find(
+                {**scope, "_id": {"$in": ids}}, {"_id": 1}, session=session
+            ):
+                existing.add(doc["_id"])
+
+        # 3) One query for uniqueness against documents outside the batch
+        taken: Dict[str, set] = {field: set() for field in checks}
+        wanted = {field: [inc[field] for _, _, inc in pending if field in inc] for field in checks}
+        dup_filters = [{field: {"$in": vals}} for field, vals in wanted.items() if vals]
+        if dup_filters:
+            query = {"$or": dup_filters, "_id": {"$nin": ids}}
+            if use_company_id and "company_id" in scope:
+                query["company_id"] = scope["company_id"]
+            async for doc in self.model.get_motor_collection().find(
+                query, {field: 1 for field in checks}, session=session
+            ):
+                for field in checks:
+                    if field in doc:
+                        taken[field].add(doc[field])
+
+        # Raw bulk writes bypass Beanie, so encode sets/enums/models the same way it would
+        encoder = Encoder(custom_encoders=self.model.get_settings().bson_encoders)
+        now = datetime.now(timezone.utc)
+        ops: List[UpdateOne] = []
+        queued: List[Tuple[int, PydanticObjectId]] = []
+        for i, doc_oid, incoming in pending:
+            if doc_oid not in existing:
+                results[i] = BulkItemResult(
+                    op="update", index=i, id=doc_oid, ok=False, error="Document not found or inaccessible"
+                )
+                continue
+            clash = next((f for f in checks if f in incoming and incoming[f] in taken[f]), None)
+            if clash:
+                results[i] = BulkItemResult(
+                    op="update", index=i, id=doc_oid, ok=False,
+                    error=f"{self.model.__name__} with these values already exists"
+                )
+                continue
+            to_set = {**incoming, "updated_by": user_oid, "updated_at": now}
+            ops.append(UpdateOne({**scope, "_id": doc_oid}, {"$set": encoder.encode(to_set)}))
+            queued.append((i, doc_oid))
+
+        # 4) Single unordered write
+        failed: Dict[int, str] = {}
+        if ops:
+            try:
+                await self.model.get_motor_collection().bulk_write(ops, ordered=False, session=session)
+            except BulkWriteError as e:
+                for error in e.details.get("writeErrors", []):
+                    failed[error["index"]] = self._write_error_message(error)
+            self.invalidate(*(doc_oid for pos, (_, doc_oid) in enumerate(queued) if pos not in failed))
+
+        for pos, (i, doc_oid) in enumerate(queued):
+            if pos in failed:
+                results[i] = BulkItemResult(op="update", index=i, id=doc_oid, ok=False, error=failed[pos])
+            else:
+                results[i] = BulkItemResult(op="update", index=i, id=doc_oid, ok=True)
+
+        return [results[i] for i in sorted(results)]
+
+    async def bulk_set_flags(
+        self,
+        doc_ids: List[Union[PydanticObjectId, str]],
+        user_id: Union[PydanticObjectId, str],
+        company_id: Union[PydanticObjectId, str, None] = None,
+        fields: List[Tuple[str, bool]] = None,
+        session=None,
+        use_company_id: bool = True,
+        op: str = "update_flags"
+    ) -> List[BulkItemResult]:
+        """
+        Bulk counterpart of `update_flags`: one lookup plus one `update_many`
+        for the whole batch, e.g. `fields=[("is_deleted", True), ("is_active", False)]`.
+        """
+        self._check_bulk_size(len(doc_ids))
+        try:
+            user_oid = PydanticObjectId(str(user_id))
+        except Exception:
+            raise ValidationError("Invalid user_id")
+
+        if not fields:
+            raise ValidationError("No fields provided")
+
+        to_set: Dict[str, Any] = {}
+        for field, value in fields:
+            if field not in self.model.model_fields:
+                raise ValidationError(f"Invalid field '{field}'")
+            if not isinstance(value, bool):
+                raise ValidationError("Flag values must be boolean")
+            to_set[field] = value
+
+        now = datetime.now(timezone.utc)
+        to_set["updated_by"] = user_oid
+        to_set["updated_at"] = now
+        if to_set.get("is_deleted") is True:
+            to_set["deleted_by"] = user_oid
+            to_set["deleted_at"] = now
+
+        scope = self._build_query_filter(
+            company_id=company_id, use_company_id=use_company_id,
+            include_deleted=True, include_deactivated=True
+        )
+
+        results: Dict[int, BulkItemResult] = {}
+        targets: List[Tuple[int, PydanticObjectId]] = []
+        for i, doc_id in enumerate(doc_ids):
+            try:
+                targets.append((i, PydanticObjectId(doc_id)))
+            except Exception:
+                results[i] = BulkItemResult(op=op, index=i, ok=False, error="Invalid document identifier")
+
+        existing = set()
+        if targets:
+            ids = [doc_oid for _, doc_oid in targets]
+            async for doc in self.model.get_motor_collection().find(
+                {**scope, "_id": {"$in": ids}}, {"_id": 1}, session=session
+            ):
+                existing.add(doc["_id"])
+
+        if existing:
+            await self.model.get_motor_collection().update_many(
+                {**scope, "_id": {"$in": list(existing)}}, {"$set": to_set}, session=session
+            )
+            self.invalidate(*existing)
+
+        for i, doc_oid in targets:
+            if doc_oid in existing:
+                results[i] = BulkItemResult(op=op, index=i, id=doc_oid, ok=True)
+            else:
+                results[i] = BulkItemResult(
+                    op=op, index=i, id=doc_oid, ok=False, error="Document not found or inaccessible"
+                )
+
+        return [results[i] for i in sorted(results)]
+
     async def delete(
         self,
         doc_id: Union[PydanticObjectId, str],
@@ -306,37 +1067,28 @@ class CRUD(Generic[ModelType]):
         obj = await self.get_by_id(
             doc_id=doc_id, company_id=company_id, 
             include_deleted=True, include_deactivated=True,            
-            session=session, use_company_id=use_company_id
+            session=session, use_company_id=use_company_id,
+            use_cache=False  # Saving a cached copy could overwrite newer fields
         )
 
+        started = time.perf_counter()
         if hard_delete:
 
-            endpoint = str(request.url) if request and hasattr(request, "url") else None
-            method = str(request.method) if request and hasattr(request, "method") else None
-            headers = {k: str(v)[:100] for k, v in request.headers.items()} if request and hasattr(request, "headers") else {}
-            query_params = {k: str(v)[:200] for k, v in request.query_params.items()} if request and hasattr(request, "query_params") else {}
-            client_host = request.client.host if request and hasattr(request, "client") and hasattr(request.client, "host") else None
-
-            deleted_data = obj.model_dump()  # snapshot of the document
-
-            await Log(
-                user_id=str(user_id) if user_id else None,
-                endpoint=endpoint,
-                action=method,
-                level=LogLevel.PERMANENT_DELETE,
-                details={
-                    "deleted_doc": deleted_data,
-                    "error_msg": "",
-                    "headers": headers,
-                    "query_params": query_params,
-                    "client_host": client_host
-                }
-            ).insert()
+            # Waits for the audit writer rather than drop a deletion record
+            await audit_sink.put(audit_entry(
+                request, LogLevel.PERMANENT_DELETE, "", user_id=user_id,
+                details={"deleted_doc": obj.model_dump()}  # snapshot of the document
+            ))
 
             await obj.delete(session=session)
         else:
+            now = datetime.now(timezone.utc)
             obj.is_deleted = True
             obj.updated_by = user_id
+            obj.updated_at = now  # Seen by expected_updated_at guards in update()
             obj.deleted_by = user_id
-            obj.deleted_at = datetime.now(timezone.utc)
+            obj.deleted_at = now
             await obj.save(session=session)
+        observe(self.model, "delete", started, {"_id": obj.id}, limit=1)
+
+        self.invalidate(obj.id)
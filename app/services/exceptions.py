@@ -14,6 +14,14 @@ class ValidationError(ServiceError):
     """Raised when input data fails business validation"""
     pass
 
+class ConflictError(ServiceError):
+    """Raised when a document changed since the caller last read it"""
+    pass
+
+class ServiceBusy(ServiceError):
+    """Raised when a bounded resource is saturated and the caller should retry"""
+    pass
+
 class OTPAttemptsExceeded(Exception):    
     """Raised when user exceeds number of attempts on otp sent to email address"""
     pass
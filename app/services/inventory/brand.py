@@ -4,8 +4,12 @@ from beanie import PydanticObjectId
 from app.models.inventory.brand import Brand
 
 from app.schemas.inventory.brand import BrandCreate, BrandUpdate
+from app.schemas.base import BulkRequest, BulkResult
 
 from app.services.exceptions import NotFoundError, AlreadyExistsError, ValidationError
+from app.services.crud_services import CRUD
+
+crud = CRUD(Brand)
 
 
 async def create_brand(data: BrandCreate) -> Brand:
@@ -109,3 +113,31 @@ async def activate_brand(brand_id: str) -> Brand:
     brand.is_active = True
     await brand.replace()
     return brand
+
+
+async def bulk_brands(
+    data: BulkRequest[BrandCreate, BrandUpdate],
+    user_id: PydanticObjectId
+) -> BulkResult:
+    """Create, update and soft-delete brands in batches."""
+    creates = []
+    for item in data.create:
+        item_dict = item.model_dump()
+        item_dict["created_by"] = user_id
+        creates.append(item_dict)
+
+    results = await crud.bulk_create(creates, unique_fields=["name"])
+    results += await crud.bulk_update(
+        [(item.id, item.data) for item in data.update],
+        user_id=user_id,
+        unique_fields=["name"],
+        use_company_id=False
+    )
+    results += await crud.bulk_set_flags(
+        data.soft_delete,
+        user_id=user_id,
+        fields=[("is_deleted", True), ("is_active", False)],
+        use_company_id=False,
+        op="soft_delete"
+    )
+    return BulkResult(results=results)
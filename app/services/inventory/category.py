@@ -0,0 +1,31 @@
+from typing import List, Optional, Tuple
+
+from app.models.inventory.category import Category
+
+from app.schemas.base import Page
+
+from app.services.crud_services import CRUD
+
+from app.constants import SortOrder, CountMode
+
+crud = CRUD(Category)
+
+
+async def list_categories(
+    skip: int = 0,
+    limit: int = 100,
+    sort_order: Optional[List[Tuple[str, SortOrder]]] = None,
+    cursor: Optional[str] = None,
+    count: Optional[CountMode] = CountMode.EXACT
+) -> Page:
+    """List non-deleted categories (active or not) with a cached total."""
+    res = await crud.list(
+        skip=skip,
+        limit=limit,
+        include_deactivated=True,
+        sort=sort_order,
+        use_company_id=False,
+        cursor=cursor,
+        count=count
+    )
+    return res
@@ -4,10 +4,14 @@ from beanie import PydanticObjectId
 from app.models.organization.area import Area
 
 from app.schemas.organization.location import AreaCreate, AreaUpdate
+from app.schemas.base import BulkRequest, BulkResult
 
 from app.services.exceptions import (
     NotFoundError, AlreadyExistsError, ValidationError
 )
+from app.services.crud_services import CRUD
+
+crud = CRUD(Area)
 
 
 async def create_area(data: AreaCreate) -> Area:
@@ -122,3 +126,31 @@ async def activate_area(area_id: str) -> Area:
     area.is_active = True
     await area.replace()
     return area
+
+
+async def bulk_areas(
+    data: BulkRequest[AreaCreate, AreaUpdate],
+    user_id: PydanticObjectId
+) -> BulkResult:
+    """Create, update and soft-delete areas in batches."""
+    creates = []
+    for item in data.create:
+        item_dict = item.model_dump()
+        item_dict["created_by"] = user_id
+        creates.append(item_dict)
+
+    results = await crud.bulk_create(creates, unique_fields=["name", "code"])
+    results += await crud.bulk_update(
+        [(item.id, item.data) for item in data.update],
+        user_id=user_id,
+        unique_fields=["name", "code"],
+        use_company_id=False
+    )
+    results += await crud.bulk_set_flags(
+        data.soft_delete,
+        user_id=user_id,
+        fields=[("is_deleted", True), ("is_active", False)],
+        use_company_id=False,
+        op="soft_delete"
+    )
+    return BulkResult(results=results)
@@ -4,10 +4,14 @@ from beanie import PydanticObjectId
 from app.models.organization.country import Country
 
 from app.schemas.organization.location import CountryCreate, CountryUpdate
+from app.schemas.base import BulkRequest, BulkResult
 
 from app.services.exceptions import (
     NotFoundError, AlreadyExistsError, ValidationError
 )
+from app.services.crud_services import CRUD
+
+crud = CRUD(Country)
 
 
 async def create_country(data: CountryCreate) -> Country:
@@ -145,3 +149,31 @@ async def activate_country(country_id: str) -> Country:
     country.is_active = True
     await country.replace()
     return country
+
+
+async def bulk_countries(
+    data: BulkRequest[CountryCreate, CountryUpdate],
+    user_id: PydanticObjectId
+) -> BulkResult:
+    """Create, update and soft-delete countries in batches."""
+    creates = []
+    for item in data.create:
+        item_dict = item.model_dump()
+        item_dict["created_by"] = user_id
+        creates.append(item_dict)
+
+    results = await crud.bulk_create(creates, unique_fields=["name", "code"])
+    results += await crud.bulk_update(
+        [(item.id, item.data) for item in data.update],
+        user_id=user_id,
+        unique_fields=["name", "code"],
+        use_company_id=False
+    )
+    results += await crud.bulk_set_flags(
+        data.soft_delete,
+        user_id=user_id,
+        fields=[("is_deleted", True), ("is_active", False)],
+        use_company_id=False,
+        op="soft_delete"
+    )
+    return BulkResult(results=results)
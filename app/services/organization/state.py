@@ -4,10 +4,14 @@ from beanie import PydanticObjectId
 from app.models.organization.state import State
 
 from app.schemas.organization.location import StateCreate, StateUpdate
+from app.schemas.base import BulkRequest, BulkResult
 
 from app.services.exceptions import (
     NotFoundError, AlreadyExistsError, ValidationError
 )
+from app.services.crud_services import CRUD
+
+crud = CRUD(State)
 
 
 async def create_state(data: StateCreate) -> State:
@@ -122,3 +126,31 @@ async def activate_state(state_id: str) -> State:
     state.is_active = True
     await state.replace()
     return state
+
+
+async def bulk_states(
+    data: BulkRequest[StateCreate, StateUpdate],
+    user_id: PydanticObjectId
+) -> BulkResult:
+    """Create, update and soft-delete states in batches."""
+    creates = []
+    for item in data.create:
+        item_dict = item.model_dump()
+        item_dict["created_by"] = user_id
+        creates.append(item_dict)
+
+    results = await crud.bulk_create(creates, unique_fields=["name", "code"])
+    results += await crud.bulk_update(
+        [(item.id, item.data) for item in data.update],
+        user_id=user_id,
+        unique_fields=["name", "code"],
+        use_company_id=False
+    )
+    results += await crud.bulk_set_flags(
+        data.soft_delete,
+        user_id=user_id,
+        fields=[("is_deleted", True), ("is_active", False)],
+        use_company_id=False,
+        op="soft_delete"
+    )
+    return BulkResult(results=results)
@@ -0,0 +1,220 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from beanie import PydanticObjectId
+from starlette.routing import Match
+from starlette.types import Scope
+
+from app.core.settings import settings
+from app.models.profile import Profile
+from app.models.profile_toggle import ProfileToggle
+from app.services.exceptions import NotFoundError, ValidationError
+from app.utils.stack_sampler import StackSampler
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+
+# Keep profile writes referenced until they finish
+_pending: Set[asyncio.Task] = set()
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _signature(expires: int) -> str:
+    return hmac.new(
+        settings.SECRET_KEY.encode(), f"profile:{expires}".encode(), hashlib.sha256
+    ).hexdigest()
+
+
+def sign_profile_header(ttl_seconds: int) -> Tuple[str, datetime]:
+    """X-Profile value any worker accepts until it expires, and that expiry."""
+    expires = int(time.time()) + min(ttl_seconds, settings.PROFILE_TOKEN_MAX_SECONDS)
+    return f"{expires}.{_signature(expires)}", datetime.fromtimestamp(expires, timezone.utc)
+
+
+def verify_profile_header(value: str) -> bool:
+    expires, _, signature = value.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _signature(int(expires)))
+
+
+def route_template(scope: Scope) -> Optional[str]:
+    """Template of the route the router will pick, matched ahead of routing."""
+    router = getattr(scope.get("app"), "router", None)
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match is Match.FULL:
+            return getattr(route, "path_format", None)
+    return None
+
+
+class Profiler:
+    """
+    Decides which requests run under a `StackSampler` and stores the result.
+    Toggles live in `ProfileToggle` and are mirrored here, refreshed every
+    PROFILE_TOGGLE_POLL_SECONDS; while none is active and the request carries
+    no X-Profile header, `trigger` returns without any further work.
+    """
+
+    def __init__(self):
+        self.toggles: Dict[Tuple[str, str], Tuple[int, datetime]] = {}  # (route, method) -> (every, expires_at)
+        self._seen: Counter = Counter()
+        self.active = 0
+        self.counts: Counter = Counter()  # started, recorded, failed, busy
+
+    def trigger(self, scope: Scope) -> Optional[str]:
+        for name, value in scope.get("headers") or ():
+            if name == PROFILE_HEADER and verify_profile_header(value.decode("latin-1")):
+                return "header"
+        if self.toggles:
+            return self._toggled(scope)
+        return None
+
+    def _toggled(self, scope: Scope) -> Optional[str]:
+        template = route_template(scope)
+        if template is None:
+            return None
+        for key in ((template, scope["method"]), (template, "*")):
+            toggle = self.toggles.get(key)
+            if toggle is None:
+                continue
+            every, expires_at = toggle
+            if expires_at <= datetime.now(timezone.utc):
+                return None
+            self._seen[key] += 1
+            return "toggle" if self._seen[key] % every == 0 else None
+        return None
+
+    def start(self) -> Optional[StackSampler]:
+        """A running sampler for the current task, or None when enough already run."""
+        if self.active >= settings.PROFILE_MAX_CONCURRENT:
+            self.counts["busy"] += 1
+            return None
+        self.active += 1
+        self.counts["started"] += 1
+        sampler = StackSampler(asyncio.current_task(), settings.PROFILE_INTERVAL_MS / 1000)
+        sampler.start()
+        return sampler
+
+    def finish(self, sampler: StackSampler, **fields: Any) -> None:
+        """Stop sampling and store the profile in the background."""
+        sampler.stop()
+        self.active -= 1
+        task = asyncio.get_running_loop().create_task(self._record(sampler, fields))
+        _pending.add(task)
+        task.add_done_callback(_pending.discard)
+
+    async def _record(self, sampler: StackSampler, fields: Dict[str, Any]) -> None:
+        samples, running = sampler.totals()
+        collapsed, stacks = sampler.collapsed(settings.PROFILE_MAX_STACKS)
+        try:
+            await Profile(
+                duration_ms=round(sampler.duration_ms, 2),
+                interval_ms=settings.PROFILE_INTERVAL_MS,
+                samples=samples,
+                running_samples=running,
+                stacks=stacks,
+                collapsed=collapsed,
+                **fields
+            ).insert()
+            self.counts["recorded"] += 1
+        except Exception:
+            self.counts["failed"] += 1
+            logger.warning("Could not store profile for %s", fields.get("path"), exc_info=True)
+
+    async def refresh(self) -> None:
+        now = datetime.now(timezone.utc)
+        toggles = await ProfileToggle.find({"expires_at": {"$gt": now}}).to_list()
+        self.toggles = {(t.route, t.method): (t.every, _aware(t.expires_at)) for t in toggles}
+
+    async def poll(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.warning("Profile toggle refresh failed", exc_info=True)
+            await asyncio.sleep(settings.PROFILE_TOGGLE_POLL_SECONDS)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counts, "active": self.active, "toggles": len(self.toggles)}
+
+
+profiler = Profiler()
+
+
+async def set_profile_toggle(
+    route: str,
+    method: str = "*",
+    every: int = 1,
+    minutes: int = 15,
+    user_id: Optional[PydanticObjectId] = None
+) -> ProfileToggle:
+    if not route.startswith("/"):
+        raise ValidationError("Route must be a path template such as /api/v1/sales/{sale_id}")
+    method = method.upper()
+    expires_at = datetime.now(timezone.utc) + timedelta(minutes=minutes)
+    await ProfileToggle.get_motor_collection().update_one(
+        {"route": route, "method": method},
+        {
+            "$set": {"every": every, "expires_at": expires_at, "created_by": user_id},
+            "$setOnInsert": {"created_at": datetime.now(timezone.utc)},
+        },
+        upsert=True
+    )
+    # This worker at once; the others on their next poll
+    await profiler.refresh()
+    return await ProfileToggle.find_one({"route": route, "method": method})
+
+
+async def remove_profile_toggle(route: str, method: str = "*") -> None:
+    result = await ProfileToggle.get_motor_collection().delete_one(
+        {"route": route, "method": method.upper()}
+    )
+    if not result.deleted_count:
+        raise NotFoundError("No profiling toggle for this route")
+    await profiler.refresh()
+
+
+async def list_profile_toggles() -> List[ProfileToggle]:
+    return await ProfileToggle.find(
+        {"expires_at": {"$gt": datetime.now(timezone.utc)}}
+    ).sort("route").to_list()
+
+
+async def list_profiles(
+    skip: int = 0,
+    limit: int = 50,
+    route: Optional[str] = None,
+    method: Optional[str] = None,
+    trigger: Optional[str] = None,
+    projection: Any = None
+) -> List[Any]:
+    """Most recent first (capped collections keep insertion order)."""
+    query: Dict[str, Any] = {}
+    if route:
+        query["route"] = route
+    if method:
+        query["method"] = method.upper()
+    if trigger:
+        query["trigger"] = trigger
+    find = Profile.find(query).sort([("$natural", -1)]).skip(skip).limit(limit)
+    if projection is not None:
+        find = find.project(projection)  # Leaves the collapsed stacks in Mongo
+    return await find.to_list()
+
+
+async def get_profile(profile_id: PydanticObjectId) -> Profile:
+    profile = await Profile.get(profile_id)
+    if not profile:
+        raise NotFoundError("Profile not found")
+    return profile
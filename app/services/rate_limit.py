@@ -0,0 +1,95 @@
+from typing import List, Optional, Tuple
+
+from beanie import PydanticObjectId
+
+from app.models.user_setup.plan import Plan
+from app.models.user_setup.tenant import Tenant
+
+from app.constants import TenantTier
+from app.core.settings import settings
+from app.services.crud_services import CRUD
+from app.services.auth.token import bearer_claims
+from app.utils.cache import TTLCache, get_cache
+
+TIER_CACHE = "ratelimit:tenant_tier"
+
+
+def _cache() -> TTLCache:
+    return get_cache(TIER_CACHE, maxsize=10000, ttl=settings.RATE_LIMIT_QUOTA_CACHE_SECONDS)
+
+
+def _tier_limit(tier: Optional[str]) -> int:
+    limits = settings.RATE_LIMIT_TENANT_BY_TIER
+    return limits.get(tier or "", limits.get(TenantTier.FREE.value, settings.RATE_LIMIT_USER))
+
+
+async def tenant_tier(company_id: PydanticObjectId) -> Optional[str]:
+    """Tier of the tenant's plan (the tenant's own tier as fallback); cached."""
+    cache = _cache()
+    tier = cache.get(company_id)
+    if tier is not None:
+        return tier or None
+    generation = cache.generation
+
+    tenant = await Tenant.get_motor_collection().find_one(
+        {"_id": company_id}, {"plan_id": 1, "tier": 1}
+    )
+    tier = tenant.get("tier") if tenant else None
+    if tenant and tenant.get("plan_id"):
+        plan = await Plan.get_motor_collection().find_one({"_id": tenant["plan_id"]}, {"tier": 1})
+        if plan and plan.get("tier"):
+            tier = plan["tier"]
+
+    if cache.generation == generation:
+        cache.set(company_id, tier or "")  # "" caches unknown tenants too
+    return tier
+
+
+async def claims_tier(claims: Optional[dict]) -> str:
+    """Tier label for a request's token claims; a low-cardinality stand-in for the tenant."""
+    if not claims or not claims.get("company_id"):
+        return "anonymous"
+    try:
+        return await tenant_tier(PydanticObjectId(claims["company_id"])) or "unknown"
+    except Exception:
+        return "unknown"
+
+
+async def tenant_quota(company_id: PydanticObjectId) -> int:
+    """Requests per window for the whole tenant, from its tier."""
+    return _tier_limit(await tenant_tier(company_id))
+
+
+async def request_limits(authorization: Optional[str], client_ip: Optional[str]) -> List[Tuple[str, int]]:
+    """
+    (key, limit) pairs a request is counted against, narrowest first. Signed-in
+    callers get a bucket per user and one per tenant, so the tills of a store
+    behind one NAT no longer share an IP bucket; others are limited by IP.
+    """
+    claims = bearer_claims(authorization)  # Decodes are cached; invalid tokens count by IP
+    if claims and claims.get("sub") and claims.get("company_id"):
+        try:
+            company_id = PydanticObjectId(claims["company_id"])
+        except Exception:
+            company_id = None
+        if company_id:
+            return [
+                (f"user:{claims['sub']}", settings.RATE_LIMIT_USER),
+                (f"tenant:{company_id}", await tenant_quota(company_id)),
+            ]
+    return [(f"ip:{client_ip or 'unknown'}", settings.RATE_LIMIT_ANONYMOUS)]
+
+
+def _drop_tenants(tenant_ids: List[PydanticObjectId]) -> None:
+    cache = _cache()
+    for tenant_id in tenant_ids:
+        cache.pop(tenant_id)
+
+
+def _drop_all(plan_ids: List[PydanticObjectId]) -> None:
+    if plan_ids:
+        _cache().clear()
+
+
+CRUD.on_write(Tenant, _drop_tenants)
+CRUD.on_write(Plan, _drop_all)
@@ -1,15 +1,17 @@
-from typing import List, Optional, Tuple, Any, Dict
+from typing import List, Optional, Tuple, Any, Dict, AsyncIterator
 from beanie import PydanticObjectId
 
 from app.models.role import Role
 
 from app.schemas.role import RoleCreate, RoleUpdate, RoleResponse
+from app.schemas.base import Page, BulkRequest, BulkResult
 
 from app.services.crud_services import CRUD
 
-from app.constants import SortOrder
+from app.constants import SortOrder, CountMode
+from app.core.settings import settings
 
-crud = CRUD(Role)
+crud = CRUD(Role, cache_ttl=settings.CRUD_CACHE_TTL_SECONDS)
 
 
 async def create_role(data: RoleCreate, company_id:PydanticObjectId) -> Role:    
@@ -19,6 +21,36 @@ async def create_role(data: RoleCreate, company_id:PydanticObjectId) -> Role:
     return res
 
 
+async def bulk_roles(
+    data: BulkRequest[RoleCreate, RoleUpdate],
+    company_id: PydanticObjectId,
+    user_id: PydanticObjectId
+) -> BulkResult:
+    """Create, update and soft-delete roles in batches."""
+    creates = []
+    for item in data.create:
+        item_dict = item.model_dump()
+        item_dict["company_id"] = company_id
+        item_dict["created_by"] = user_id
+        creates.append(item_dict)
+
+    results = await crud.bulk_create(creates, unique_fields=["name"])
+    results += await crud.bulk_update(
+        [(item.id, item.data) for item in data.update],
+        user_id=user_id,
+        company_id=company_id,
+        unique_fields=["name"]
+    )
+    results += await crud.bulk_set_flags(
+        data.soft_delete,
+        user_id=user_id,
+        company_id=company_id,
+        fields=[("is_deleted", True), ("is_active", False)],
+        op="soft_delete"
+    )
+    return BulkResult(results=results)
+
+
 async def get_role(
     role_id: str,
     company_id:PydanticObjectId ,
@@ -43,8 +75,11 @@ async def list_roles(
     filters: Optional[Dict[str, Any]] = None,
     search: Optional[Dict[str, Any]] = None,
     sort_order: Optional[List[Tuple[str, SortOrder]]] = None,
-    exact_match: Optional[bool] = False
-) -> List[RoleResponse]:
+    exact_match: Optional[bool] = False,
+    cursor: Optional[str] = None,
+    projection: Optional[List[str]] = None,
+    count: Optional[CountMode] = None
+) -> Page:
     res = await crud.list(
         company_id=company_id,
         skip=skip,
@@ -54,11 +89,33 @@ async def list_roles(
         filters=filters,
         sort=sort_order,
         search=search,
-        exact_match=exact_match if exact_match is not None else False
+        exact_match=exact_match if exact_match is not None else False,
+        cursor=cursor,
+        projection=projection,
+        count=count
     )
     return res
 
 
+def export_roles(
+    company_id: PydanticObjectId,
+    include_deleted: bool = False,
+    include_deactivated: bool = False,
+    filters: Optional[Dict[str, Any]] = None,
+    sort_order: Optional[List[Tuple[str, SortOrder]]] = None,
+    projection: Optional[List[str]] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """Stream every role of the company as raw documents."""
+    return crud.stream(
+        company_id=company_id,
+        include_deleted=include_deleted,
+        include_deactivated=include_deactivated,
+        filters=filters,
+        sort=sort_order,
+        projection=projection,
+        batch_size=settings.EXPORT_BATCH_SIZE
+    )
+
 async def update_role(
     role_id: str,
     data: RoleUpdate,     
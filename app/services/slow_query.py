@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import time
+from collections.abc import Mapping
+from typing import Any, Dict, List, Optional, Set, Tuple, Type
+
+from beanie import Document
+from bson import json_util
+
+from app.core.settings import settings
+from app.models.slow_query import SlowQuery
+from app.utils.cache import get_cache
+
+logger = logging.getLogger(__name__)
+
+# Keep explain tasks referenced until they finish
+_pending: Set[asyncio.Task] = set()
+
+# Operations that are themselves a find; for the others the explain is of a find
+# with the same filter, since explaining the write would need to re-run it
+FIND_OPERATIONS = {"get_by_id", "list"}
+
+
+def _stored_key(key: str) -> str:
+    # Servers before 5.0 refuse field names starting with "$" or containing "."
+    # ($or, $regex, "address.city"); fullwidth lookalikes keep the shape readable
+    key = key.replace(".", "\uff0e")
+    return "\uff04" + key[1:] if key.startswith("$") else key
+
+
+def filter_shape(value: Any) -> Any:
+    """
+    Replace every value of a query filter by its type so shapes can be grouped.
+    Keys are made storable: a leading "$" becomes "＄" and "." becomes "．".
+    """
+    if isinstance(value, Mapping):
+        return {_stored_key(str(key)): filter_shape(val) for key, val in value.items()}
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(v, Mapping) for v in value):
+            return [filter_shape(v) for v in value]  # $and / $or branches
+        return f"[{type(value[0]).__name__}]" if value else "[]"
+    return type(value).__name__
+
+
+def _walk_plan(node: Any, stages: List[str], indexes: List[str]) -> None:
+    if not isinstance(node, Mapping):
+        return
+    if "stage" in node:
+        stages.append(node["stage"])
+    if node.get("indexName"):
+        indexes.append(node["indexName"])
+    # "queryPlan" wraps the plan on servers using the slot-based engine
+    for key in ("queryPlan", "inputStage", "outerStage", "innerStage"):
+        _walk_plan(node.get(key), stages, indexes)
+    for child in node.get("inputStages", []):
+        _walk_plan(child, stages, indexes)
+
+
+def summarize_explain(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce `explain("executionStats")` output to what tells a scan from a seek."""
+    stages: List[str] = []
+    indexes: List[str] = []
+    _walk_plan(explain.get("queryPlanner", {}).get("winningPlan", {}), stages, indexes)
+    stats = explain.get("executionStats", {})
+
+    if "COLLSCAN" in stages:
+        plan = "COLLSCAN"
+    elif "IXSCAN" in stages:
+        plan = "IXSCAN"
+    else:
+        plan = stages[-1] if stages else None  # IDHACK, EXPRESS_IXSCAN, EOF, ...
+
+    return {
+        "plan": plan,
+        "stages": stages,
+        "index_names": list(dict.fromkeys(indexes)),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "docs_examined": stats.get("totalDocsExamined"),
+        "n_returned": stats.get("nReturned"),
+    }
+
+
+def observe(
+    model: Type[Document],
+    operation: str,
+    started: float,
+    query_filter: Optional[Dict[str, Any]] = None,
+    sort: Optional[List[Tuple[str, int]]] = None,
+    collation: Optional[Dict[str, Any]] = None,
+    limit: Optional[int] = None
+) -> None:
+    """
+    Call after a query with the `time.perf_counter()` taken before it. Slow calls
+    are logged; the first one of each (model, operation, filter shape) within
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS is explained and stored in the background.
+    """
+    duration_ms = (time.perf_counter() - started) * 1000
+    if duration_ms < settings.SLOW_QUERY_MS:
+        return
+
+    shape = filter_shape(query_filter) if query_filter is not None else None
+    logger.warning(
+        "Slow %s.%s: %.1f ms, filter %s", model.__name__, operation, duration_ms, shape
+    )
+
+    recent = get_cache(
+        "slow_query:explained", maxsize=1024, ttl=settings.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS
+    )
+    key = (model.__name__, operation, json_util.dumps(shape, sort_keys=True))
+    if recent.get(key):
+        return
+    recent.set(key, True)
+
+    task = asyncio.get_running_loop().create_task(
+        _record(model, operation, duration_ms, query_filter, shape, sort, collation, limit)
+    )
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+async def _record(
+    model: Type[Document],
+    operation: str,
+    duration_ms: float,
+    query_filter: Optional[Dict[str, Any]],
+    shape: Optional[Dict[str, Any]],
+    sort: Optional[List[Tuple[str, int]]],
+    collation: Optional[Dict[str, Any]],
+    limit: Optional[int]
+) -> None:
+    summary: Dict[str, Any] = {}
+    if query_filter is not None:
+        collection = model.get_motor_collection()
+        command: Dict[str, Any] = {"find": collection.name, "filter": query_filter}
+        if sort:
+            command["sort"] = dict(sort)
+        if collation:
+            command["collation"] = collation
+        if limit:
+            command["limit"] = limit
+        try:
+            explain = await collection.database.command(
+                {"explain": command, "verbosity": "executionStats"}
+            )
+            summary = summarize_explain(explain)
+            summary["explained"] = (
+                "find" if operation in FIND_OPERATIONS else f"find with the {operation} filter"
+            )
+        except Exception:
+            logger.warning("Could not explain slow %s.%s", model.__name__, operation, exc_info=True)
+
+    try:
+        await SlowQuery(
+            model=model.__name__,
+            operation=operation,
+            duration_ms=round(duration_ms, 2),
+            filter_shape=shape,
+            sort=[list(item) for item in sort] if sort else None,
+            collation=collation,
+            **summary
+        ).insert()
+    except Exception:
+        logger.warning("Could not record slow %s.%s", model.__name__, operation, exc_info=True)
+
+
+async def list_slow_queries(
+    skip: int = 0,
+    limit: int = 50,
+    model: Optional[str] = None,
+    operation: Optional[str] = None,
+    plan: Optional[str] = None
+) -> List[SlowQuery]:
+    """Most recent first (capped collections keep insertion order)."""
+    query: Dict[str, Any] = {}
+    if model:
+        query["model"] = model
+    if operation:
+        query["operation"] = operation
+    if plan:
+        query["plan"] = plan
+    return await SlowQuery.find(query).sort([("$natural", -1)]).skip(skip).limit(limit).to_list()
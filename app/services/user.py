@@ -1,21 +1,23 @@
 from fastapi import Depends
-from typing import List, Optional, Tuple, Any, Dict
+from typing import List, Optional, Tuple, Any, Dict, AsyncIterator
 from beanie import PydanticObjectId
 
 from app.models.user_setup.user import User
 from app.models.inventory.warehouse.user_warehouse_access import UserWarehouseAccess
 
 from app.schemas.user import UserCreate, UserUpdate
+from app.schemas.base import Page, BulkRequest, BulkResult
 
 from app.services.crud_services import CRUD
 from app.services.auth import (
-  get_current_company, get_password_hash
+  get_current_company, get_password_hash, hash_passwords
 )
 
 
 
 
-from app.constants import SortOrder
+from app.constants import SortOrder, CountMode
+from app.core.settings import settings
 
 
 from app.utils.db_transaction import with_transaction
@@ -35,7 +37,7 @@ async def create_user(
     user_dict = user_data.model_dump(exclude={"password", "warehouse_id"})
     
     # Get hashed password
-    user_dict["hashed_password"] = get_password_hash(plain_password)
+    user_dict["hashed_password"] = await get_password_hash(plain_password)
 
     # Validate unique fields and create user record
     created_user = await user_crud.create(
@@ -55,6 +57,65 @@ async def create_user(
  
     return created_user
 
+
+async def bulk_users(
+    data: BulkRequest[UserCreate, UserUpdate],
+    company_id: PydanticObjectId,
+    user_id: PydanticObjectId
+) -> BulkResult:
+    """Create, update and soft-delete users in batches (tenant onboarding)."""
+    # BulkRequest caps each section at BULK_MAX_ITEMS, so no bcrypt time is
+    # spent on a batch bulk_create would refuse
+    hashes = await hash_passwords([item.password for item in data.create])
+
+    creates = []
+    warehouses = []
+    for item, hashed in zip(data.create, hashes):
+        item_dict = item.model_dump(exclude={"password", "warehouse_id"})
+        item_dict["hashed_password"] = hashed
+        item_dict["company_id"] = company_id
+        item_dict["created_by"] = user_id
+        creates.append(item_dict)
+        warehouses.append(item.warehouse_id)
+
+    results = await user_crud.bulk_create(creates, unique_fields=["email"])
+
+    # Link created users with their warehouse; a user whose link fails is
+    # reported failed, with its id, so the access can be granted afterwards
+    linked = [r for r in results if r.ok and warehouses[r.index]]
+    if linked:
+        access = [
+            {"user_id": r.id, "company_id": company_id, "warehouse_id": warehouses[r.index]}
+            for r in linked
+        ]
+        for created, link in zip(linked, await user_wh_crud.bulk_create(access)):
+            if not link.ok:
+                created.ok = False
+                created.error = f"User created, but warehouse access was not granted: {link.error}"
+
+    changes = [item.data.model_dump(exclude_unset=True) for item in data.update]
+    new_passwords = [c for c in changes if "password" in c]
+    hashed = await hash_passwords([c.pop("password") for c in new_passwords])
+    for change, hashed_password in zip(new_passwords, hashed):
+        change["hashed_password"] = hashed_password
+    updates = [(item.id, change) for item, change in zip(data.update, changes)]
+
+    results += await user_crud.bulk_update(
+        updates,
+        user_id=user_id,
+        company_id=company_id,
+        unique_fields=["email"]
+    )
+    results += await user_crud.bulk_set_flags(
+        data.soft_delete,
+        user_id=user_id,
+        company_id=company_id,
+        fields=[("is_deleted", True), ("is_active", False)],
+        op="soft_delete"
+    )
+    return BulkResult(results=results)
+
+
 async def get_user(
     user_id: str,
     company_id:PydanticObjectId = Depends(get_current_company),
@@ -72,8 +133,11 @@ async def list_users(
     filters: Optional[Dict[str, Any]] = None,
     search: Optional[Dict[str, Any]] = None,
     sort_order: Optional[List[Tuple[str, SortOrder]]] = None,
-    exact_match: Optional[bool] = False
-) -> List[User]:
+    exact_match: Optional[bool] = False,
+    cursor: Optional[str] = None,
+    projection: Optional[List[str]] = None,
+    count: Optional[CountMode] = None
+) -> Page:
 
     res = await user_crud.list(
         company_id,
@@ -83,11 +147,33 @@ async def list_users(
         filters=filters,
         sort=sort_order,
         search=search,
-        exact_match=exact_match if exact_match is not None else False
+        exact_match=exact_match if exact_match is not None else False,
+        cursor=cursor,
+        projection=projection,
+        count=count
     )
     return res
 
 
+def export_users(
+    company_id: PydanticObjectId,
+    include_deleted: bool = False,
+    include_deactivated: bool = False,
+    filters: Optional[Dict[str, Any]] = None,
+    sort_order: Optional[List[Tuple[str, SortOrder]]] = None,
+    projection: Optional[List[str]] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """Stream every user of the company as raw documents."""
+    return user_crud.stream(
+        company_id=company_id,
+        include_deleted=include_deleted,
+        include_deactivated=include_deactivated,
+        filters=filters,
+        sort=sort_order,
+        projection=projection,
+        batch_size=settings.EXPORT_BATCH_SIZE
+    )
+
 async def update_user(
     user_id: str,
     data: UserUpdate,     
@@ -97,7 +183,7 @@ async def update_user(
         doc_id = user_id, 
         company_id = company_id, 
         payload = data, 
-        unique_fields = ["name", "code"],
+        unique_fields = ["email"],  # Backed by the unique user_model_email index
         use_company_id = True
     )
     return res
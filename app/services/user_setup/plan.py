@@ -1,15 +1,18 @@
-from typing import List, Optional, Tuple, Any, Dict
+from typing import List, Optional, Tuple, Any, Dict, AsyncIterator
+from datetime import datetime
 from fastapi import Request
 
 from app.models.user_setup.plan import Plan
 
 from app.schemas.user_setup.plan import PlanCreate, PlanUpdate, PlanResponse
+from app.schemas.base import Page
 
 from app.services.crud_services import CRUD
+from app.core.settings import settings
 
-from app.constants import SortOrder
+from app.constants import SortOrder, CountMode
 
-crud = CRUD(Plan)
+crud = CRUD(Plan, cache_ttl=settings.CRUD_CACHE_TTL_SECONDS)
 
 
 async def create_plan(data: PlanCreate, current_user_id: str) -> Plan:  
@@ -41,8 +44,11 @@ async def list_plans(
     filters: Optional[Dict[str, Any]] = None,
     search: Optional[Dict[str, Any]] = None,
     sort_order: Optional[List[Tuple[str, SortOrder]]] = None,
-    exact_match: Optional[bool] = False
-) -> List[PlanResponse]:
+    exact_match: Optional[bool] = False,
+    cursor: Optional[str] = None,
+    projection: Optional[List[str]] = None,
+    count: Optional[CountMode] = None
+) -> Page:
     res = await crud.list(
         skip=skip,
         limit=limit,
@@ -52,22 +58,46 @@ async def list_plans(
         sort=sort_order,
         search=search,
         exact_match=exact_match if exact_match is not None else False,
-        use_company_id=False
+        use_company_id=False,
+        cursor=cursor,
+        projection=projection,
+        count=count
     )
     return res
 
 
+def export_plans(
+    include_deleted: bool = False,
+    include_deactivated: bool = False,
+    filters: Optional[Dict[str, Any]] = None,
+    sort_order: Optional[List[Tuple[str, SortOrder]]] = None,
+    projection: Optional[List[str]] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """Stream every plan as raw documents."""
+    return crud.stream(
+        include_deleted=include_deleted,
+        include_deactivated=include_deactivated,
+        filters=filters,
+        sort=sort_order,
+        use_company_id=False,
+        projection=projection,
+        batch_size=settings.EXPORT_BATCH_SIZE
+    )
+
+
 async def update_plan(
     plan_id: str,
     data: PlanUpdate,
-    user_id: str
+    user_id: str,
+    expected_updated_at: Optional[datetime] = None
 ) -> Plan:
     res = await crud.update(
         doc_id=plan_id,
         payload=data, 
         unique_fields=["name"],
         use_company_id=False,
-        user_id=user_id
+        user_id=user_id,
+        expected_updated_at=expected_updated_at
     )
     return res
 
@@ -1,15 +1,17 @@
-from typing import List, Optional, Tuple, Any, Dict, Union
+from typing import List, Optional, Tuple, Any, Dict, Union, AsyncIterator
 from beanie import PydanticObjectId
 
 from app.models.user_setup.tenant import Tenant
 
 from app.schemas.user_setup.tenant import TenantCreate, TenantUpdate, TenantResponse
+from app.schemas.base import Page
 
 from app.services.crud_services import CRUD
+from app.core.settings import settings
 
-from app.constants import SortOrder
+from app.constants import SortOrder, CountMode
 
-crud = CRUD(Tenant)
+crud = CRUD(Tenant, cache_ttl=settings.CRUD_CACHE_TTL_SECONDS)
 
 
 async def create_tenant(data: TenantCreate) -> Tenant:    
@@ -36,8 +38,11 @@ async def list_tenants(
     filters: Optional[Dict[str, Any]] = None,
     search: Optional[Dict[str, Any]] = None,
     sort_order: Optional[List[Tuple[str, SortOrder]]] = None,
-    exact_match: Optional[bool] = False
-) -> List[TenantResponse]:
+    exact_match: Optional[bool] = False,
+    cursor: Optional[str] = None,
+    projection: Optional[List[str]] = None,
+    count: Optional[CountMode] = None
+) -> Page:
     res = await crud.list(
         company_id,
         skip,
@@ -47,11 +52,34 @@ async def list_tenants(
         filters=filters,
         sort=sort_order,
         search=search,
-        exact_match=exact_match if exact_match is not None else False
+        exact_match=exact_match if exact_match is not None else False,
+        cursor=cursor,
+        projection=projection,
+        count=count
     )
     return res
 
 
+def export_tenants(
+    company_id: PydanticObjectId,
+    include_deleted: bool = False,
+    include_deactivated: bool = False,
+    filters: Optional[Dict[str, Any]] = None,
+    sort_order: Optional[List[Tuple[str, SortOrder]]] = None,
+    projection: Optional[List[str]] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """Stream the company's tenants as raw documents."""
+    return crud.stream(
+        company_id=company_id,
+        include_deleted=include_deleted,
+        include_deactivated=include_deactivated,
+        filters=filters,
+        sort=sort_order,
+        projection=projection,
+        batch_size=settings.EXPORT_BATCH_SIZE
+    )
+
+
 async def update_tenant(
     tenant_id: str,
     data: TenantUpdate,     
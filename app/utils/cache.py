@@ -0,0 +1,118 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, Optional, Set, Tuple, TypeVar
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[V]):
+    """
+    In-process LRU cache with a per-entry TTL and hit/miss counters.
+
+    Entries may be tagged with a `group` so related keys (e.g. every variant
+    cached for one document) can be dropped together with `pop_group`.
+    `generation` changes on every invalidation; a reader that snapshots it
+    before a slow load can skip `set` if a write raced with the load.
+    Meant for a single event loop; there is no locking.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, name: Optional[str] = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.generation = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, V, Hashable]]" = OrderedDict()
+        self._groups: Dict[Hashable, Set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Optional[V]:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: V, group: Hashable = None, ttl: Optional[float] = None) -> None:
+        if key in self._data:
+            self._remove(key)
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value, group)
+        if group is not None:
+            self._groups.setdefault(group, set()).add(key)
+
+        while len(self._data) > self.maxsize:
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        self.generation += 1
+        if key in self._data:
+            self._remove(key)
+
+    def pop_group(self, group: Hashable) -> None:
+        self.generation += 1
+        for key in self._groups.pop(group, ()):
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._data.clear()
+        self._groups.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, group = self._data.pop(key)
+        if group is not None:
+            keys = self._groups.get(group)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._groups[group]
+
+
+# Named caches shared across the process, so every holder of a name sees
+# (and invalidates) the same entries
+_caches: Dict[str, TTLCache] = {}
+
+
+def get_cache(name: str, maxsize: int = 1024, ttl: float = 60.0) -> TTLCache:
+    """Return the cache registered under `name`, creating it on first use."""
+    cache = _caches.get(name)
+    if cache is None:
+        cache = TTLCache(maxsize=maxsize, ttl=ttl, name=name)
+        _caches[name] = cache
+    return cache
+
+
+def find_cache(name: str) -> Optional[TTLCache]:
+    return _caches.get(name)
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in _caches.items()}
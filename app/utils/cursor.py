@@ -0,0 +1,43 @@
+import base64
+from enum import Enum
+from typing import Any, Dict, List, Tuple
+
+from bson import json_util
+
+from app.constants.sort_order_enum import SortOrder
+
+
+def _plain(value: Any) -> Any:
+    # Enums are stored by value in Mongo, so the cursor must carry the value too
+    return value.value if isinstance(value, Enum) else value
+
+
+def encode_cursor(sort: List[Tuple[str, SortOrder]], values: List[Any]) -> str:
+    """
+    Build an opaque, URL-safe cursor from the sort spec and the sort-key
+    values of the last document on a page (``_id`` must be the last key).
+    """
+    payload = {
+        "s": [[field, order.value] for field, order in sort],
+        "v": [_plain(v) for v in values],
+    }
+    raw = json_util.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Reverse of ``encode_cursor``. Returns ``{"sort": [...], "values": [...]}``.
+    Raises ``ValueError`` for anything that was not produced by ``encode_cursor``.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json_util.loads(base64.urlsafe_b64decode(padded.encode()))
+        sort = [(field, SortOrder(order)) for field, order in payload["s"]]
+        values = list(payload["v"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Malformed cursor") from e
+
+    if len(sort) != len(values):
+        raise ValueError("Malformed cursor")
+    return {"sort": sort, "values": values}
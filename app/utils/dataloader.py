@@ -0,0 +1,132 @@
+import asyncio
+from typing import (
+    Any, Awaitable, Callable, Dict, Generic, Hashable, List, Optional, Set, TypeVar
+)
+
+from fastapi import Request
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+BatchFn = Callable[[List[K]], Awaitable[Dict[K, V]]]
+
+# Keep batch tasks referenced until they finish; the loop only holds weak references
+_pending: Set[asyncio.Task] = set()
+
+
+class DataLoader(Generic[K, V]):
+    """
+    Coalesces the `load()` calls issued while a batch is pending into one call
+    of `batch_fn`, and memoizes the results for the loader's lifetime.
+
+    `batch_fn` receives the unique keys and returns a mapping; keys missing
+    from the mapping resolve to None.
+    """
+
+    def __init__(
+        self,
+        batch_fn: BatchFn,
+        key_fn: Optional[Callable[[Any], K]] = None,
+        max_batch_size: int = 1000
+    ):
+        self._batch_fn = batch_fn
+        self._key_fn = key_fn or (lambda k: k)
+        self._max_batch_size = max_batch_size
+        self._cache: Dict[K, asyncio.Future] = {}
+        self._queue: List[K] = []
+
+    async def load(self, key: Any) -> Optional[V]:
+        key = self._key_fn(key)
+        future = self._cache.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._cache[key] = future
+            self._queue.append(key)
+            if len(self._queue) == 1:
+                # Wait two ticks so loads from tasks that were just gathered
+                # (whose first step is queued behind us) join the same batch
+                loop.call_soon(loop.call_soon, self._dispatch)
+        return await future
+
+    async def load_many(self, keys: List[Any]) -> List[Optional[V]]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: Any, value: V) -> None:
+        """Seed the cache with an already loaded value."""
+        key = self._key_fn(key)
+        if key not in self._cache:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._cache[key] = future
+
+    def clear(self, key: Any = None) -> None:
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(self._key_fn(key), None)
+
+    def _dispatch(self) -> None:
+        queue, self._queue = self._queue, []
+        loop = asyncio.get_running_loop()
+        for i in range(0, len(queue), self._max_batch_size):
+            task = loop.create_task(self._run(queue[i:i + self._max_batch_size]))
+            _pending.add(task)
+            task.add_done_callback(_pending.discard)
+
+    async def _run(self, keys: List[K]) -> None:
+        try:
+            results = await self._batch_fn(keys)
+        except Exception as e:
+            for key in keys:
+                # Do not memoize failures; a later load retries
+                future = self._cache.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+
+        for key in keys:
+            future = self._cache.get(key)
+            if future is not None and not future.done():
+                future.set_result(results.get(key))
+
+
+class Loaders:
+    """Request-scoped registry so all lookups of one request share batches and cache."""
+
+    def __init__(self):
+        self._loaders: Dict[Hashable, DataLoader] = {}
+
+    def get(
+        self,
+        crud: Any,
+        company_id: Any = None,
+        include_deleted: bool = False,
+        include_deactivated: bool = False,
+        use_company_id: bool = True
+    ) -> DataLoader:
+        key = (
+            crud.model, str(company_id) if company_id else None,
+            include_deleted, include_deactivated, use_company_id
+        )
+        loader = self._loaders.get(key)
+        if loader is None:
+            loader = crud.loader(
+                company_id=company_id,
+                include_deleted=include_deleted,
+                include_deactivated=include_deactivated,
+                use_company_id=use_company_id
+            )
+            self._loaders[key] = loader
+        return loader
+
+
+# usage:
+# async def route(loaders: Loaders = Depends(get_loaders)):
+#     department = await loaders.get(department_crud, company_id).load(user.department_id)
+def get_loaders(request: Request) -> Loaders:
+    loaders = getattr(request.state, "loaders", None)
+    if loaders is None:
+        loaders = Loaders()
+        request.state.loaders = loaders
+    return loaders
@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, List
+
+from bson import Decimal128, ObjectId
+from fastapi.responses import StreamingResponse
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _plain(value: Any) -> Any:
+    """BSON-decoded value -> JSON-compatible value."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal128):
+        return str(value.to_decimal())
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [_plain(v) for v in value]
+    return value
+
+
+def _cell(value: Any) -> Any:
+    value = _plain(value)
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+
+async def _ndjson(rows: AsyncIterator[Dict[str, Any]], chunk_rows: int) -> AsyncIterator[str]:
+    lines: List[str] = []
+    async for row in rows:
+        lines.append(json.dumps(_plain(row), separators=(",", ":")))
+        if len(lines) >= chunk_rows:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+async def _csv(
+    rows: AsyncIterator[Dict[str, Any]], fields: List[str], chunk_rows: int
+) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["id" if f == "_id" else f for f in fields])
+
+    count = 0
+    async for row in rows:
+        writer.writerow([_cell(row.get(f)) for f in fields])
+        count += 1
+        if count % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    yield buffer.getvalue()
+
+
+def export_response(
+    rows: AsyncIterator[Dict[str, Any]],
+    fields: List[str],
+    fmt: str,
+    filename: str,
+    chunk_rows: int = 500
+) -> StreamingResponse:
+    """
+    Stream rows from `CRUD.stream` as NDJSON or CSV. Rows are flushed in chunks,
+    so only `chunk_rows` rows are ever held in memory.
+    """
+    body = _csv(rows, fields, chunk_rows) if fmt == "csv" else _ndjson(rows, chunk_rows)
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
@@ -0,0 +1,45 @@
+from typing import List, Type
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.schemas.base import Page
+from app.services.exceptions import ValidationError
+
+
+def _exposed_fields(response_model: Type[BaseModel]) -> List[str]:
+    # Documents are stored under the alias (e.g. `id` -> `_id`)
+    return [info.alias or name for name, info in response_model.model_fields.items()]
+
+
+def parse_fields(clause: str | None, response_model: Type[BaseModel]) -> List[str]:
+    """
+    Turn `fields=name,code` into a projection. Only fields exposed by
+    `response_model` can be requested, so hidden fields never leak; without
+    a clause every exposed field is projected.
+    """
+    exposed = _exposed_fields(response_model)
+    if not clause:
+        return exposed
+
+    requested: List[str] = ["_id"]
+    for part in clause.split(","):
+        field = part.strip()
+        if not field:
+            continue
+        field = "_id" if field == "id" else field
+        if field not in exposed:
+            raise ValidationError(f"Unknown field '{field}'")
+        if field not in requested:
+            requested.append(field)
+    return requested
+
+
+def lean_response(page: Page, status_code: int = 200) -> JSONResponse:
+    """Serialize a page of raw Mongo documents without building response models."""
+    return JSONResponse(
+        status_code=status_code,
+        content=jsonable_encoder(dict(page), custom_encoder={ObjectId: str}),
+    )
@@ -0,0 +1,128 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from types import CodeType, FrameType
+from typing import Any, List, Optional, Tuple
+
+RUNNING = "[running]"
+AWAITING = "[awaiting]"
+MAX_DEPTH = 128
+
+Stack = Tuple[str, ...]
+
+
+@lru_cache(maxsize=1024)
+def _short_path(filename: str) -> str:
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    cwd = os.getcwd() + os.sep
+    return filename[len(cwd):] if filename.startswith(cwd) else filename
+
+
+@lru_cache(maxsize=8192)
+def _label(code: CodeType) -> str:
+    # First line rather than current line, so one function folds into one frame
+    return f"{code.co_qualname} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _running_stack(frame: Optional[FrameType], root: Optional[CodeType]) -> List[str]:
+    codes: List[CodeType] = []
+    while frame is not None and len(codes) < MAX_DEPTH:
+        codes.append(frame.f_code)
+        frame = frame.f_back
+    codes.reverse()
+    if root in codes:
+        codes = codes[codes.index(root):]  # Drop the event loop's own frames
+    return [_label(code) for code in codes]
+
+
+def _await_chain(awaitable: Any) -> List[str]:
+    """Coroutines a suspended task is parked in, outermost first, ending in what it awaits."""
+    labels: List[str] = []
+    while awaitable is not None and len(labels) < MAX_DEPTH:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None) \
+            or getattr(awaitable, "ag_frame", None)
+        if frame is None:
+            labels.append(type(awaitable).__qualname__)  # Future, Task, ...
+            break
+        labels.append(_label(frame.f_code))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None) \
+            or getattr(awaitable, "ag_await", None)
+    return labels
+
+
+class StackSampler:
+    """
+    Wall-clock sampler for one asyncio task, built on `sys._current_frames` so it
+    needs no profiler package and costs nothing until started. A daemon thread
+    wakes every `interval` seconds and records where the task is: the live stack
+    of the event-loop thread while the task is the one executing (`[running]`),
+    otherwise the coroutines it is suspended in down to the future it waits on
+    (`[awaiting]`). Construct and stop it on the event-loop thread.
+    """
+
+    def __init__(self, task: asyncio.Task, interval: float):
+        self.task = task
+        self.interval = interval
+        self.loop = task.get_loop()
+        self.thread_id = threading.get_ident()
+        coro = task.get_coro()
+        self._root = getattr(coro, "cr_code", None) or getattr(coro, "gi_code", None)
+        self.counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.started = self.stopped = 0.0
+
+    def start(self) -> None:
+        self.started = time.perf_counter()
+        threading.Thread(target=self._run, name="stack-sampler", daemon=True).start()
+
+    def stop(self) -> None:
+        # No join, so the loop never waits on the thread; the lock guarantees
+        # nothing is counted after this returns
+        with self._lock:
+            self._stop.set()
+        self.stopped = time.perf_counter()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                stack = self._sample()
+            except Exception:
+                continue  # A frame torn down mid-walk; skip the sample
+            if stack is None:
+                continue
+            with self._lock:
+                if self._stop.is_set():
+                    break
+                self.counts[stack] += 1
+
+    def _sample(self) -> Optional[Stack]:
+        if self.task.done():
+            return None
+        if asyncio.current_task(self.loop) is self.task:
+            frame = sys._current_frames().get(self.thread_id)
+            return (RUNNING, *_running_stack(frame, self._root))
+        return (AWAITING, *_await_chain(self.task.get_coro()))
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.stopped or time.perf_counter()) - self.started) * 1000
+
+    def totals(self) -> Tuple[int, int]:
+        """(samples, samples taken while running)"""
+        with self._lock:
+            items = list(self.counts.items())
+        return sum(n for _, n in items), sum(n for stack, n in items if stack[0] == RUNNING)
+
+    def collapsed(self, max_stacks: Optional[int] = None) -> Tuple[str, int]:
+        """Collapsed-stack text, most sampled first, and the number of stacks in it."""
+        with self._lock:
+            items = self.counts.most_common(max_stacks)
+        text = "".join(f"{';'.join(stack)} {count}\n" for stack, count in items)
+        return text, len(items)
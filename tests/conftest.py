@@ -0,0 +1,11 @@
+import os
+
+import pytest
+
+# Settings refuse to load without it; the tests never talk to Paystack
+os.environ.setdefault("PAYSTACK_SECRET_KEY", "test")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+from bson.errors import InvalidDocument
+from pymongo.errors import BulkWriteError
+from starlette.requests import Request
+
+from app.constants import LogLevel
+from app.core.audit_log import AuditSink, audit_entry
+from app.models.logs import Log
+
+
+class FakeLogs:
+    def __init__(self):
+        self.batches = []
+        self.singles = []
+        self.fail_with = None
+
+    async def insert_many(self, batch, ordered=True):
+        if self.fail_with:
+            raise self.fail_with
+        self.batches.append(batch)
+
+    async def insert_one(self, entry):
+        if entry["action"] == "bad":
+            raise InvalidDocument("bad")
+        self.singles.append(entry)
+
+
+@pytest.fixture
+def logs(monkeypatch):
+    logs = FakeLogs()
+    monkeypatch.setattr(Log, "get_motor_collection", classmethod(lambda cls: logs))
+    return logs
+
+
+def _entry(action="GET", level=LogLevel.ERROR):
+    return {"action": action, "level": level, "details": {"error_msg": "x"}}
+
+
+def test_entries_leave_credentials_behind():
+    request = Request({
+        "type": "http", "method": "POST", "path": "/api/v1/users/", "query_string": b"page=2",
+        "headers": [(b"authorization", b"Bearer secret"), (b"cookie", b"session=1"), (b"user-agent", b"till/1.0")],
+        "client": ("10.0.0.1", 1), "server": ("api", 443), "scheme": "https", "state": {"request_id": "rid"},
+    })
+
+    entry = audit_entry(request, LogLevel.SECURITY, "denied", user_id="u1")
+
+    assert entry["user_id"] == "u1" and entry["action"] == "POST"
+    assert entry["details"]["headers"] == {"user-agent": "till/1.0"}
+    assert entry["details"]["query_params"] == {"page": "2"}
+    assert entry["details"]["request_id"] == "rid"
+
+
+@pytest.mark.anyio
+async def test_entries_are_written_in_batches(logs):
+    sink = AuditSink(maxsize=10, batch_size=2, interval=60)
+    for _ in range(5):
+        assert sink.emit(_entry())
+
+    await sink.flush()
+
+    assert [len(batch) for batch in logs.batches] == [2, 2, 1]
+    assert sink.stats()["written"] == 5 and sink.stats()["queued"] == 0
+
+
+@pytest.mark.anyio
+async def test_emit_drops_instead_of_blocking_when_full(logs):
+    sink = AuditSink(maxsize=2, batch_size=10, interval=60)
+    results = [sink.emit(_entry(level=LogLevel.WARNING)) for _ in range(3)]
+
+    assert results == [True, True, False]
+    assert sink.stats()["dropped"] == {LogLevel.WARNING: 1}
+
+
+@pytest.mark.anyio
+async def test_put_waits_for_the_writer_instead_of_dropping(logs):
+    sink = AuditSink(maxsize=1, batch_size=1, interval=60)
+    sink.start()
+    for action in ("first", "second", "third"):
+        await sink.put(_entry(action))
+    await sink.close()
+
+    assert [entry["action"] for batch in logs.batches for entry in batch] == ["first", "second", "third"]
+    assert not sink.running
+
+
+@pytest.mark.anyio
+async def test_failed_writes_are_counted(logs):
+    sink = AuditSink(maxsize=10, batch_size=10, interval=60)
+    logs.fail_with = BulkWriteError({"writeErrors": [{"index": 1}]})
+    sink.emit(_entry())
+    sink.emit(_entry())
+    await sink.flush()
+    assert (sink.counts["written"], sink.counts["failed"]) == (1, 1)
+
+    # Refused client-side: retried one by one so only the bad entry is lost
+    logs.fail_with = InvalidDocument("too large")
+    sink.emit(_entry("good"))
+    sink.emit(_entry("bad"))
+    await sink.flush()
+    assert [entry["action"] for entry in logs.singles] == ["good"]
+    assert (sink.counts["written"], sink.counts["failed"]) == (2, 2)
+
+
+def test_unencodable_details_are_flattened_not_lost():
+    sink = AuditSink(maxsize=10, batch_size=10, interval=60)
+    sink.emit({**_entry(), "details": {"loop": asyncio.new_event_loop}})
+
+    assert sink.counts["unencodable"] == 1
+    assert "unencodable" in sink._buffer[0]["details"]
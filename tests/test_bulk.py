@@ -0,0 +1,113 @@
+import pytest
+from beanie import PydanticObjectId
+from pydantic import ValidationError as PydanticValidationError
+
+from app.core.settings import settings
+from app.schemas.base import BulkItemResult, BulkRequest, BulkResult
+from app.schemas.user import UserCreate, UserUpdate
+from app.services import user as user_service
+from app.services.crud_services import CRUD
+from app.services.exceptions import ValidationError
+
+UserBulk = BulkRequest[UserCreate, UserUpdate]
+
+
+def _user(n: int, warehouse_id=None) -> dict:
+    return {
+        "email": f"user{n}@example.com",
+        "full_name": f"User {n}",
+        "password": "secret-password",
+        "warehouse_id": warehouse_id,
+    }
+
+
+def test_oversized_sections_are_refused_at_validation():
+    ids = [PydanticObjectId() for _ in range(settings.BULK_MAX_ITEMS + 1)]
+    with pytest.raises(PydanticValidationError):
+        UserBulk(soft_delete=ids)
+
+
+def test_crud_refuses_oversized_batches():
+    with pytest.raises(ValidationError):
+        CRUD._check_bulk_size(settings.BULK_MAX_ITEMS + 1)
+    CRUD._check_bulk_size(settings.BULK_MAX_ITEMS)
+
+
+def test_result_counts():
+    result = BulkResult(results=[
+        BulkItemResult(op="create", index=0, ok=True),
+        BulkItemResult(op="create", index=1, ok=False, error="exists"),
+        BulkItemResult(op="update", index=0, ok=True),
+    ])
+    assert (result.succeeded, result.failed) == (2, 1)
+
+
+@pytest.fixture
+def bulk_calls(monkeypatch):
+    """Records what bulk_users hands to the CRUD layer; every write succeeds
+    except warehouse links, which fail for the second linked user."""
+    calls = {"hashed": []}
+
+    async def hash_passwords(passwords):
+        calls["hashed"].append(list(passwords))
+        return [f"hash:{p}" for p in passwords]
+
+    async def bulk_create(payloads, unique_fields=None):
+        calls["create"] = payloads
+        return [BulkItemResult(op="create", index=i, id=PydanticObjectId(), ok=True) for i in range(len(payloads))]
+
+    async def link(payloads):
+        calls["link"] = payloads
+        return [
+            BulkItemResult(op="create", index=i, ok=i != 1, error=None if i != 1 else "Write failed")
+            for i in range(len(payloads))
+        ]
+
+    async def bulk_update(items, **kwargs):
+        calls["update"] = items
+        return [BulkItemResult(op="update", index=i, id=doc_id, ok=True) for i, (doc_id, _) in enumerate(items)]
+
+    async def bulk_set_flags(doc_ids, **kwargs):
+        return []
+
+    monkeypatch.setattr(user_service, "hash_passwords", hash_passwords)
+    monkeypatch.setattr(user_service.user_crud, "bulk_create", bulk_create)
+    monkeypatch.setattr(user_service.user_wh_crud, "bulk_create", link)
+    monkeypatch.setattr(user_service.user_crud, "bulk_update", bulk_update)
+    monkeypatch.setattr(user_service.user_crud, "bulk_set_flags", bulk_set_flags)
+    return calls
+
+
+@pytest.mark.anyio
+async def test_bulk_users_reports_failed_warehouse_links(bulk_calls):
+    warehouse = PydanticObjectId()
+    data = UserBulk(create=[_user(0, warehouse), _user(1), _user(2, warehouse), _user(3, warehouse)])
+
+    result = await user_service.bulk_users(data, PydanticObjectId(), PydanticObjectId())
+
+    assert [link["user_id"] for link in bulk_calls["link"]] == [
+        result.results[i].id for i in (0, 2, 3)
+    ]
+    # Only user 2's link failed; the user still exists, so its id is kept
+    assert [r.ok for r in result.results] == [True, True, False, True]
+    assert result.results[2].id is not None
+    assert "warehouse access" in result.results[2].error
+
+
+@pytest.mark.anyio
+async def test_bulk_users_hashes_update_passwords_in_one_batch(bulk_calls):
+    first, second, third = PydanticObjectId(), PydanticObjectId(), PydanticObjectId()
+    data = UserBulk(update=[
+        {"id": first, "data": {"password": "new-password-1"}},
+        {"id": second, "data": {"full_name": "Renamed"}},
+        {"id": third, "data": {"password": "new-password-3"}},
+    ])
+
+    await user_service.bulk_users(data, PydanticObjectId(), PydanticObjectId())
+
+    assert bulk_calls["hashed"] == [[], ["new-password-1", "new-password-3"]]
+    assert bulk_calls["update"] == [
+        (first, {"hashed_password": "hash:new-password-1"}),
+        (second, {"full_name": "Renamed"}),
+        (third, {"hashed_password": "hash:new-password-3"}),
+    ]
@@ -0,0 +1,77 @@
+import pytest
+from beanie import PydanticObjectId
+
+from app.models.organization.shift import Shift
+from app.services import crud_services
+from app.services.crud_services import CRUD
+from app.utils import cache as cache_module
+from app.utils.cache import TTLCache, get_cache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_their_ttl(clock):
+    cache = TTLCache(ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=30)
+
+    clock[0] += 11
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_groups_drop_together_and_bump_the_generation():
+    cache = TTLCache()
+    cache.set(("doc", "tenant-a"), 1, group="doc")
+    cache.set(("doc", None), 2, group="doc")
+    cache.set(("other", None), 3, group="other")
+    generation = cache.generation
+
+    cache.pop_group("doc")
+
+    assert len(cache) == 1
+    assert cache.get(("other", None)) == 3
+    assert cache.generation > generation
+
+
+def test_named_caches_are_shared():
+    assert get_cache("test:shared") is get_cache("test:shared", maxsize=1)
+
+
+def test_invalidate_drops_every_variant_counts_and_notifies_listeners(monkeypatch):
+    monkeypatch.setattr(crud_services, "_write_listeners", {})
+    crud = CRUD(Shift, cache_ttl=60)
+    doc_id, other_id = PydanticObjectId(), PydanticObjectId()
+    for company in ("tenant-a", None):
+        crud.cache.set((doc_id, company, False, False), "doc", group=doc_id)
+    crud.cache.set((other_id, None, False, False), "other", group=other_id)
+    counts = get_cache("count:Shift")
+    counts.set("filter", 42)
+    seen = []
+    CRUD.on_write(Shift, seen.append)
+
+    crud.invalidate(str(doc_id))
+
+    assert len(crud.cache) == 1
+    assert len(counts) == 0
+    assert seen == [[doc_id]]
+    # Every CRUD of a model shares the one cache
+    assert CRUD(Shift).cache is crud.cache
@@ -0,0 +1,67 @@
+import base64
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.constants import SortOrder
+from app.services.crud_services import CRUD
+from app.utils.cursor import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trips_sort_and_values():
+    oid = PydanticObjectId()
+    sort = [("name", SortOrder.ASC), ("_id", SortOrder.ASC)]
+
+    decoded = decode_cursor(encode_cursor(sort, ["Widget", oid]))
+
+    assert decoded["sort"] == sort
+    assert decoded["values"] == ["Widget", oid]
+
+
+def test_cursor_carries_enum_values():
+    decoded = decode_cursor(encode_cursor([("_id", SortOrder.DESC)], [SortOrder.DESC]))
+    assert decoded["values"] == [SortOrder.DESC.value]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b'{"s": [["name", 1]]}').decode(),
+    base64.urlsafe_b64encode(b'{"s": [["name", 1]], "v": []}').decode(),
+])
+def test_malformed_cursor_is_refused(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_sort_is_made_total_on_id():
+    assert CRUD._normalize_sort(None) == [("_id", SortOrder.ASC)]
+    assert CRUD._normalize_sort([("name", SortOrder.DESC)]) == [
+        ("name", SortOrder.DESC), ("_id", SortOrder.DESC)
+    ]
+    # Nothing after _id can change the order, so it is dropped
+    assert CRUD._normalize_sort([("id", SortOrder.ASC), ("name", SortOrder.ASC)]) == [
+        ("_id", SortOrder.ASC)
+    ]
+
+
+def test_keyset_filter_resumes_strictly_after_the_last_row():
+    oid = PydanticObjectId()
+    sort = [("name", SortOrder.ASC), ("_id", SortOrder.ASC)]
+
+    assert CRUD._keyset_filter(sort, ["Widget", oid]) == {"$or": [
+        {"name": {"$gt": "Widget"}},
+        {"name": "Widget", "_id": {"$gt": oid}},
+    ]}
+
+
+def test_keyset_filter_handles_nulls():
+    oid = PydanticObjectId()
+
+    ascending = CRUD._keyset_filter([("code", SortOrder.ASC), ("_id", SortOrder.ASC)], [None, oid])
+    assert ascending["$or"][0] == {"code": {"$ne": None}}
+
+    # Nulls sort first, so nothing on that key comes after a null when descending
+    descending = CRUD._keyset_filter([("code", SortOrder.DESC), ("_id", SortOrder.DESC)], [None, oid])
+    assert descending == {"$or": [
+        {"code": None, "$or": [{"_id": {"$lt": oid}}, {"_id": None}]},
+    ]}
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from app.utils.dataloader import DataLoader, Loaders
+
+
+def recording_loader(**kwargs):
+    batches = []
+
+    async def batch(keys):
+        batches.append(list(keys))
+        return {key: key * 10 for key in keys if key >= 0}
+
+    return DataLoader(batch, **kwargs), batches
+
+
+@pytest.mark.anyio
+async def test_concurrent_loads_share_one_batch():
+    loader, batches = recording_loader()
+
+    results = await asyncio.gather(loader.load(1), loader.load(2), loader.load(1), loader.load(-1))
+
+    assert results == [10, 20, 10, None]  # Keys missing from the mapping resolve to None
+    assert batches == [[1, 2, -1]]
+
+
+@pytest.mark.anyio
+async def test_results_are_memoized_and_primed_keys_skip_the_batch():
+    loader, batches = recording_loader()
+    loader.prime(3, "primed")
+
+    assert await loader.load_many([1, 3]) == [10, "primed"]
+    assert await loader.load(1) == 10
+    assert batches == [[1]]
+
+    loader.clear(1)
+    assert await loader.load(1) == 10
+    assert batches == [[1], [1]]
+
+
+@pytest.mark.anyio
+async def test_batches_are_split_at_max_batch_size():
+    loader, batches = recording_loader(max_batch_size=2)
+    await loader.load_many([1, 2, 3, 4, 5])
+    assert batches == [[1, 2], [3, 4], [5]]
+
+
+@pytest.mark.anyio
+async def test_failures_are_not_memoized():
+    calls = 0
+
+    async def batch(keys):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("database unavailable")
+        return {key: key for key in keys}
+
+    loader = DataLoader(batch)
+    with pytest.raises(RuntimeError):
+        await loader.load(1)
+    assert await loader.load(1) == 1
+
+
+def test_loaders_share_one_loader_per_model_and_scope():
+    class FakeCrud:
+        model = "Department"
+
+        def loader(self, **kwargs):
+            return object()
+
+    loaders, crud = Loaders(), FakeCrud()
+    assert loaders.get(crud, "tenant-a") is loaders.get(crud, "tenant-a")
+    assert loaders.get(crud, "tenant-a") is not loaders.get(crud, "tenant-b")
+    assert loaders.get(crud, "tenant-a") is not loaders.get(crud, "tenant-a", include_deleted=True)
@@ -0,0 +1,66 @@
+import asyncio
+import contextvars
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.db_tracing import CommandTrace, CommandTracer, current_trace
+
+
+def _event(request_id, name, command=None, micros=0):
+    return SimpleNamespace(
+        request_id=request_id, command_name=name, command=command or {}, duration_micros=micros
+    )
+
+
+def test_trace_totals_and_slowest_command():
+    trace = CommandTrace()
+    trace.begin(1, "find users")
+    trace.begin(2, "aggregate sales")
+    trace.end(2, "aggregate", 12_500)
+    trace.end(1, "find", 1_500)
+
+    assert trace.fields() == {
+        "db_commands": 2, "db_time_ms": 14.0, "db_slowest": "aggregate sales", "db_slowest_ms": 12.5,
+    }
+    assert trace.server_timing() == (
+        'db;dur=14.0;desc="2 commands", db-slowest;dur=12.5;desc="aggregate sales"'
+    )
+
+
+def test_idle_requests_report_no_slowest_command():
+    assert CommandTrace().server_timing() == 'db;dur=0.0;desc="0 commands"'
+
+
+def test_commands_are_attributed_to_the_request_context():
+    tracer, trace = CommandTracer(), CommandTrace()
+    token = current_trace.set(trace)
+    try:
+        tracer.started(_event(7, "find", {"find": "users", "filter": {}}))
+        tracer.succeeded(_event(7, "find", micros=3_000))
+        tracer.started(_event(8, "hello"))
+        tracer.failed(_event(8, "hello", micros=1_000))
+    finally:
+        current_trace.reset(token)
+
+    assert (trace.count, trace.slowest) == (2, "find users")
+    # Outside a request nothing is recorded, and nothing breaks
+    tracer.started(_event(9, "find", {"find": "users"}))
+    tracer.succeeded(_event(9, "find", micros=1))
+    assert trace.count == 2
+
+
+@pytest.mark.anyio
+async def test_driver_threads_see_the_requests_trace():
+    tracer, trace = CommandTracer(), CommandTrace()
+    current_trace.set(trace)
+
+    def driver_call():
+        tracer.started(_event(1, "insert", {"insert": "audit_logs"}))
+        tracer.succeeded(_event(1, "insert", micros=2_000))
+
+    # Motor hands its worker threads a copy of the caller's context, like this
+    context = contextvars.copy_context()
+    await asyncio.get_running_loop().run_in_executor(None, context.run, driver_call)
+
+    assert trace.slowest == "insert audit_logs"
@@ -0,0 +1,61 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from bson import Decimal128, ObjectId
+
+from app.constants import SortOrder
+from app.utils.export import _csv, _ndjson, export_response
+
+OID = ObjectId()
+ROWS = [
+    {"_id": OID, "name": "Widget", "price": Decimal128(Decimal("9.50")), "tags": ["a", "b"],
+     "created_at": datetime(2024, 1, 2, tzinfo=timezone.utc), "order": SortOrder.ASC},
+    {"_id": OID, "name": "Gadget", "price": None, "tags": [], "created_at": None, "order": None},
+    {"_id": OID, "name": "Gizmo"},
+]
+
+
+async def _rows():
+    for row in ROWS:
+        yield row
+
+
+async def _chunks(stream):
+    return [chunk async for chunk in stream]
+
+
+@pytest.mark.anyio
+async def test_ndjson_is_flushed_in_chunks_of_plain_json():
+    chunks = await _chunks(_ndjson(_rows(), chunk_rows=2))
+
+    assert len(chunks) == 2
+    lines = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert lines[0] == {
+        "_id": str(OID), "name": "Widget", "price": "9.50", "tags": ["a", "b"],
+        "created_at": "2024-01-02T00:00:00+00:00", "order": SortOrder.ASC.value,
+    }
+    assert lines[2] == {"_id": str(OID), "name": "Gizmo"}
+
+
+@pytest.mark.anyio
+async def test_csv_has_a_header_and_flattens_values():
+    chunks = await _chunks(_csv(_rows(), ["_id", "name", "price", "tags"], chunk_rows=2))
+
+    assert len(chunks) == 2
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+    assert rows == [
+        ["id", "name", "price", "tags"],
+        [str(OID), "Widget", "9.50", '["a","b"]'],
+        [str(OID), "Gadget", "", "[]"],
+        [str(OID), "Gizmo", "", ""],
+    ]
+
+
+def test_export_response_names_the_download():
+    response = export_response(_rows(), ["name"], "csv", "products")
+    assert response.media_type == "text/csv"
+    assert response.headers["content-disposition"] == 'attachment; filename="products.csv"'
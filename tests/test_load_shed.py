@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from app.core.settings import settings
+from app.middlewares import load_shed_middleware
+from app.middlewares.load_shed_middleware import Bulkhead, LoadShedder, LoadShedMiddleware, route_class
+
+
+@pytest.mark.parametrize("method, path, expected", [
+    ("POST", "/api/v1/sales/", "checkout"),
+    ("POST", "/api/v1/auth/login", "auth"),
+    ("GET", "/api/v1/inventory/products/export", "reports"),
+    ("POST", "/api/v1/users/bulk", "reports"),
+    ("GET", "/api/v1/users/", "reads"),
+    ("PATCH", "/api/v1/users/1", "admin"),
+])
+def test_route_classes(method, path, expected):
+    assert route_class(method, path) == expected
+
+
+@pytest.mark.anyio
+async def test_bulkhead_hands_released_slots_to_the_oldest_waiter():
+    bulkhead = Bulkhead(limit=1, queue_size=2)
+    assert await bulkhead.acquire(timeout=0)
+
+    first = asyncio.ensure_future(bulkhead.acquire(timeout=1))
+    second = asyncio.ensure_future(bulkhead.acquire(timeout=1))
+    await asyncio.sleep(0)
+    assert bulkhead.queued == 2
+
+    bulkhead.release()
+    assert await first and not second.done()
+    assert bulkhead.in_flight == 1  # The slot passed over rather than freed
+
+    bulkhead.release()
+    assert await second
+    bulkhead.release()
+    assert bulkhead.idle
+
+
+@pytest.mark.anyio
+async def test_bulkhead_sheds_when_the_queue_is_full_or_the_wait_runs_out():
+    bulkhead = Bulkhead(limit=1, queue_size=1)
+    await bulkhead.acquire(timeout=0)
+
+    waiting = asyncio.ensure_future(bulkhead.acquire(timeout=0.01))
+    await asyncio.sleep(0)
+    assert not await bulkhead.acquire(timeout=1)  # Queue full: shed at once
+    assert not await waiting  # Timed out
+    assert bulkhead.queued == 0
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(settings, "LOAD_SHED_TENANT_LIMITS", {"reports": 1})
+    monkeypatch.setattr(settings, "LOAD_SHED_CLASS_LIMITS", {"reports": 2})
+    monkeypatch.setattr(settings, "LOAD_SHED_MAX_WAIT_MS", {"reports": 0})
+
+
+@pytest.mark.anyio
+async def test_shed_counts_are_labelled_by_tier_and_top_tenants(limits):
+    shedder = LoadShedder(top_tenants=2)
+    assert await shedder.acquire("t1", "reports", "pro")
+    assert await shedder.acquire("t2", "reports", "free")
+
+    assert not await shedder.acquire("t1", "reports", "pro")  # t1's own cap
+    assert not await shedder.acquire("t3", "reports", "free")  # Class cap
+    assert not await shedder.acquire("t4", "reports", "free")
+
+    stats = shedder.stats()
+    assert sorted(stats["shed"], key=lambda row: row["limit"]) == [
+        {"limit": "class", "route_class": "reports", "tier": "free", "count": 2},
+        {"limit": "tenant", "route_class": "reports", "tier": "pro", "count": 1},
+    ]
+    assert stats["shed_tenants"] == {"t1": 1, "t3": 1, "other": 1}
+    assert stats["in_flight"] == {"reports": 2} and stats["busy_tenants"] == 2
+
+    shedder.release("t1", "reports")
+    shedder.release("t2", "reports")
+    assert shedder.stats()["busy_tenants"] == 0
+
+
+@pytest.mark.anyio
+async def test_middleware_answers_503_when_shedding(limits, monkeypatch):
+    async def claims_tier(claims):
+        return "anonymous"
+
+    monkeypatch.setattr(load_shed_middleware, "claims_tier", claims_tier)
+    release = asyncio.Event()
+
+    async def app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    middleware = LoadShedMiddleware(app, shedder=LoadShedder())
+    scope = {"type": "http", "method": "GET", "path": "/api/v1/report", "headers": [], "client": ("10.0.0.1", 1)}
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    held = asyncio.ensure_future(middleware(scope, None, send))
+    await asyncio.sleep(0)
+    await middleware(scope, None, send)
+
+    assert sent[0]["status"] == 503
+    assert (b"retry-after", b"1") in sent[0]["headers"]
+    release.set()
+    await held
+    assert sent[-1]["status"] == 200
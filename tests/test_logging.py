@@ -0,0 +1,94 @@
+import json
+import logging
+from logging.handlers import QueueHandler
+
+import pytest
+
+from app.core import logger as logger_module
+from app.core.logger import JsonFormatter, logger
+from app.middlewares.logging_middleware import LoggingMiddleware
+
+
+class Records(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def access_log():
+    handler = Records()
+    logger.addHandler(handler)
+    yield handler.records
+    logger.removeHandler(handler)
+
+
+def test_records_are_one_json_object_with_their_fields():
+    record = logging.LogRecord("ScanPay", logging.INFO, __file__, 1, "GET %s", ("/x",), None)
+    record.fields = {"status": 200, "request_id": "abc"}
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["message"] == "GET /x"
+    assert entry["level"] == "INFO" and entry["logger"] == "ScanPay"
+    assert (entry["status"], entry["request_id"]) == (200, "abc")
+
+
+def test_module_loggers_reach_the_log_queue():
+    module_logger = logging.getLogger("app.services.audit_log")
+
+    handlers = [h for current in (module_logger, module_logger.parent) for h in current.handlers]
+    assert any(isinstance(h, QueueHandler) for h in handlers)
+    assert module_logger.getEffectiveLevel() <= logging.INFO
+
+
+def test_stopping_the_listener_twice_is_harmless(monkeypatch):
+    stops = []
+    monkeypatch.setattr(logger_module, "_listening", True)
+    monkeypatch.setattr(logger_module, "log_listener", type("Listener", (), {"stop": lambda self: stops.append(1)})())
+
+    logger_module.stop_log_listener()
+    logger_module.stop_log_listener()
+
+    assert stops == [1]
+
+
+async def _run(app, headers=()):
+    scope = {"type": "http", "method": "GET", "path": "/api/v1/users/", "headers": list(headers)}
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    await LoggingMiddleware(app)(scope, None, send)
+    return scope, sent
+
+
+@pytest.mark.anyio
+async def test_request_id_is_kept_from_the_client_and_echoed(access_log):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 429, "headers": []})
+
+    scope, sent = await _run(app, [(b"x-request-id", b"client-id")])
+
+    assert scope["state"]["request_id"] == "client-id"
+    assert (b"x-request-id", b"client-id") in sent[0]["headers"]
+    assert any(name == b"server-timing" for name, _ in sent[0]["headers"])
+    [record] = access_log
+    assert record.fields["status"] == 429 and record.fields["request_id"] == "client-id"
+
+
+@pytest.mark.anyio
+async def test_failing_requests_are_logged_as_500(access_log):
+    async def app(scope, receive, send):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await _run(app)
+
+    [record] = access_log
+    assert record.fields["status"] == 500
+    assert len(record.fields["request_id"]) == 32  # Generated when the client sends none
@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.metrics import HTTP_REQUESTS, _load_shed_total
+from app.middlewares import load_shed_middleware
+from app.middlewares.metrics_middleware import MetricsMiddleware
+from app.utils.metrics import Registry
+
+
+def test_render_uses_the_text_exposition_format():
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests", ("route",))
+    requests.inc(route="/a")
+    requests.inc(2, route='/b"')
+    registry.gauge("in_flight", "In flight").set(1.5)
+
+    assert registry.render() == (
+        "# HELP requests_total Requests\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{route="/a"} 1\n'
+        'requests_total{route="/b\\""} 2\n'
+        "# HELP in_flight In flight\n"
+        "# TYPE in_flight gauge\n"
+        "in_flight 1.5\n"
+    )
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()[2:]
+    assert lines == [
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        "latency_seconds_sum 4.25",
+        "latency_seconds_count 4",
+    ]
+
+
+def test_a_broken_collector_does_not_break_the_scrape():
+    registry = Registry()
+
+    def broken():
+        raise RuntimeError("gone")
+        yield
+
+    registry.callback("broken", "Broken", broken)
+    registry.gauge("ok", "Fine").set(1)
+    assert registry.render().splitlines()[-1] == "ok 1"
+
+
+def test_registering_twice_keeps_the_first_metric():
+    registry = Registry()
+    assert registry.counter("c", "C") is registry.counter("c", "C")
+
+
+def test_load_shed_counts_are_labelled_by_tier(monkeypatch):
+    stats = {"shed": [{"limit": "class", "route_class": "reports", "tier": "pro", "count": 3}]}
+    monkeypatch.setattr(load_shed_middleware, "load_shed_stats", lambda: stats)
+
+    assert list(_load_shed_total()) == [({"limit": "class", "route_class": "reports", "tier": "pro"}, 3)]
+
+
+@pytest.mark.anyio
+async def test_requests_are_counted_by_route_template_not_path():
+    async def app(scope, receive, send):
+        scope["route"] = SimpleNamespace(path_format="/api/v1/users/{user_id}")
+        await send({"type": "http.response.start", "status": 404, "headers": []})
+
+    async def send(message):
+        pass
+
+    labels = {"route": "/api/v1/users/{user_id}", "method": "GET", "status": "4xx", "tier": "anonymous"}
+    before = HTTP_REQUESTS._values.get(HTTP_REQUESTS._key(labels), 0)
+    scope = {"type": "http", "method": "GET", "path": "/api/v1/users/123", "headers": []}
+
+    await MetricsMiddleware(app)(scope, None, send)
+
+    assert HTTP_REQUESTS._values[HTTP_REQUESTS._key(labels)] == before + 1
@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+
+from app.db.migrations import CASE_INSENSITIVE, _index_in_place, dedupe_otps, rename_case_duplicates
+
+
+class FakeCollection:
+    """Just enough of a Motor collection for the migration steps."""
+
+    name = "fake"
+
+    def __init__(self, indexes=None, groups=None):
+        self.indexes = indexes or {}
+        self.groups = groups or []
+        self.updates = []
+        self.deletes = []
+
+    async def index_information(self):
+        return self.indexes
+
+    async def aggregate(self, pipeline, **kwargs):
+        for group in self.groups:
+            yield group
+
+    async def update_one(self, query, update):
+        self.updates.append((query, update))
+
+    async def delete_many(self, query):
+        self.deletes.append(query)
+        return SimpleNamespace(deleted_count=len(query.get("_id", {}).get("$in", [])))
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("info, collation, expected", [
+    (None, CASE_INSENSITIVE, False),
+    # The baseline's plain `plan_model_name` is not the index Beanie wants
+    ({"key": [("name", 1)]}, CASE_INSENSITIVE, False),
+    ({"key": [("name", 1)], "unique": True}, CASE_INSENSITIVE, False),
+    ({"key": [("name", 1)], "unique": True, "collation": {"locale": "en", "strength": 3}}, CASE_INSENSITIVE, False),
+    ({"key": [("name", 1)], "unique": True, "collation": {"locale": "en", "strength": 2, "caseLevel": False}}, CASE_INSENSITIVE, True),
+    ({"key": [("email", 1)], "unique": True}, None, True),
+    ({"key": [("email", 1)], "unique": True, "collation": CASE_INSENSITIVE}, None, False),
+])
+async def test_index_in_place_checks_options_not_just_the_name(info, collation, expected):
+    collection = FakeCollection({"idx": info} if info else {})
+    assert await _index_in_place(collection, "idx", collation) is expected
+
+
+@pytest.mark.anyio
+async def test_case_duplicates_keep_the_oldest_and_rename_the_rest():
+    oldest, newer = ObjectId(), ObjectId()
+    collection = FakeCollection(
+        indexes={"plan_model_name": {"key": [("name", 1)]}},
+        groups=[{"docs": [{"_id": oldest, "value": "Pro"}, {"_id": newer, "value": "pro"}], "count": 2}],
+    )
+
+    assert await rename_case_duplicates(collection, "plan_model_name", ["name"], "name") == 1
+    assert collection.updates == [
+        ({"_id": newer}, {"$set": {"name": f"pro ({str(newer)[-6:]})"}}),
+    ]
+
+
+@pytest.mark.anyio
+async def test_case_duplicates_skipped_once_the_index_exists():
+    collection = FakeCollection(
+        indexes={"plan_model_name": {"unique": True, "collation": CASE_INSENSITIVE}},
+        groups=[{"docs": [{"_id": ObjectId(), "value": "a"}, {"_id": ObjectId(), "value": "A"}], "count": 2}],
+    )
+    assert await rename_case_duplicates(collection, "plan_model_name", ["name"], "name") == 0
+    assert collection.updates == []
+
+
+@pytest.mark.anyio
+async def test_otp_dedupe_keeps_the_newest_code_per_email():
+    newest, older, oldest = ObjectId(), ObjectId(), ObjectId()
+    collection = FakeCollection(groups=[{"_id": "a@example.com", "ids": [newest, older, oldest], "count": 3}])
+
+    assert await dedupe_otps(collection) == 2
+    assert collection.deletes[-1] == {"_id": {"$in": [older, oldest]}}
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.user_setup.otp import OTP
+from app.services.auth.otp import generate_otp, verify_otp
+from app.services.exceptions import InvalidOTP, NotFoundError, OTPAttemptsExceeded, OTPExpired
+
+EMAIL = "cashier@example.com"
+
+
+class FakeOTPs:
+    """One document per email, with just the operators verify_otp relies on."""
+
+    def __init__(self):
+        self.docs = {}
+
+    async def update_one(self, query, update, upsert=False):
+        doc = self.docs.setdefault(query["email"], {"_id": query["email"], "email": query["email"]})
+        doc.update(update["$set"])
+
+    async def find_one(self, query):
+        doc = self.docs.get(query["email"])
+        return dict(doc) if doc else None
+
+    async def find_one_and_update(self, query, update, return_document=None):
+        doc = self.docs.get(query["email"])
+        if not doc or doc["attempts_left"] <= 0 or doc["expires_at"] <= query["expires_at"]["$gt"]:
+            return None
+        before = dict(doc)
+        doc["attempts_left"] += update["$inc"]["attempts_left"]
+        return before
+
+    async def delete_one(self, query):
+        doc = self.docs.get(query["_id"])
+        matched = doc is not None and all(doc.get(k) == v for k, v in query.items())
+        if matched:
+            del self.docs[query["_id"]]
+        return SimpleNamespace(deleted_count=int(matched))
+
+
+@pytest.fixture
+def otps(monkeypatch):
+    otps = FakeOTPs()
+    monkeypatch.setattr(OTP, "get_motor_collection", classmethod(lambda cls: otps))
+    return otps
+
+
+@pytest.mark.anyio
+async def test_issuing_replaces_the_previous_code(otps):
+    first = await generate_otp(EMAIL)
+    second = await generate_otp(EMAIL)
+
+    assert len(otps.docs) == 1
+    assert otps.docs[EMAIL]["otp_code"] == second
+    assert first.isdigit() and len(second) == 4
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("guess", ["0000", "١٢٣٤", "ü", ""])
+async def test_wrong_codes_are_refused_without_crashing(otps, guess):
+    await generate_otp(EMAIL)
+    otps.docs[EMAIL]["otp_code"] = "1234"
+
+    with pytest.raises(InvalidOTP):
+        await verify_otp(EMAIL, guess)
+
+
+@pytest.mark.anyio
+async def test_every_attempt_spends_a_try(otps):
+    await generate_otp(EMAIL)
+    otps.docs[EMAIL].update(otp_code="1234", attempts_left=2)
+
+    for _ in range(2):
+        with pytest.raises(InvalidOTP):
+            await verify_otp(EMAIL, "0000")
+    # The right code no longer helps once the tries are spent
+    with pytest.raises(OTPAttemptsExceeded):
+        await verify_otp(EMAIL, "1234")
+
+
+@pytest.mark.anyio
+async def test_expired_and_missing_codes(otps):
+    with pytest.raises(NotFoundError):
+        await verify_otp(EMAIL, "1234")
+
+    await generate_otp(EMAIL)
+    otps.docs[EMAIL]["expires_at"] = datetime.now(timezone.utc) - timedelta(seconds=1)
+    with pytest.raises(OTPExpired):
+        await verify_otp(EMAIL, otps.docs[EMAIL]["otp_code"])
+
+
+@pytest.mark.anyio
+async def test_a_code_reissued_mid_check_is_not_consumed(otps, monkeypatch):
+    await generate_otp(EMAIL)
+    otps.docs[EMAIL]["otp_code"] = "1234"
+    delete_one = otps.delete_one
+
+    async def reissue_then_delete(query):
+        otps.docs[EMAIL]["otp_code"] = "5678"  # A resend lands between check and delete
+        return await delete_one(query)
+
+    monkeypatch.setattr(otps, "delete_one", reissue_then_delete)
+
+    with pytest.raises(NotFoundError):
+        await verify_otp(EMAIL, "1234")
+    assert otps.docs[EMAIL]["otp_code"] == "5678"
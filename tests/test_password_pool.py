@@ -0,0 +1,62 @@
+import asyncio
+import threading
+
+import pytest
+from passlib.context import CryptContext
+
+from app.services.auth import password
+from app.services.auth.password import HashPool
+from app.services.exceptions import ServiceBusy
+
+
+@pytest.mark.anyio
+async def test_pool_runs_work_off_the_event_loop():
+    pool = HashPool(workers=2, max_pending=4)
+    loop_thread = threading.get_ident()
+
+    thread = await pool.run(threading.get_ident)
+
+    assert thread != loop_thread
+    assert pool.stats()["completed"] == 1
+
+
+@pytest.mark.anyio
+async def test_pool_sheds_work_past_max_pending():
+    pool = HashPool(workers=1, max_pending=2)
+    release = threading.Event()
+    running = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    with pytest.raises(ServiceBusy):
+        await pool.run(release.wait)
+
+    stats = pool.stats()
+    assert (stats["in_flight"], stats["queue_depth"], stats["rejected"]) == (1, 1, 1)
+    release.set()
+    await asyncio.gather(*running)
+    assert pool.pending == 0
+
+
+@pytest.mark.anyio
+async def test_hash_passwords_keeps_order_across_chunks(monkeypatch):
+    monkeypatch.setattr(password, "hash_pool", HashPool(workers=2, max_pending=2))
+    monkeypatch.setattr(password, "pwd_context", CryptContext(schemes=["bcrypt"], bcrypt__rounds=4))
+
+    passwords = [f"password-{i}" for i in range(5)]
+    hashes = await password.hash_passwords(passwords)
+
+    assert len(hashes) == 5
+    for plain, hashed in zip(passwords, hashes):
+        assert await password.verify_password(plain, hashed)
+
+
+@pytest.mark.anyio
+async def test_outdated_hashes_are_upgraded_on_verify(monkeypatch):
+    old = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("secret")
+    monkeypatch.setattr(password, "pwd_context", CryptContext(
+        schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=5
+    ))
+
+    valid, new_hash = await password.verify_and_update_password("secret", old)
+
+    assert valid and new_hash and new_hash != old
@@ -0,0 +1,87 @@
+import pytest
+from beanie import PydanticObjectId
+
+from app.models.role import Role
+from app.services.auth.dependencies import require_permissions
+from app.services.auth.permission_bits import ALL, PermissionIndex, permission_index
+from app.services.auth.principal import Principal, effective_permissions
+from app.services.exceptions import UnAuthorized
+
+
+def _principal(index: PermissionIndex, role: str, permissions) -> Principal:
+    return Principal(
+        id=PydanticObjectId(), company_id=PydanticObjectId(), role=role,
+        permissions=frozenset(permissions),
+        mask=index.mask(permissions) | index.role_bit(role),
+        is_active=True, is_deleted=False, is_verified=True,
+        tenant_status="active", token_version=0,
+    )
+
+
+def test_catalog_permissions_get_fixed_bits():
+    index = PermissionIndex(["a", "b"])
+    assert (index.bit("a"), index.bit("b")) == (1, 2)
+    assert index.bit("late") == 4  # Outside the catalog: next free bit
+    assert len(index) == 3
+
+
+def test_roles_and_permissions_of_the_same_name_stay_distinct():
+    index = PermissionIndex(["admin"])
+    assert index.role_bit("admin") != index.bit("admin")
+    assert index.required("admin", roles=True) == index.bit("admin") | index.role_bit("admin")
+
+
+@pytest.mark.parametrize("grant", ["*", "super_admin"])
+def test_superusers_get_every_bit(grant):
+    index = PermissionIndex(["a"])
+    assert index.mask(["a", grant]) == ALL
+    assert ALL & index.required("never-seen-before")
+
+
+def test_masks_satisfy_any_of_the_required_permissions():
+    index = PermissionIndex(["read", "write", "delete"])
+    mask = index.mask(["read"])
+    assert mask & index.required("write", "read")
+    assert not mask & index.required("write", "delete")
+
+
+@pytest.mark.anyio
+async def test_permission_guard_checks_the_principal_mask():
+    guard = require_permissions("can_view_user")
+
+    allowed = _principal(permission_index, "cashier", ["can_view_user"])
+    assert await guard(allowed) is allowed
+    with pytest.raises(UnAuthorized):
+        await guard(_principal(permission_index, "cashier", ["something_else"]))
+
+
+class FakeRoles:
+    def __init__(self, doc):
+        self.doc = doc
+
+    def find(self, *args, **kwargs):
+        return self
+
+    def sort(self, *args):
+        return self
+
+    def limit(self, n):
+        return self
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        if self.doc:
+            yield self.doc
+
+
+@pytest.mark.anyio
+async def test_effective_permissions_apply_role_exclusions(monkeypatch):
+    roles = FakeRoles({"permissions": ["read", "write", "delete"], "exclusions": ["delete"]})
+    monkeypatch.setattr(Role, "get_motor_collection", classmethod(lambda cls: roles))
+
+    assert await effective_permissions(PydanticObjectId(), "manager", ["export"]) == {"read", "write", "export"}
+
+    roles.doc = None  # Role no longer exists: direct grants only
+    assert await effective_permissions(PydanticObjectId(), "manager", ["export"]) == {"export"}
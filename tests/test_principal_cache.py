@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.models.role import Role
+from app.models.user_setup.tenant import Tenant
+from app.models.user_setup.user import User
+from app.services.auth import dependencies
+from app.services.auth.principal import _cache
+from app.services.crud_services import CRUD
+
+
+@pytest.fixture
+def cached():
+    """Two tenants' users in the principal cache, keyed as load_principal stores them."""
+    cache = _cache()
+    cache.clear()
+    tenant_a, tenant_b = PydanticObjectId(), PydanticObjectId()
+    users = {name: PydanticObjectId() for name in ("a1", "a2", "b1")}
+    cache.set(users["a1"], "principal a1", group=tenant_a)
+    cache.set(users["a2"], "principal a2", group=tenant_a)
+    cache.set(users["b1"], "principal b1", group=tenant_b)
+    return SimpleNamespace(cache=cache, tenant_a=tenant_a, **users)
+
+
+def test_user_write_drops_that_user(cached):
+    CRUD(User).invalidate(cached.a1)
+    assert cached.cache.get(cached.a1) is None
+    assert cached.cache.get(cached.a2) == "principal a2"
+
+
+def test_tenant_write_drops_its_users(cached):
+    CRUD(Tenant).invalidate(cached.tenant_a)
+    assert len(cached.cache) == 1
+    assert cached.cache.get(cached.b1) == "principal b1"
+
+
+@pytest.mark.parametrize("ids", [[], [PydanticObjectId()]])
+def test_every_role_write_drops_everyone_creates_included(cached, ids):
+    CRUD(Role).invalidate(*ids)  # Inserts notify with no ids
+    assert len(cached.cache) == 0
+
+
+@pytest.mark.anyio
+async def test_token_is_checked_and_decoded_once_per_request(monkeypatch):
+    calls = []
+
+    async def is_token_revoked(token):
+        calls.append("revoked?")
+        return False
+
+    def decode_token(token):
+        calls.append("decode")
+        return {"sub": "user"}
+
+    monkeypatch.setattr(dependencies, "is_token_revoked", is_token_revoked)
+    monkeypatch.setattr(dependencies, "decode_token", decode_token)
+    request = SimpleNamespace(state=SimpleNamespace())
+
+    first = await dependencies.get_auth_context(request, "token")
+    second = await dependencies.get_auth_context(request, "token")
+
+    assert first is second
+    assert calls == ["revoked?", "decode"]
@@ -0,0 +1,99 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.settings import settings
+from app.services import profiler as profiler_module
+from app.services.profiler import Profiler, sign_profile_header, verify_profile_header
+from app.utils.stack_sampler import AWAITING, RUNNING, StackSampler
+
+
+def test_signed_headers_verify_until_they_expire():
+    value, expires_at = sign_profile_header(60)
+
+    assert verify_profile_header(value)
+    assert expires_at > datetime.now(timezone.utc)
+    expires, _, signature = value.partition(".")
+    assert not verify_profile_header(f"{int(expires) + 1}.{signature}")  # Tampered expiry
+    assert not verify_profile_header(f"{expires}.{'0' * len(signature)}")
+    assert not verify_profile_header("junk")
+
+
+def test_header_lifetime_is_capped():
+    _, expires_at = sign_profile_header(10 ** 9)
+    cap = timedelta(seconds=settings.PROFILE_TOKEN_MAX_SECONDS + 1)
+    assert expires_at <= datetime.now(timezone.utc) + cap
+
+
+def _scope(header=None):
+    headers = [(b"x-profile", header.encode())] if header else []
+    return {"type": "http", "method": "GET", "path": "/x", "headers": headers}
+
+
+def test_only_signed_requests_are_profiled_when_no_toggle_is_set():
+    profiler = Profiler()
+    assert profiler.trigger(_scope(sign_profile_header(60)[0])) == "header"
+    assert profiler.trigger(_scope("123.forged")) is None
+    assert profiler.trigger(_scope()) is None
+
+
+def test_toggles_profile_one_request_in_every(monkeypatch):
+    profiler = Profiler()
+    monkeypatch.setattr(profiler_module, "route_template", lambda scope: "/api/v1/sales/{sale_id}")
+    profiler.toggles = {("/api/v1/sales/{sale_id}", "*"): (3, datetime.now(timezone.utc) + timedelta(minutes=1))}
+
+    assert [profiler.trigger(_scope()) for _ in range(6)] == [None, None, "toggle", None, None, "toggle"]
+
+    profiler.toggles = {("/api/v1/sales/{sale_id}", "GET"): (1, datetime.now(timezone.utc) - timedelta(seconds=1))}
+    assert profiler.trigger(_scope()) is None  # Expired, awaiting the next refresh
+
+
+def test_concurrent_profiles_are_capped(monkeypatch):
+    profiler = Profiler()
+    monkeypatch.setattr(settings, "PROFILE_MAX_CONCURRENT", 0)
+    assert profiler.start() is None
+    assert profiler.stats()["busy"] == 1
+
+
+def _spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+@pytest.mark.anyio
+async def test_sampler_sees_running_and_awaiting_stacks():
+    async def handler():
+        _spin(0.05)
+        await asyncio.sleep(0.05)
+
+    async def profiled():
+        sampler = StackSampler(asyncio.current_task(), interval=0.002)
+        sampler.start()
+        await handler()
+        sampler.stop()
+        return sampler
+
+    sampler = await asyncio.create_task(profiled())
+    samples, running = sampler.totals()
+    text, stacks = sampler.collapsed()
+
+    assert 0 < running < samples
+    kinds = {line.split(";")[0] for line in text.splitlines()}
+    assert kinds == {RUNNING, AWAITING}
+    assert "handler" in text and "_spin" in text
+    assert stacks == len(text.splitlines())
+    assert sampler.duration_ms >= 100
+
+
+@pytest.mark.anyio
+async def test_nothing_is_counted_after_stop():
+    sampler = StackSampler(asyncio.current_task(), interval=0.001)
+    sampler.start()
+    await asyncio.sleep(0.01)
+    sampler.stop()
+    samples, _ = sampler.totals()
+    await asyncio.sleep(0.01)
+    assert sampler.totals()[0] == samples
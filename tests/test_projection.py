@@ -0,0 +1,44 @@
+import json
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.schemas.base import Page
+from app.schemas.user import UserResponse
+from app.services.crud_services import CRUD
+from app.services.exceptions import ValidationError
+from app.utils.projection import lean_response, parse_fields
+
+
+def test_fields_default_to_everything_the_response_exposes():
+    fields = parse_fields(None, UserResponse)
+    assert "_id" in fields and "email" in fields
+    assert "hashed_password" not in fields
+
+
+def test_requested_fields_always_include_the_id():
+    assert parse_fields("email, id,full_name,email", UserResponse) == ["_id", "email", "full_name"]
+
+
+@pytest.mark.parametrize("clause", ["hashed_password", "email,unknown"])
+def test_fields_outside_the_response_model_are_refused(clause):
+    with pytest.raises(ValidationError):
+        parse_fields(clause, UserResponse)
+
+
+def test_hidden_fields_cannot_be_sorted_or_projected():
+    with pytest.raises(ValidationError):
+        CRUD._check_visible(["name", "hashed_password"])
+    CRUD._check_visible(["name", "_id"])
+
+
+def test_lean_response_serializes_raw_documents():
+    oid = PydanticObjectId()
+    response = lean_response(Page(items=[{"_id": oid, "name": "North"}], next_cursor="abc"))
+
+    assert json.loads(response.body) == {
+        "items": [{"_id": str(oid), "name": "North"}],
+        "total": None,
+        "total_estimated": False,
+        "next_cursor": "abc",
+    }
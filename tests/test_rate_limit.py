@@ -0,0 +1,89 @@
+import uuid
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.core.rate_limit import MemoryBackend, SlidingWindowLimiter, build_backend
+from app.core.settings import settings
+from app.services import rate_limit
+from app.services.auth.token import create_access_token
+
+WINDOW = 60
+
+
+def _key() -> str:
+    # The previous-window cache is shared by name, so keep every test's keys apart
+    return f"test:{uuid.uuid4().hex}"
+
+
+@pytest.fixture
+def limiter():
+    return SlidingWindowLimiter(MemoryBackend(), WINDOW)
+
+
+@pytest.mark.anyio
+async def test_requests_within_the_limit_pass(limiter):
+    key = _key()
+    results = [await limiter.hit(key, 3, now=600.0) for _ in range(4)]
+
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert [r.remaining for r in results] == [2, 1, 0, 0]
+    assert results[-1].retry_after == 61
+
+
+@pytest.mark.anyio
+async def test_previous_window_is_weighted_by_its_overlap(limiter):
+    key = _key()
+    for _ in range(10):
+        await limiter.hit(key, 100, now=600.0)
+
+    # A quarter into the next window, 75% of the previous ten still count
+    result = await limiter.hit(key, 100, now=675.0)
+    assert result.remaining == int(100 - (10 * 0.75 + 1))
+
+
+@pytest.mark.anyio
+async def test_a_rejecting_bucket_refunds_the_others(limiter):
+    user, tenant = _key(), _key()
+    await limiter.hit_all([(user, 5), (tenant, 1)])
+
+    result = await limiter.hit_all([(user, 5), (tenant, 1)])
+
+    assert not result.allowed and result.limit == 1
+    # The user's bucket was charged once only; the rejected request was refunded
+    assert (await limiter.hit_all([(user, 5)])).remaining == 3
+
+
+@pytest.mark.anyio
+async def test_the_tightest_bucket_is_reported(limiter):
+    result = await limiter.hit_all([(_key(), 10), (_key(), 4)])
+    assert (result.limit, result.remaining) == (4, 3)
+
+
+def test_unknown_backends_are_refused():
+    assert isinstance(build_backend("memory"), MemoryBackend)
+    with pytest.raises(ValueError):
+        build_backend("redis")
+
+
+@pytest.mark.anyio
+async def test_signed_in_callers_are_limited_per_user_and_tenant(monkeypatch):
+    async def tenant_tier(company_id):
+        return "enterprise"
+
+    monkeypatch.setattr(rate_limit, "tenant_tier", tenant_tier)
+    user, tenant = PydanticObjectId(), PydanticObjectId()
+    token = create_access_token(user, tenant)
+
+    assert await rate_limit.request_limits(f"Bearer {token}", "10.0.0.1") == [
+        (f"user:{user}", settings.RATE_LIMIT_USER),
+        (f"tenant:{tenant}", rate_limit._tier_limit("enterprise")),
+    ]
+    assert await rate_limit.request_limits("Bearer junk", "10.0.0.1") == [
+        ("ip:10.0.0.1", settings.RATE_LIMIT_ANONYMOUS),
+    ]
+
+
+def test_unknown_tiers_get_the_free_quota():
+    free = settings.RATE_LIMIT_TENANT_BY_TIER.get("free", settings.RATE_LIMIT_USER)
+    assert rate_limit._tier_limit(None) == rate_limit._tier_limit("no-such-tier") == free
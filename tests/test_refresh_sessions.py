@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta, timezone
+from importlib import import_module
+from types import SimpleNamespace
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.models.user_setup.refresh_session import RefreshSession
+from app.services.auth.principal import Principal
+from app.services.auth.revocation import hash_token
+from app.services.auth.token import create_access_token, create_refresh_token, decode_token
+from app.services.exceptions import UnAuthorized
+
+session_module = import_module("app.services.auth.session")
+
+USER, TENANT = PydanticObjectId(), PydanticObjectId()
+
+
+class FakeSessions:
+    def __init__(self):
+        self.rows = []
+
+    async def find_one_and_update(self, query, update, projection=None):
+        for row in self.rows:
+            if row["token_hash"] == query["token_hash"] and row["expires_at"] > query["expires_at"]["$gt"]:
+                row.update(update["$set"])
+                return {"_id": row["_id"]}
+        return None
+
+    async def delete_one(self, query):
+        before = len(self.rows)
+        self.rows = [row for row in self.rows if row["token_hash"] != query["token_hash"]]
+        return SimpleNamespace(deleted_count=before - len(self.rows))
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    sessions = FakeSessions()
+
+    async def load_principal(user_id):
+        return Principal(
+            id=USER, company_id=TENANT, role="cashier", permissions=frozenset(), mask=0,
+            is_active=True, is_deleted=False, is_verified=True, tenant_status="active", token_version=0,
+        )
+
+    monkeypatch.setattr(RefreshSession, "get_motor_collection", classmethod(lambda cls: sessions))
+    monkeypatch.setattr(session_module, "load_principal", load_principal)
+    return sessions
+
+
+def _signed_in(sessions) -> str:
+    token = create_refresh_token(USER, TENANT)
+    sessions.rows.append({
+        "_id": PydanticObjectId(), "token_hash": hash_token(token),
+        "expires_at": datetime.now(timezone.utc) + timedelta(days=1),
+    })
+    return token
+
+
+def test_refresh_tokens_are_unique_per_device():
+    assert create_refresh_token(USER, TENANT) != create_refresh_token(USER, TENANT)
+
+
+@pytest.mark.anyio
+async def test_rotation_swaps_the_stored_hash(sessions):
+    old = _signed_in(sessions)
+
+    access, new = await session_module.rotate_session(old)
+
+    assert decode_token(access)["type"] == "access_token"
+    assert [row["token_hash"] for row in sessions.rows] == [hash_token(new)]
+    assert "last_used_at" in sessions.rows[0]
+
+
+@pytest.mark.anyio
+async def test_a_refresh_token_works_exactly_once(sessions):
+    old = _signed_in(sessions)
+    await session_module.rotate_session(old)
+
+    with pytest.raises(UnAuthorized):
+        await session_module.rotate_session(old)
+
+
+@pytest.mark.anyio
+async def test_only_refresh_tokens_rotate(sessions):
+    with pytest.raises(UnAuthorized):
+        await session_module.rotate_session(create_access_token(USER, TENANT))
+
+
+@pytest.mark.anyio
+async def test_closing_one_session_keeps_the_others(sessions):
+    phone, till = _signed_in(sessions), _signed_in(sessions)
+
+    assert await session_module.close_session(phone) is True
+    assert await session_module.close_session(phone) is False
+    assert [row["token_hash"] for row in sessions.rows] == [hash_token(till)]
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.blacklisted_token import BlacklistedToken
+from app.services.auth.revocation import BloomFilter, RevocationList, hash_token
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def sort(self, *args):
+        return self
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for row in self.rows:
+            yield row
+
+
+class FakeBlacklist:
+    def __init__(self):
+        self.rows = []
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        return FakeCursor(list(self.rows))
+
+
+@pytest.fixture
+def blacklist(monkeypatch):
+    blacklist = FakeBlacklist()
+    monkeypatch.setattr(BlacklistedToken, "get_motor_collection", classmethod(lambda cls: blacklist))
+    return blacklist
+
+
+def _row(token, expires_in=timedelta(minutes=5), legacy=False):
+    now = datetime.now(timezone.utc)
+    key = {"token": token} if legacy else {"token_hash": hash_token(token)}
+    return {**key, "expires_at": now + expires_in, "created_at": now}
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    added = [hash_token(f"token-{i}") for i in range(1000)]
+    for digest in added:
+        bloom.add(digest)
+
+    assert all(digest in bloom for digest in added)
+    false_positives = sum(hash_token(f"other-{i}") in bloom for i in range(10000))
+    assert false_positives < 300  # ~1% expected
+
+
+@pytest.mark.anyio
+async def test_unknown_until_loaded_then_answered_in_memory(blacklist):
+    blacklist.rows = [_row("revoked"), _row("legacy", legacy=True)]
+    revocations = RevocationList()
+    assert revocations.is_revoked(hash_token("revoked")) is None
+
+    await revocations.load()
+
+    assert revocations.is_revoked(hash_token("revoked")) is True
+    assert revocations.is_revoked(hash_token("legacy")) is True
+    assert revocations.is_revoked(hash_token("fine")) is False
+
+
+@pytest.mark.anyio
+async def test_refresh_picks_up_new_rows_and_forgets_expired_ones(blacklist):
+    blacklist.rows = [_row("old")]
+    revocations = RevocationList()
+    await revocations.load()
+    revocations.add(hash_token("aged-out"), datetime.now(timezone.utc) - timedelta(seconds=1))
+
+    blacklist.rows = [_row("new")]
+    await revocations.refresh()
+
+    assert "created_at" in blacklist.queries[-1]  # Only rows since the last seen one
+    assert revocations.is_revoked(hash_token("new")) is True
+    assert revocations.is_revoked(hash_token("old")) is True
+    assert revocations.is_revoked(hash_token("aged-out")) is False
@@ -0,0 +1,49 @@
+import re
+
+from beanie import PydanticObjectId
+
+from app.models.organization.region import Region
+from app.services.crud_services import CI_COLLATION, CRUD, PREFIX_UPPER_BOUND
+
+
+def test_collated_fields_come_from_the_model_indexes():
+    assert CRUD(Region)._collated_fields() == {"name"}
+
+
+def test_collated_matches_are_index_seeks():
+    assert CRUD._string_match("North", exact=True, collated=True) == "North"
+    assert CRUD._string_match("No", exact=False, collated=True) == {"$gte": "No", "$lt": "No" + PREFIX_UPPER_BOUND}
+
+
+def test_uncollated_matches_are_anchored_and_escaped():
+    prefix = CRUD._string_match("a.b(", exact=False, collated=False)
+    assert prefix == {"$regex": "^" + re.escape("a.b("), "$options": "i"}
+    assert re.match(prefix["$regex"], "A.B(c", re.I)
+    assert not re.match(prefix["$regex"], "xa.b(", re.I)
+
+    exact = CRUD._string_match("north", exact=True, collated=False)
+    assert exact["$regex"] == "^north$"
+
+
+def test_search_on_a_collated_field_runs_the_whole_query_collated():
+    company = PydanticObjectId()
+
+    query, collation = CRUD(Region)._build_list_filter(
+        company_id=company, filters={"code": "NR"}, search={"name": "No"}
+    )
+
+    assert collation == CI_COLLATION
+    assert query == {
+        "company_id": company,
+        "is_deleted": False,
+        "is_active": True,
+        "code": "NR",
+        "name": {"$gte": "No", "$lt": "No" + PREFIX_UPPER_BOUND},
+    }
+
+
+def test_search_on_plain_fields_falls_back_to_anchored_regexes():
+    query, collation = CRUD(Region)._build_list_filter(search={"code": "NR"})
+
+    assert collation is None
+    assert query["code"] == {"$regex": "^NR", "$options": "i"}
@@ -0,0 +1,67 @@
+import time
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.core.settings import settings
+from app.models.organization.shift import Shift
+from app.services import slow_query
+from app.services.slow_query import filter_shape, observe, summarize_explain
+from app.utils.cache import get_cache
+
+
+def test_filter_shape_keeps_structure_and_drops_values():
+    query = {
+        "company_id": PydanticObjectId(),
+        "is_deleted": False,
+        "address.city": "Accra",
+        "$or": [{"name": {"$regex": "^a", "$options": "i"}}, {"code": "X"}],
+        "_id": {"$in": [PydanticObjectId(), PydanticObjectId()]},
+        "tags": [],
+    }
+
+    assert filter_shape(query) == {
+        "company_id": "PydanticObjectId",
+        "is_deleted": "bool",
+        "address．city": "str",
+        "＄or": [{"name": {"＄regex": "str", "＄options": "str"}}, {"code": "str"}],
+        "_id": {"＄in": "[PydanticObjectId]"},
+        "tags": "[]",
+    }
+
+
+def test_explain_summary_tells_a_scan_from_a_seek():
+    seek = summarize_explain({
+        "queryPlanner": {"winningPlan": {"queryPlan": {
+            "stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "region_model_name"},
+        }}},
+        "executionStats": {"totalKeysExamined": 3, "totalDocsExamined": 3, "nReturned": 3},
+    })
+    assert seek["plan"] == "IXSCAN"
+    assert seek["stages"] == ["FETCH", "IXSCAN"]
+    assert seek["index_names"] == ["region_model_name"]
+    assert seek["keys_examined"] == 3
+
+    scan = summarize_explain({"queryPlanner": {"winningPlan": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}}})
+    assert scan["plan"] == "COLLSCAN"
+
+
+@pytest.mark.anyio
+async def test_each_slow_shape_is_explained_once_per_interval(monkeypatch):
+    recorded = []
+
+    async def record(model, operation, *args):
+        recorded.append((model.__name__, operation))
+
+    monkeypatch.setattr(slow_query, "_record", record)
+    get_cache("slow_query:explained").clear()
+    long_ago = time.perf_counter() - settings.SLOW_QUERY_MS / 1000 - 1
+
+    observe(Shift, "list", long_ago, {"name": "a"})
+    observe(Shift, "list", long_ago, {"name": "b"})  # Same shape
+    observe(Shift, "list", long_ago, {"code": "b"})
+    observe(Shift, "list", float("inf"), {"other": 1})  # Fast; ignored
+    for task in list(slow_query._pending):
+        await task
+
+    assert recorded == [("Shift", "list"), ("Shift", "list")]
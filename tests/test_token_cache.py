@@ -0,0 +1,61 @@
+import time
+from datetime import timedelta
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.core.settings import settings
+from app.services.auth import token as token_module
+from app.services.auth.token import _decoded_cache, bearer_claims, create_access_token, decode_token
+from app.services.exceptions import UnAuthorized
+
+
+@pytest.fixture
+def jwt_decodes(monkeypatch):
+    """Counts signature checks while still doing them."""
+    _decoded_cache().clear()
+    calls = []
+    decode = token_module.jwt.decode
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(token_module.jwt, "decode", counting)
+    return calls
+
+
+def test_verified_payloads_are_cached(jwt_decodes):
+    token = create_access_token(PydanticObjectId(), PydanticObjectId(), token_version=3)
+
+    first = decode_token(token)
+    first["sub"] = "tampered"  # Callers get copies; the cache is unaffected
+    second = decode_token(token)
+
+    assert len(jwt_decodes) == 1
+    assert second["ver"] == 3 and second["sub"] != "tampered"
+
+
+def test_failures_are_never_cached(jwt_decodes):
+    expired = create_access_token(PydanticObjectId(), PydanticObjectId(), expires_delta=timedelta(seconds=-1))
+    for _ in range(2):
+        with pytest.raises(UnAuthorized):
+            decode_token(expired)
+    with pytest.raises(UnAuthorized):
+        decode_token("not-a-jwt")
+    assert len(jwt_decodes) == 3
+
+
+def test_cache_entries_never_outlive_the_token(jwt_decodes):
+    decode_token(create_access_token(PydanticObjectId(), PydanticObjectId(), expires_delta=timedelta(seconds=30)))
+    (expires_at, _, _), = _decoded_cache()._data.values()
+    assert expires_at - time.monotonic() <= min(30, settings.TOKEN_DECODE_CACHE_TTL_SECONDS)
+
+
+def test_bearer_claims_tolerates_missing_or_bad_headers():
+    token = create_access_token("user", "tenant")
+    assert bearer_claims(f"Bearer {token}")["sub"] == "user"
+    assert bearer_claims(f"bearer {token}")["company_id"] == "tenant"
+    assert bearer_claims(None) is None
+    assert bearer_claims(f"Basic {token}") is None
+    assert bearer_claims("Bearer junk") is None
@@ -0,0 +1,99 @@
+from importlib import import_module
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.services.auth import dependencies
+from app.services.auth.dependencies import AuthContext, get_current_principal
+from app.services.auth.principal import Principal
+from app.services.auth.token import create_access_token, create_refresh_token
+from app.services.exceptions import UnAuthorized, ValidationError
+
+# The package re-exports a `logout` function under the module's name
+logout_module = import_module("app.services.auth.logout")
+
+USER, TENANT = PydanticObjectId(), PydanticObjectId()
+
+
+def _principal(token_version: int, **flags) -> Principal:
+    return Principal(
+        id=USER, company_id=TENANT, role="cashier", permissions=frozenset(), mask=0,
+        is_active=flags.get("is_active", True), is_deleted=False, is_verified=True,
+        tenant_status="active", token_version=token_version,
+    )
+
+
+@pytest.fixture
+def stored(monkeypatch):
+    state = {"principal": _principal(2)}
+
+    async def load_principal(user_id):
+        return state["principal"]
+
+    monkeypatch.setattr(dependencies, "load_principal", load_principal)
+    return state
+
+
+@pytest.mark.anyio
+async def test_tokens_of_the_current_version_pass(stored):
+    context = AuthContext(token="t", payload={"sub": str(USER), "ver": 2})
+    assert await get_current_principal(context) is stored["principal"]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("payload", [{"sub": str(USER), "ver": 1}, {"sub": str(USER)}])
+async def test_tokens_of_an_older_version_are_revoked(stored, payload):
+    with pytest.raises(UnAuthorized, match="revoked"):
+        await get_current_principal(AuthContext(token="t", payload=payload))
+
+
+@pytest.mark.anyio
+async def test_disabled_accounts_are_refused(stored):
+    stored["principal"] = _principal(2, is_active=False)
+    with pytest.raises(UnAuthorized, match="disabled"):
+        await get_current_principal(AuthContext(token="t", payload={"sub": str(USER), "ver": 2}))
+
+
+@pytest.fixture
+def logout_calls(monkeypatch):
+    calls = {"closed": [], "revoked": []}
+
+    async def close_session(refresh_token):
+        calls["closed"].append(refresh_token)
+        return True
+
+    async def revoke_token(token, expires_at):
+        calls["revoked"].append((token, expires_at))
+
+    monkeypatch.setattr(logout_module, "close_session", close_session)
+    monkeypatch.setattr(logout_module, "revoke_token", revoke_token)
+    return calls
+
+
+@pytest.mark.anyio
+async def test_logout_revokes_the_devices_access_token(logout_calls):
+    refresh = create_refresh_token(USER, TENANT)
+    access = create_access_token(USER, TENANT)
+
+    await logout_module.logout(refresh, f"Bearer {access}")
+
+    assert logout_calls["closed"] == [refresh]
+    [(token, expires_at)] = logout_calls["revoked"]
+    assert token == access and expires_at.tzinfo is not None
+
+
+@pytest.mark.anyio
+async def test_logout_leaves_other_users_tokens_alone(logout_calls):
+    refresh = create_refresh_token(USER, TENANT)
+
+    await logout_module.logout(refresh, f"Bearer {create_access_token(PydanticObjectId(), TENANT)}")
+    await logout_module.logout(refresh, None)
+
+    assert len(logout_calls["closed"]) == 2
+    assert logout_calls["revoked"] == []
+
+
+@pytest.mark.anyio
+async def test_logout_needs_a_refresh_token(logout_calls):
+    with pytest.raises(ValidationError):
+        await logout_module.logout(create_access_token(USER, TENANT))
@@ -0,0 +1,64 @@
+import pytest
+
+from app.constants import CountMode
+from app.core.settings import settings
+from app.models.organization.shift import Shift
+from app.services.crud_services import CRUD
+from app.utils.cache import get_cache
+
+
+class CountingCollection:
+    def __init__(self, total):
+        self.total = total
+        self.calls = []
+
+    async def estimated_document_count(self):
+        self.calls.append("estimated")
+        return self.total
+
+    async def count_documents(self, query, limit=None, **kwargs):
+        self.calls.append(("count", limit))
+        return min(self.total, limit) if limit else self.total
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    collection = CountingCollection(total=5000)
+    monkeypatch.setattr(Shift, "get_motor_collection", classmethod(lambda cls: collection))
+    get_cache("count:Shift").clear()
+    return collection
+
+
+@pytest.mark.anyio
+async def test_exact_totals_are_cached_per_filter(collection):
+    crud = CRUD(Shift)
+
+    assert await crud.count({"is_deleted": False}) == (5000, False)
+    assert await crud.count({"is_deleted": False}) == (5000, False)
+    assert collection.calls == [("count", None)]
+
+    await crud.count({"is_deleted": True})
+    assert len(collection.calls) == 2
+
+
+@pytest.mark.anyio
+async def test_estimated_totals(collection):
+    crud = CRUD(Shift)
+
+    # No filter: collection metadata, no scan at all
+    assert await crud.count({}, CountMode.ESTIMATED) == (5000, True)
+    # A filter: counting stops at the cap, which is then a lower bound
+    total, estimated = await crud.count({"is_active": True}, CountMode.ESTIMATED)
+    assert (total, estimated) == (min(5000, settings.COUNT_ESTIMATE_LIMIT), 5000 >= settings.COUNT_ESTIMATE_LIMIT)
+    assert collection.calls == ["estimated", ("count", settings.COUNT_ESTIMATE_LIMIT)]
+
+
+@pytest.mark.anyio
+async def test_writes_drop_cached_totals(collection):
+    crud = CRUD(Shift)
+    await crud.count({"is_deleted": False})
+
+    crud.invalidate()
+    await crud.count({"is_deleted": False})
+
+    assert len(collection.calls) == 2